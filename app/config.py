@@ -30,6 +30,11 @@ class Settings(BaseSettings):
     # 🚨 GEMINI_API_KEY
     GEMINI_API_KEY: str = ""
 
+    # 챗봇 LLM 백엔드: "gemini" | "local" (네트워크 없는 결정적 응답기, 부하 테스트용)
+    CHATBOT_BACKEND: str = "gemini"
+    CHATBOT_LOCAL_LATENCY_MS: int = 0
+    CHATBOT_LOCAL_CHUNK_DELAY_MS: int = 0
+
     model_config = SettingsConfigDict(
         env_file=env_path,
         env_file_encoding='utf-8',
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
@@ -16,6 +17,7 @@ from app.routers.map import map_router
 from app.routers.medication import router as medication_router
 from app.routers.chatbot import chatbot_router
 from app.routers.alarm import router as alarm_router
+from app.routers.safety import safety_router
 
 # 🚨 Ensure all models are imported for Base.metadata.create_all
 import app.models.user
@@ -24,8 +26,69 @@ import app.models.drug_info
 import app.models.map
 import app.models.refresh_token
 import app.models.chat_history
+import app.models.alarm
 
-app = FastAPI(title="Medipin Backend")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DUR 지식베이스를 미리 컴파일하여 첫 OCR/안전성 요청의 지연을 없앱니다.
+    from app.db import SessionLocal
+    from app.services.safety_kb import get_safety_kb
+    from app.services.drug_name_index import get_drug_name_index
+    db = SessionLocal()
+    try:
+        get_safety_kb(db)
+    except Exception as e:
+        logger.error(f"Safety KB warm-up failed: {e}")
+    try:
+        # 챗봇 RAG 약물 검색용 품목명 인덱스
+        get_drug_name_index(db)
+    except Exception as e:
+        logger.error(f"Drug name index warm-up failed: {e}")
+    finally:
+        db.close()
+
+    # 챗봇 BM25 검색 인덱스: 디스크에서 mmap 로드, 없거나 오래되었으면 백그라운드에서 재생성
+    import threading
+    from app.services.rag_index import ensure_rag_index
+
+    def _warm_rag_index():
+        rag_db = SessionLocal()
+        try:
+            ensure_rag_index(rag_db)
+        except Exception as e:
+            logger.error(f"RAG index warm-up failed: {e}")
+        finally:
+            rag_db.close()
+
+    threading.Thread(target=_warm_rag_index, name="rag-index-warmup", daemon=True).start()
+
+    # Gemini 클라이언트는 시작 시 1회만 설정하고, 모델 탐색은 백그라운드에서 수행
+    # (CHATBOT_BACKEND=local 이면 네트워크를 쓰지 않으므로 건너뜀)
+    from app.config import settings
+    from app.services.chatbot_client import get_chatbot_client
+    chatbot_client = get_chatbot_client()
+    if settings.CHATBOT_BACKEND.lower() == "gemini":
+        try:
+            chatbot_client.start()
+        except Exception as e:
+            logger.error(f"Chatbot client start failed: {e}")
+
+    # chat_history write-behind 저장기
+    from app.services.chat_writer import get_chat_writer
+    chat_writer = get_chat_writer()
+    chat_writer.start()
+
+    # 복약 알림 디스패처 (알림 시각에 SSE 로 push)
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+    alarm_dispatcher = get_alarm_dispatcher()
+    alarm_dispatcher.start()
+    yield
+    alarm_dispatcher.stop()
+    chatbot_client.stop()
+    # 종료 전에 큐에 남은 채팅 기록을 모두 저장
+    chat_writer.stop()
+
+app = FastAPI(title="Medipin Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Sync-Token"],
 )
 
 # ... (imports)
@@ -45,6 +109,7 @@ app.include_router(map_router)
 app.include_router(chatbot_router)
 app.include_router(medication_router)
 app.include_router(alarm_router)
+app.include_router(safety_router)
 
 Base.metadata.create_all(bind=engine)
 
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, TIMESTAMP, Text, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db import Base
 
 class Alarm(Base):
     __tablename__ = "alarms"
+    __table_args__ = (
+        # 디스패처가 다음 LOOKAHEAD 구간만 범위 조회
+        Index("ix_alarms_alarm_time", "alarm_time"),
+        # 사용자별 알림 내역 키셋 페이지 (alarm_time, id 역순)
+        Index("ix_alarms_user_time", "user_id", "alarm_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False, index=True)
@@ -12,3 +18,28 @@ class Alarm(Base):
     message = Column(String(255), nullable=True)
     is_read = Column(Boolean, default=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class AlarmOutbox(Base):
+    """
+    발송된(시각이 된) 알림 기록
+    - 디스패처가 알림 시각에 1행 기록 → 연결된 클라이언트에 즉시 전송
+    - 전송되지 못한 행(delivered_at IS NULL)은 클라이언트가 다시 연결하면 재전송
+    - alarm_id 또는 (regimen_id, alarm_time) 유니크 키로 같은 알림을 두 번 발송하지 않음
+      (여러 프로세스가 동시에 기록해도 INSERT IGNORE 로 한 곳만 성공)
+    """
+    __tablename__ = "alarm_outbox"
+    __table_args__ = (
+        Index("ix_alarm_outbox_user_pending", "user_id", "delivered_at", "id"),
+        UniqueConstraint("alarm_id", name="uq_alarm_outbox_alarm"),
+        UniqueConstraint("regimen_id", "alarm_time", name="uq_alarm_outbox_regimen_time"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    alarm_id = Column(Integer, ForeignKey("alarms.id", ondelete="CASCADE"), nullable=True)
+    regimen_id = Column(Integer, nullable=True)
+    alarm_time = Column(DateTime, nullable=False)
+    payload = Column(Text, nullable=False)  # 클라이언트에 보낼 JSON
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    delivered_at = Column(DateTime, nullable=True)
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, TIMESTAMP, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db import Base
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        # 대화별 최근 N턴 / 커서 페이지네이션 조회용
+        Index("ix_chat_history_user_conv_id", "user_id", "conversation_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user_profile.id", ondelete="CASCADE"), nullable=False)
@@ -12,3 +16,18 @@ class ChatHistory(Base):
     is_read = Column(Boolean, default=False)
     conversation_id = Column(String(50), nullable=True) # group ID for messages
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class ConversationSummary(Base):
+    """ 대화별 누적 요약 (최근 N턴 이전 메시지를 점진적으로 요약) """
+    __tablename__ = "conversation_summary"
+    __table_args__ = (
+        UniqueConstraint("user_id", "conversation_id", name="uq_conversation_summary_user_conv"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user_profile.id", ondelete="CASCADE"), nullable=False)
+    conversation_id = Column(String(50), nullable=False)
+    summary = Column(Text, nullable=False, default="")
+    last_message_id = Column(Integer, nullable=False, default=0) # 요약에 반영된 마지막 chat_history.id
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
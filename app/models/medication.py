@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Text, Time, ForeignKey, Boolean, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, Time, ForeignKey, Boolean, TIMESTAMP, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -21,6 +21,10 @@ class ActiveMedication(Base):
 
 class MedicationSchedule(Base):
     __tablename__ = "medication_schedule"
+    __table_args__ = (
+        # 월간 캘린더 조회 (user_id = ? AND start_date <= 월말 AND end_date >= 월초)
+        Index("ix_medication_schedule_user_dates", "user_id", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, nullable=False)
@@ -48,3 +52,107 @@ class MedicationSchedule(Base):
     # while `active_medication` is "Current Prescription List".
     # I'll keep them separate as per schema.
     
+
+
+class MedicationRegimen(Base):
+    """
+    반복 규칙 기반 복약 일정 (기간 전체가 1행)
+    - rrule: RRULE 형식 일부 지원 (FREQ=DAILY|WEEKLY;INTERVAL=n;BYDAY=MO,WE;COUNT=n;UNTIL=YYYYMMDD)
+    - 날짜별 일정/알림은 조회 시점에 펼쳐서 만들고, 날짜별 상태만 RegimenOccurrence 에 저장
+    """
+    __tablename__ = "medication_regimen"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    pill_name = Column(String(255), nullable=True)
+    dose = Column(String(50), nullable=True)
+    rrule = Column(String(255), nullable=False, server_default="FREQ=DAILY")
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)  # NULL 이면 종료일 없음 (rrule 의 COUNT/UNTIL 로 제한 가능)
+
+    timing1 = Column(String(50), nullable=True)
+    timing2 = Column(String(50), nullable=True)
+    timing3 = Column(String(50), nullable=True)
+    timing4 = Column(String(50), nullable=True)
+    timing5 = Column(String(50), nullable=True)
+
+    meal_relation = Column(String(100), nullable=True)
+    memo = Column(Text, nullable=True)
+    notify = Column(Boolean, server_default="1")
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=True)
+
+    occurrences = relationship("RegimenOccurrence", back_populates="regimen", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class RegimenOccurrence(Base):
+    """ 반복 일정의 특정 날짜 상태 (복용 여부 / 건너뜀 / 시간·용량 변경 / 알림 확인 시각) """
+    __tablename__ = "regimen_occurrence"
+    __table_args__ = (
+        UniqueConstraint("regimen_id", "occurrence_date", name="uq_regimen_occurrence_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    regimen_id = Column(Integer, ForeignKey("medication_regimen.id", ondelete="CASCADE"), nullable=False)
+    occurrence_date = Column(Date, nullable=False)
+    is_taken = Column(Boolean, default=False)
+    skipped = Column(Boolean, default=False)
+    override_timings = Column(String(255), nullable=True)  # "HH:MM,HH:MM" (이 날만 다른 시각)
+    override_dose = Column(String(50), nullable=True)
+    memo = Column(Text, nullable=True)
+    acknowledged_until = Column(DateTime, nullable=True)  # 이 시각까지의 알림은 확인됨
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    regimen = relationship("MedicationRegimen", back_populates="occurrences")
+
+
+class AdherenceDaily(Base):
+    """
+    복약 순응도 일별 집계 (사용자 x 약 x 날짜)
+    - medication_schedule 하루 1행 기준 scheduled = 행 수, taken = is_taken 행 수
+    - 일정 생성/수정/삭제, 알림 확인으로 is_taken 이 바뀔 때 해당 칸만 다시 계산 (services/adherence.py)
+    """
+    __tablename__ = "adherence_daily"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", "pill_name", name="uq_adherence_daily_user_day_pill"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    pill_name = Column(String(255), nullable=False, server_default="")
+    scheduled = Column(Integer, nullable=False, default=0)
+    taken = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class ScheduleChange(Base):
+    """
+    일정 변경 기록 (캘린더 피드 증분 동기화)
+    - id 가 곧 sync token: 클라이언트는 마지막으로 받은 id 이후 변경만 요청
+    - kind: "schedule" (medication_schedule) | "regimen" (medication_regimen), action: "upsert" | "delete"
+    """
+    __tablename__ = "schedule_change"
+    __table_args__ = (
+        Index("ix_schedule_change_user", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    kind = Column(String(20), nullable=False)
+    object_id = Column(Integer, nullable=False)
+    action = Column(String(10), nullable=False, server_default="upsert")
+    changed_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class CalendarFeedToken(Base):
+    """
+    캘린더 피드(.ics) 구독용 비밀 키 (사용자당 1개)
+    - API 액세스 토큰과 별개: 피드 조회에만 쓰이고 만료 없이 재발급/폐기로만 무효화
+    - 원문은 발급 시 한 번만 보여주고 sha256 해시만 저장
+    """
+    __tablename__ = "calendar_feed_token"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, unique=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
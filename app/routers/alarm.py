@@ -1,17 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.orm import Session
-from datetime import datetime
-from typing import List
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
 from pydantic import BaseModel
+from datetime import date as date_type
 from app.db import get_db
 from app.models.alarm import Alarm
 
 router = APIRouter(prefix="/alarms", tags=["Alarms"])
 
+# 반복 일정(medication_regimen) 알림은 저장하지 않고 조회 구간만 펼쳐서 합침
+REGIMEN_PENDING_LOOKBACK_DAYS = 7
+REGIMEN_HISTORY_DAYS = 30
+
 class AlarmResponse(BaseModel):
-    id: int
+    id: Optional[int] = None          # 반복 일정 알림은 None
     user_id: int
-    schedule_id: int
+    schedule_id: Optional[int] = None
     alarm_time: datetime
     message: str
     is_read: bool
@@ -19,6 +28,10 @@ class AlarmResponse(BaseModel):
     # Joined fields
     pill_name: str = None
     is_taken: bool = None
+
+    # 반복 일정 알림 식별자 (읽음 처리: POST /alarms/regimen/{regimen_id}/read?alarm_time=...)
+    regimen_id: Optional[int] = None
+    occurrence_date: Optional[date_type] = None
     
     class Config:
         from_attributes = True
@@ -42,53 +55,298 @@ def get_pending_alarms(user_id: int = None, current_user: UserProfile = Depends(
         Alarm.is_read == False,
         Alarm.alarm_time <= now
     ).order_by(Alarm.alarm_time.asc()).all()
-    
-    return alarms
 
-@router.get("/history", response_model=List[AlarmResponse])
-def get_alarm_history(user_id: int = None, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+    from app.services.regimen import expand_alarms
+    regimen_alarms = [
+        a for a in expand_alarms(db, real_user_id, now - timedelta(days=REGIMEN_PENDING_LOOKBACK_DAYS), now)
+        if not a["is_read"]
+    ]
+    if not regimen_alarms:
+        return alarms
+
+    merged = [AlarmResponse.model_validate(a) for a in alarms] + [AlarmResponse.model_validate(a) for a in regimen_alarms]
+    merged.sort(key=lambda a: a.alarm_time)
+    return merged
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+def _parse_history_cursor(cursor: str):
+    """ "<alarm_time ISO>_<정렬용 id>" → (datetime, int) """
+    try:
+        ts, sort_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(ts), int(sort_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/history")
+def get_alarm_history(
+    response: Response,
+    user_id: int = None,
+    cursor: Optional[str] = Query(None, description="이전 페이지 응답의 X-Next-Cursor 값"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
-    전체 알림 내역 조회 (최신순 정렬)
+    알림 내역 조회 (최신순 정렬)
     약 이름, 복용 여부(is_taken) 포함
+    - (alarm_time, id) 키셋 페이지네이션: 다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환
+      (ix_alarms_user_time 인덱스를 역순으로 limit 만큼만 읽으므로 오래 쓴 사용자도 페이지 비용 일정)
+    - 반복 일정 알림은 id 가 없으므로 정렬용 id 를 -regimen_id 로 두고 같은 순서에 합침
     """
     from app.models.medication import MedicationSchedule
-    
+    from app.services.regimen import expand_alarms
+
     real_user_id = current_user.id
-    
-    results = db.query(Alarm, MedicationSchedule.pill_name, MedicationSchedule.is_taken)\
-        .join(MedicationSchedule, Alarm.schedule_id == MedicationSchedule.id)\
-        .filter(Alarm.user_id == real_user_id)\
-        .order_by(Alarm.alarm_time.desc())\
-        .all()
-    
-    response_list = []
-    for alarm, pill_name, is_taken in results:
-        # Pydantic 모델로 매핑
-        resp = AlarmResponse.model_validate(alarm)
-        resp.pill_name = pill_name
-        resp.is_taken = is_taken
-        response_list.append(resp)
-        
-    return response_list
+    before = _parse_history_cursor(cursor) if cursor else None
+
+    stmt = (
+        select(
+            Alarm.id, Alarm.user_id, Alarm.schedule_id, Alarm.alarm_time,
+            func.coalesce(Alarm.message, "").label("message"), Alarm.is_read,
+            MedicationSchedule.pill_name, MedicationSchedule.is_taken,
+        )
+        .join(MedicationSchedule, Alarm.schedule_id == MedicationSchedule.id)
+        .where(Alarm.user_id == real_user_id)
+    )
+    if before:
+        stmt = stmt.where(or_(
+            Alarm.alarm_time < before[0],
+            and_(Alarm.alarm_time == before[0], Alarm.id < before[1]),
+        ))
+    rows = db.execute(stmt.order_by(Alarm.alarm_time.desc(), Alarm.id.desc()).limit(limit + 1)).all()
+    page = [(r.alarm_time, r.id, dict(r._mapping, regimen_id=None, occurrence_date=None)) for r in rows]
+
+    # 반복 일정 알림 (최근 REGIMEN_HISTORY_DAYS 일만, 커서 이전 구간)
+    now = datetime.now()
+    window_end = min(now, before[0]) if before else now
+    window_start = now - timedelta(days=REGIMEN_HISTORY_DAYS)
+    if len(page) > limit:
+        # 이 페이지에 들어갈 수 있는 가장 오래된 시각까지만 펼치면 충분
+        window_start = max(window_start, page[limit - 1][0])
+    if window_start <= window_end:
+        for a in expand_alarms(db, real_user_id, window_start, window_end):
+            key = (a["alarm_time"], -a["regimen_id"])
+            if before is None or key < before:
+                page.append((key[0], key[1], a))
+
+    page.sort(key=lambda p: (p[0], p[1]), reverse=True)
+    if len(page) > limit:
+        last_time, last_id, _ = page[limit - 1]
+        response.headers["X-Next-Cursor"] = f"{last_time.isoformat()}_{last_id}"
+    return [item for _, _, item in page[:limit]]
+
+class AlarmBatchRead(BaseModel):
+    ids: Optional[List[int]] = None     # 일반 알림 id 목록
+    before: Optional[datetime] = None   # 이 시각까지 울린 알림 전부 (반복 일정 알림 포함)
+
+@router.post("/read")
+def mark_alarms_read(payload: AlarmBatchRead, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    알림 일괄 확인 (/alarms/{alarm_id}/read 와 같은 동작을 한 번에)
+    - 알림 is_read, 연동된 스케줄 is_taken 을 각각 UPDATE 1번으로 처리 (한 트랜잭션, 순응도 집계 포함)
+    - 로그인한 사용자 본인 알림만 변경
+    """
+    from app.models.medication import MedicationSchedule
+    from app.models.alarm import AlarmOutbox
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+    from app.services.regimen import acknowledge_alarms_before
+    from app.services.adherence import refresh_schedules
+
+    if (payload.ids is None) == (payload.before is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or before")
+    if payload.ids is not None and not payload.ids:
+        return {"status": "success", "alarms": 0, "regimen_days": 0}
+
+    target = [Alarm.user_id == current_user.id, Alarm.is_read == False]
+    if payload.ids is not None:
+        target.append(Alarm.id.in_(payload.ids))
+    else:
+        target.append(Alarm.alarm_time <= payload.before)
+    target_ids = select(Alarm.schedule_id).where(*target)
+
+    try:
+        # 알림보다 먼저 (is_read 조건이 바뀌기 전에) 스케줄 / 미전달 push 처리
+        db.execute(
+            update(MedicationSchedule)
+            .where(MedicationSchedule.id.in_(target_ids))
+            .values(is_taken=True)
+            .execution_options(synchronize_session=False)
+        )
+        refresh_schedules(db, MedicationSchedule.id.in_(target_ids))
+        db.execute(
+            update(AlarmOutbox)
+            .where(AlarmOutbox.alarm_id.in_(select(Alarm.id).where(*target)), AlarmOutbox.delivered_at.is_(None))
+            .values(delivered_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        result = db.execute(
+            update(Alarm).where(*target).values(is_read=True).execution_options(synchronize_session=False)
+        )
+
+        regimen_days = 0
+        if payload.before is not None:
+            window_start = payload.before - timedelta(days=REGIMEN_PENDING_LOOKBACK_DAYS)
+            regimen_days = acknowledge_alarms_before(db, current_user.id, window_start, payload.before)
+            db.execute(
+                update(AlarmOutbox)
+                .where(
+                    AlarmOutbox.user_id == current_user.id,
+                    AlarmOutbox.regimen_id.isnot(None),
+                    AlarmOutbox.alarm_time <= payload.before,
+                    AlarmOutbox.delivered_at.is_(None),
+                )
+                .values(delivered_at=datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    # 아직 울리지 않은 일반 알림은 디스패처가 발송 직전 is_read 로 걸러냄, 반복 일정은 다시 전개
+    if regimen_days:
+        get_alarm_dispatcher().reload()
+    return {"status": "success", "alarms": result.rowcount, "regimen_days": regimen_days}
+
+def _check_alarm_owner(db: Session, current_user: UserProfile, owner_id: int):
+    """ 알림 소유자가 본인 또는 가족 구성원인지 (아니면 403) """
+    from app.services.user_service import get_accessible_user_ids
+
+    if owner_id != current_user.id and owner_id not in get_accessible_user_ids(db, current_user.id):
+        raise HTTPException(status_code=403, detail="본인 또는 가족 구성원의 알림만 확인할 수 있습니다.")
 
 @router.post("/{alarm_id}/read")
-def mark_alarm_read(alarm_id: int, db: Session = Depends(get_db)):
+def mark_alarm_read(alarm_id: int, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     알림을 읽음(완료) 상태로 변경
     + 연동된 스케줄의 is_taken도 True로 업데이트 (사용자 요구사항 반영: '확인' 시 '복용 완료' 처리)
+    - 본인 또는 가족 구성원의 알림만
     """
     from app.models.medication import MedicationSchedule
 
     alarm = db.query(Alarm).filter(Alarm.id == alarm_id).first()
     if not alarm:
         raise HTTPException(status_code=404, detail="Alarm not found")
+    _check_alarm_owner(db, current_user, alarm.user_id)
     
     alarm.is_read = True
+    # 아직 전달되지 않은 push(outbox)도 재전송하지 않음
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+    get_alarm_dispatcher().acknowledge(db, alarm_ids=[alarm.id])
     
     # 2026-01-06: 알림 확인 시 복용 완료(is_taken=True)로 자동 업데이트하는 옵션 로직 추가
     schedule = db.query(MedicationSchedule).filter(MedicationSchedule.id == alarm.schedule_id).first()
     if schedule:
         schedule.is_taken = True
+        if schedule.start_date:
+            from app.services.adherence import refresh
+            db.flush()
+            refresh(db, schedule.user_id, [schedule.pill_name], schedule.start_date, schedule.start_date)
         
     db.commit()
     return {"status": "success", "message": "Alarm marked as read and taken"}
+
+@router.post("/regimen/{regimen_id}/read")
+def mark_regimen_alarm_read(
+    regimen_id: int,
+    alarm_time: datetime,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    반복 일정 알림 읽음 처리 (/alarms/{alarm_id}/read 와 동일하게 해당 날짜 복용 완료로 기록)
+    - 본인 또는 가족 구성원의 반복 일정만
+    """
+    from app.models.medication import MedicationRegimen
+    from app.services.regimen import acknowledge_alarm
+
+    regimen = db.query(MedicationRegimen).filter(MedicationRegimen.id == regimen_id).first()
+    if not regimen:
+        raise HTTPException(status_code=404, detail="Regimen not found")
+    _check_alarm_owner(db, current_user, regimen.user_id)
+
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+
+    try:
+        acknowledge_alarm(db, regimen, alarm_time)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    get_alarm_dispatcher().acknowledge(db, regimen_id=regimen_id, until=alarm_time)
+    db.commit()
+    return {"status": "success", "message": "Alarm marked as read and taken"}
+
+# =======================================================
+# 실시간 알림 (SSE)
+# =======================================================
+# 알림 시각이 되면 디스패처가 연결된 클라이언트로 바로 전송합니다. (/alarms/pending 폴링 대체)
+# EventSource 는 헤더를 보낼 수 없으므로 토큰을 쿼리 파라미터로 받습니다.
+KEEPALIVE_SECONDS = 15
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@router.get("/stream")
+async def stream_alarms(request: Request, token: str):
+    """
+    알림 push 스트림
+    - 연결 직후: 전달되지 않은 알림(outbox) 재전송
+    - 이후: 알림 시각에 `event: alarm` 전송, 15초마다 keepalive 주석
+    🚨 Depends(get_db) 를 쓰면 스트림이 끝날 때까지 커넥션을 물고 있으므로
+       토큰 확인용 세션은 여기서 열고 바로 닫습니다.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.db import SessionLocal
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+
+    def _authenticate():
+        with SessionLocal() as session:
+            return get_current_user(token=token, db=session).id
+
+    user_id = await run_in_threadpool(_authenticate)
+    dispatcher = get_alarm_dispatcher()
+
+    def _undelivered():
+        with SessionLocal() as session:
+            return dispatcher.undelivered(session, user_id)
+
+    def _mark(outbox_ids):
+        with SessionLocal() as session:
+            dispatcher.mark_delivered(session, outbox_ids)
+
+    async def event_source():
+        # 재전송 조회 전에 먼저 구독 (그 사이에 울린 알림을 놓치지 않도록)
+        queue = dispatcher.subscribe(user_id)
+        try:
+            backlog = await run_in_threadpool(_undelivered)
+            sent = set()
+            for event in backlog:
+                sent.add(event["outbox_id"])
+                yield _sse("alarm", event)
+            if backlog:
+                await run_in_threadpool(_mark, list(sent))
+
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event.get("outbox_id") in sent:
+                    continue
+                yield _sse("alarm", event)
+                await run_in_threadpool(_mark, [event.get("outbox_id")])
+        finally:
+            dispatcher.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/dispatcher/health")
+def alarm_dispatcher_health():
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+    return get_alarm_dispatcher().stats()
@@ -1,9 +1,15 @@
 # app/routers/chatbot.py (신규 파일)
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.orm import Session
-from app.db import get_db
-from app.security.jwt_handler import get_current_user
+from starlette.concurrency import run_in_threadpool
+from app.db import SessionLocal, get_db
+from app.security.jwt_handler import get_current_user, oauth2_scheme
 from app.models.user import UserProfile
 from app.models.chat_history import ChatHistory
 
@@ -11,31 +17,37 @@ from app.models.chat_history import ChatHistory
 from app.schemas.chatbot import ChatRequest, ChatResponse
 
 # 🚨 서비스 파일 임포트 (이 파일은 모델을 파일 상단에서 임포트하지 않아야 함)
-from app.services.chatbot_service import generate_chatbot_response 
+from app.services.chatbot_service import generate_chatbot_response_async, stream_chatbot_response
+from app.services.chatbot_backend import get_chatbot_backend
+from app.services.chatbot_cache import get_response_cache
+from app.services.chat_writer import get_chat_writer
 
 
 chatbot_router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
 
+def _authenticate(token: str) -> int:
+    """
+    🚨 LLM 응답을 기다리는 엔드포인트는 Depends(get_db) 를 쓰면 응답이 끝날 때까지 커넥션을 물고 있으므로
+       토큰 확인용 세션은 여기서 열고 바로 닫습니다. (이후 DB 작업은 서비스가 단계마다 SessionLocal 로 짧게)
+    """
+    with SessionLocal() as session:
+        return get_current_user(token=token, db=session).id
+
 @chatbot_router.post("/", response_model=ChatResponse)
-def chatbot_query(
+async def chatbot_query(
     payload: ChatRequest,
-    db: Session = Depends(get_db),
-    current_user: UserProfile = Depends(get_current_user)
+    token: str = Depends(oauth2_scheme)
 ):
     """
     로그인한 주사용자의 질문에 대해 DB 정보를 기반으로 답변합니다.
     (JWT 인증 필요)
     """
-    if not current_user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="인증되지 않은 사용자입니다."
-        )
+    user_id = await run_in_threadpool(_authenticate, token)
 
     try:
-        result = generate_chatbot_response(
-            db, 
-            user_id=current_user.id, 
+        result = await generate_chatbot_response_async(
+            SessionLocal,
+            user_id=user_id,
             question=payload.question,
             conversation_id=payload.conversation_id
         )
@@ -49,13 +61,69 @@ def chatbot_query(
     
     return result
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@chatbot_router.post("/stream")
+async def chatbot_stream(
+    payload: ChatRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    답변을 SSE(text/event-stream)로 토큰 단위 전송합니다.
+    - event: token  → {"text": "..."}
+    - event: done   → {"response": 최종 답변, "conversation_id": ...}
+    - event: error  → {"detail": "..."}
+    채팅 기록은 스트림이 끝난 뒤 저장됩니다.
+    """
+    user_id = await run_in_threadpool(_authenticate, token)
+
+    async def event_source():
+        try:
+            async for event in stream_chatbot_response(
+                SessionLocal,
+                user_id=user_id,
+                question=payload.question,
+                conversation_id=payload.conversation_id
+            ):
+                name = event.pop("event")
+                yield _sse(name, event)
+        except Exception as e:
+            print(f"Chatbot Stream Error: {e}")
+            yield _sse("error", {"detail": f"챗봇 서비스 처리 중 오류가 발생했습니다: {e}"})
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@chatbot_router.get("/health")
+def chatbot_health():
+    """
+    챗봇 엔진 상태 (백엔드, 선택된 모델, 마지막 모델 탐색 시각, 응답 캐시 적중률 등)
+    """
+    return dict(
+        get_chatbot_backend().health(),
+        cache=get_response_cache().stats(),
+        history_writer=get_chat_writer().stats(),
+    )
+
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 500
+
 @chatbot_router.get("/history")
 def get_chatbot_history(
+    response: Response,
+    conversation_id: Optional[str] = Query(None, description="특정 대화만 조회 ('default' = conversation_id 없는 기존 기록)"),
+    cursor: Optional[int] = Query(None, description="이전 페이지 응답의 X-Next-Cursor 값"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
     db: Session = Depends(get_db),
     current_user: UserProfile = Depends(get_current_user)
 ):
     """
-    로그인한 사용자의 채팅 기록을 가져옵니다.
+    로그인한 사용자의 채팅 기록을 최신순으로 가져옵니다.
+    - 커서 페이지네이션: 다음 페이지가 있으면 X-Next-Cursor 헤더에 커서(id)를 담아 반환
     """
     if not current_user:
         raise HTTPException(
@@ -63,10 +131,80 @@ def get_chatbot_history(
             detail="인증되지 않은 사용자입니다."
         )
 
-    history = db.query(ChatHistory).filter(ChatHistory.user_id == current_user.id).order_by(ChatHistory.created_at.desc()).all()
+    # 아직 큐에 있는 메시지까지 보이도록 먼저 저장
+    get_chat_writer().flush()
+
+    stmt = select(
+        ChatHistory.id, ChatHistory.user_id, ChatHistory.message, ChatHistory.sender,
+        ChatHistory.is_read, ChatHistory.conversation_id, ChatHistory.created_at
+    ).where(ChatHistory.user_id == current_user.id)
+
+    if conversation_id == "default":
+        stmt = stmt.where(ChatHistory.conversation_id == None)
+    elif conversation_id:
+        stmt = stmt.where(ChatHistory.conversation_id == conversation_id)
+    if cursor is not None:
+        stmt = stmt.where(ChatHistory.id < cursor)
+
+    # id 는 생성 순서와 같으므로 created_at 대신 PK 로 정렬 (인덱스 사용)
+    rows = db.execute(stmt.order_by(ChatHistory.id.desc()).limit(limit + 1)).all()
+    history = [dict(r._mapping) for r in rows[:limit]]
+
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = str(history[-1]["id"])
     
     return history
 
+@chatbot_router.get("/conversations")
+def get_chatbot_conversations(
+    db: Session = Depends(get_db),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """
+    대화 목록 - conversation_id 별 1행 (마지막 메시지 + 읽지 않은 봇 메시지 수), 최신 대화순
+    (/history 는 페이지 단위이므로 목록 화면은 이 API 사용)
+    """
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="인증되지 않은 사용자입니다."
+        )
+
+    get_chat_writer().flush()
+
+    # ix_chat_history_user_conv_id (user_id, conversation_id, id) 로 대화별 MAX(id)
+    latest = (
+        select(
+            ChatHistory.conversation_id.label("conversation_id"),
+            func.max(ChatHistory.id).label("last_id"),
+            func.sum(case((and_(ChatHistory.sender == "bot", ChatHistory.is_read == False), 1), else_=0)).label("unread"),
+        )
+        .where(ChatHistory.user_id == current_user.id)
+        .group_by(ChatHistory.conversation_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            latest.c.conversation_id, latest.c.unread,
+            ChatHistory.id, ChatHistory.message, ChatHistory.sender, ChatHistory.created_at,
+        )
+        .join(ChatHistory, ChatHistory.id == latest.c.last_id)
+        .order_by(latest.c.last_id.desc())
+    ).all()
+
+    return [
+        {
+            # conversation_id 없는 기존 기록은 'default' (/history, DELETE /conversation 과 동일)
+            "conversation_id": r.conversation_id or "default",
+            "last_message_id": r.id,
+            "message": r.message,
+            "sender": r.sender,
+            "created_at": r.created_at,
+            "unread": int(r.unread or 0),
+        }
+        for r in rows
+    ]
+
 @chatbot_router.post("/read")
 def mark_as_read(
     db: Session = Depends(get_db),
@@ -81,6 +219,7 @@ def mark_as_read(
             detail="인증되지 않은 사용자입니다."
         )
 
+    get_chat_writer().flush()
     db.query(ChatHistory).filter(
         ChatHistory.user_id == current_user.id,
         ChatHistory.is_read == False,
@@ -105,6 +244,9 @@ def delete_conversation(
             detail="로그인이 필요합니다."
         )
 
+    # 큐에 남은 메시지가 삭제 후에 저장되지 않도록 먼저 flush
+    get_chat_writer().flush()
+
     # 기본값 'default' 처리 (cid가 없는 레거시 데이터 대응)
     if conversation_id == "default":
         db.query(ChatHistory).filter(
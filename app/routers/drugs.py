@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List 
+from typing import List, Optional
 # ----------------------------------------------------
 
 from app.db import get_db
@@ -10,6 +10,7 @@ from app.security.jwt_handler import get_current_user
 
 # 서비스 임포트
 from app.services.drug_service import get_drugs_by_query, get_drug_by_id 
+from app.services.pill_index import identify_pills
 from app.services.medication_service import register_medication_schedule, delete_medication_schedule
 
 # 스키마 임포트 (drug.py가 있으므로 직접 임포트)
@@ -31,6 +32,36 @@ def search_drugs(q: str, db: Session = Depends(get_db)):
         return [] 
         
     return drugs_list
+
+# =======================================================
+# 1-1. 낱알 식별 (Identify) 엔드포인트
+# 🚨 /{item_seq} 보다 먼저 등록되어야 경로 충돌이 없습니다.
+# =======================================================
+@drugs_router.get("/identify", response_model=List[dict])
+def identify_drugs(
+    q: Optional[str] = None,
+    shape: Optional[str] = None,
+    color: Optional[str] = None,
+    imprint: Optional[str] = None,
+    has_line: Optional[bool] = None,
+    size: Optional[float] = Query(None, description="장축 크기(mm)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    모양 / 색상 / 각인으로 낱알을 식별합니다.
+    예) q="white round tablet printed 'TY'" 또는 shape=원형&color=하양&imprint=TY
+    """
+    if not any([q, shape, color, imprint]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="q, shape, color, imprint 중 하나 이상을 입력해야 합니다."
+        )
+
+    return identify_pills(
+        db, q=q, shape=shape, color=color, imprint=imprint,
+        has_line=has_line, size=size, limit=limit
+    )
     
 # =======================================================
 # 2. 약품 상세 정보 조회 (Detail) 엔드포인트
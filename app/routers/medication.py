@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, field_validator
 from typing import Optional, List, Any
 from datetime import date as date_type, datetime, timedelta
 from app.db import get_db
-from app.models.medication import MedicationSchedule
+from app.models.medication import MedicationSchedule, MedicationRegimen
+from app.models.user import UserProfile
+from app.security.jwt_handler import get_current_user
 
 router = APIRouter(prefix="/medication", tags=["Medication"])
 
@@ -22,6 +24,9 @@ class ScheduleCreate(BaseModel):
     memo: Optional[str] = None
     notify: bool = True
     is_taken: bool = False
+    # 반복 규칙 (예: "FREQ=DAILY", "FREQ=WEEKLY;BYDAY=MO,WE,FR")
+    # 지정하면 날짜별 행 대신 medication_regimen 1행으로 저장하고 조회 시 펼침
+    rrule: Optional[str] = None
 
 class ScheduleUpdate(BaseModel):
     pill_name: Optional[str] = None
@@ -35,8 +40,16 @@ class ScheduleUpdate(BaseModel):
     # 다중 타이밍 업데이트 지원 (선택 사항)
     timings: Optional[List[str]] = None
 
+class OccurrenceUpdate(BaseModel):
+    """ 반복 일정의 특정 날짜만 변경 """
+    is_taken: Optional[bool] = None
+    skipped: Optional[bool] = None
+    timings: Optional[List[str]] = None
+    dose: Optional[str] = None
+    memo: Optional[str] = None
+
 class ScheduleResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # 반복 일정에서 펼친 항목은 None (regimen_id + occurrence_date 로 식별)
     user_id: int
     pill_name: Optional[str]
     dose: Optional[str]
@@ -53,6 +66,10 @@ class ScheduleResponse(BaseModel):
     timing3: Optional[str] = None
     timing4: Optional[str] = None
     timing5: Optional[str] = None
+    # 반복 일정 항목
+    regimen_id: Optional[int] = None
+    occurrence_date: Optional[date_type] = None
+    rrule: Optional[str] = None
 
     @field_validator('timing1', 'timing2', 'timing3', 'timing4', 'timing5', mode='before')
     @classmethod
@@ -69,14 +86,23 @@ class ScheduleResponse(BaseModel):
         from_attributes = True
 
 @router.post("/schedule")
-def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
+def create_schedule(
+    schedule: ScheduleCreate,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """
     복약 일정 생성 - 시작일부터 종료일까지 매일 개별 레코드 생성
     + 다중 타이밍(timings 배열)을 timing1~5 컬럼에 매핑
     + 알림(Alarm) 자동 등록
+    - 본인 또는 가족 구성원의 일정만 등록 가능
     """
-    from datetime import timedelta, datetime
-    from app.models.alarm import Alarm
+    from app.services.schedule_materializer import materialize_schedule
+
+    _check_owner(db, current_user, schedule.user_id)
+
+    if schedule.rrule:
+        return _create_regimen(schedule, db)
 
     # 날짜 검증
     if not schedule.start_date or not schedule.end_date:
@@ -85,100 +111,26 @@ def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
     if schedule.start_date > schedule.end_date:
         raise HTTPException(status_code=400, detail="start_date must be before or equal to end_date")
     
-    # 기간 내 모든 날짜 순회하며 레코드 생성
-    current_date = schedule.start_date
-    created_count = 0
-    skipped_count = 0
-    created_schedules = []
-    
-    # 타이밍 매핑 준비 (최대 5개)
-    timings_map = {f"timing{i+1}": t for i, t in enumerate(schedule.timings[:5])}
-    
-    while current_date <= schedule.end_date:
-        # 중복 체크: 동일 사용자, 동일 약 이름, 동일 날짜
-        existing = db.query(MedicationSchedule).filter(
-            MedicationSchedule.user_id == schedule.user_id,
-            MedicationSchedule.pill_name == schedule.pill_name,
-            MedicationSchedule.start_date == current_date
-        ).first()
-        
-        if existing:
-            skipped_count += 1
-        else:
-            # 새 레코드 생성 - timings_map 언패킹하여 timing1~5 설정
-            db_schedule = MedicationSchedule(
-                user_id=schedule.user_id,
-                pill_name=schedule.pill_name,
-                dose=schedule.dose,
-                start_date=current_date,
-                end_date=current_date,  # 각 레코드는 하루 단위
-                **timings_map,          # timing1='08:00', timing2='12:00'...
-                meal_relation=schedule.meal_relation,
-                memo=schedule.memo,
-                notify=schedule.notify,
-                is_taken=False
-            )
-            db.add(db_schedule)
-            db.flush() # ID 생성을 위해 flush
-            
-            created_schedules.append(db_schedule)
-            created_count += 1
-
-            # 🔔 알림 생성 로직
-            if schedule.notify and schedule.timings:
-                for t_str in schedule.timings:
-                    if not t_str: continue
-                    try:
-                        # HH:MM 형식 파싱
-                        hm = t_str.split(":")
-                        if len(hm) >= 2:
-                            hour, minute = int(hm[0]), int(hm[1])
-                            # 현재 날짜 + 시간 조합
-                            alarm_dt = datetime.combine(current_date, datetime.min.time())
-                            alarm_dt = alarm_dt.replace(hour=hour, minute=minute)
-                            
-                            new_alarm = Alarm(
-                                user_id=schedule.user_id,
-                                schedule_id=db_schedule.id,
-                                alarm_time=alarm_dt,
-                                message=f"{schedule.pill_name} 복약 시간입니다."
-                            )
-                            db.add(new_alarm)
-                    except Exception as e:
-                        print(f"Error creating alarm for {t_str}: {e}")
-
-        
-        current_date += timedelta(days=1)
-    
-    # 모든 레코드 커밋
-    if created_count > 0:
-        db.commit()
-        for sched in created_schedules:
-            db.refresh(sched)
+    # 기간 내 모든 날짜 레코드 + 알림을 한 트랜잭션으로 일괄 생성
+    result = materialize_schedule(
+        db,
+        user_id=schedule.user_id,
+        pill_name=schedule.pill_name,
+        start_date=schedule.start_date,
+        end_date=schedule.end_date,
+        timings=schedule.timings,
+        dose=schedule.dose,
+        meal_relation=schedule.meal_relation,
+        memo=schedule.memo,
+        notify=schedule.notify,
+    )
+    created_count = result["created"]
+    skipped_count = result["skipped"]
     
     # 응답: 첫 번째 생성된 일정 정보 + 메타데이터
-    if created_schedules:
-        response = created_schedules[0]
-        # 메시지를 응답 객체에 추가하기 위해 dict로 변환 후 메시지 추가
-        response_dict = {
-            "id": response.id,
-            "user_id": response.user_id,
-            "pill_name": response.pill_name,
-            "dose": response.dose,
-            "start_date": response.start_date,
-            "end_date": response.end_date,
-            "meal_relation": response.meal_relation,
-            "memo": response.memo,
-            "notify": response.notify,
-            "is_taken": response.is_taken,
-            "created_at": response.created_at,
-            "timing1": response.timing1,
-            "timing2": response.timing2,
-            "timing3": response.timing3,
-            "timing4": response.timing4,
-            "timing5": response.timing5,
-            "message": f"총 {created_count}일간의 복약 일정이 등록되었습니다. (중복 제외: {skipped_count}건)"
-        }
+    if result["first"]:
+        response_dict = dict(result["first"])
+        response_dict["message"] = f"총 {created_count}일간의 복약 일정이 등록되었습니다. (중복 제외: {skipped_count}건)"
         return response_dict
     else:
         raise HTTPException(
@@ -186,65 +138,382 @@ def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
             detail=f"모든 일정이 이미 등록되어 있습니다. (중복 제외: {skipped_count}건)"
         )
 
+def _create_regimen(schedule: ScheduleCreate, db: Session):
+    """ rrule 이 있는 요청: 반복 일정 1행만 저장 (종료일은 생략 가능 - COUNT/UNTIL 또는 무기한) """
+    from app.services.regimen import create_regimen
+
+    if not schedule.start_date:
+        raise HTTPException(status_code=400, detail="start_date is required")
+    if schedule.end_date and schedule.start_date > schedule.end_date:
+        raise HTTPException(status_code=400, detail="start_date must be before or equal to end_date")
+
+    try:
+        regimen = create_regimen(
+            db,
+            user_id=schedule.user_id,
+            pill_name=schedule.pill_name,
+            start_date=schedule.start_date,
+            end_date=schedule.end_date,
+            timings=schedule.timings,
+            rrule=schedule.rrule,
+            dose=schedule.dose,
+            meal_relation=schedule.meal_relation,
+            memo=schedule.memo,
+            notify=schedule.notify,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid rrule: {e}")
+
+    response_dict = {c.name: getattr(regimen, c.name) for c in MedicationRegimen.__table__.columns}
+    response_dict["regimen_id"] = regimen.id
+    response_dict["message"] = f"반복 복약 일정이 등록되었습니다. ({regimen.rrule})"
+    return response_dict
+
+def _check_owner(db: Session, current_user: UserProfile, owner_id: int):
+    """ 쓰기 대상(일정/알림) 소유자가 본인 또는 가족 구성원인지 (아니면 403) """
+    from app.services.user_service import get_accessible_user_ids
+
+    if owner_id != current_user.id and owner_id not in get_accessible_user_ids(db, current_user.id):
+        raise HTTPException(status_code=403, detail="본인 또는 가족 구성원의 일정만 변경할 수 있습니다.")
+
+def _scoped_user_ids(db: Session, current_user: UserProfile, user_id: Optional[int]) -> List[int]:
+    """ 조회 대상 사용자: 지정 시 본인/가족만 허용, 미지정 시 본인 """
+    from app.services.user_service import get_accessible_user_ids
+
+    if user_id is None or user_id == current_user.id:
+        return [current_user.id]
+    if user_id not in get_accessible_user_ids(db, current_user.id):
+        raise HTTPException(status_code=403, detail="본인 또는 가족 구성원의 일정만 조회할 수 있습니다.")
+    return [user_id]
+
+def _month_range(year: Optional[int], month: Optional[int]):
+    """ 해당 월의 시작일과 종료일 (예: 2026-02-01 ~ 2026-02-28), 비어있으면 이번 달 """
+    import calendar
+
+    # 2026-01-06 수정: year/month가 비어있으면 현재 날짜 기준
+    if not year or not month:
+        now = datetime.now()
+        year = now.year
+        month = now.month
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="month must be between 1 and 12")
+
+    last_day = calendar.monthrange(year, month)[1]
+    return date_type(year, month, 1), date_type(year, month, last_day)
+
+def _overlapping(user_ids: List[int], range_start: date_type, range_end: date_type):
+    """ ix_medication_schedule_user_dates 인덱스를 타는 기간 중첩 조건 """
+    # (시작일 <= 구간 종료일) AND (종료일 >= 구간 시작일)
+    return (
+        MedicationSchedule.user_id.in_(user_ids),
+        MedicationSchedule.start_date <= range_end,
+        MedicationSchedule.end_date >= range_start,
+    )
+
 @router.get("/schedule", response_model=List[ScheduleResponse])
 def get_schedules(
     user_id: Optional[int] = None,
     year: Optional[int] = None,
     month: Optional[int] = None,
+    day: Optional[date_type] = None,
+    current_user: UserProfile = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(MedicationSchedule)
-    
-    if user_id:
-        query = query.filter(MedicationSchedule.user_id == user_id)
-    
-    # 2026-01-06 수정: year/month가 비어있으면 현재 날짜 기준
-    if not year or not month:
-        from datetime import datetime
-        now = datetime.now()
-        year = now.year
-        month = now.month
+    """
+    일정 목록 (항상 로그인 사용자 또는 그 가족 범위)
+    - day 지정 시 그 날짜만, 아니면 year/month 한 달
+    """
+    user_ids = _scoped_user_ids(db, current_user, user_id)
+    if day:
+        range_start = range_end = day
+    else:
+        range_start, range_end = _month_range(year, month)
 
-    if year and month:
-        # ✅ 해당 월의 시작일과 종료일 계산 (예: 2026-02-01 ~ 2026-02-28)
-        import calendar
-        from datetime import date as d_type
-        
-        last_day = calendar.monthrange(year, month)[1]
-        month_start = d_type(year, month, 1)
-        month_end = d_type(year, month, last_day)
-
-        # ✅ 기간 중첩(Overlap) 로직 적용
-        # (시작일 <= 월 종료일) AND (종료일 >= 월 시작일)
-        query = query.filter(
-            MedicationSchedule.start_date <= month_end,
-            MedicationSchedule.end_date >= month_start
-        )
+    rows = db.query(MedicationSchedule).filter(*_overlapping(user_ids, range_start, range_end)).all()
+
+    # 날짜별 행 + 반복 일정(조회 구간만 펼침)
+    from app.services.regimen import expand_schedules
+    occurrences = expand_schedules(db, user_ids, range_start, range_end)
+
+    return rows + occurrences
+
+@router.get("/calendar")
+def get_calendar_summary(
+    year: Optional[int] = None,
+    month: Optional[int] = None,
+    user_id: Optional[int] = None,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    월간 캘린더용 날짜별 집계 (행 전체 대신 날짜 x 사용자별 개수만 전송)
+    - user_id 미지정 시 본인 + 가족 전체
+    - 반환: [{"date", "user_id", "count", "taken", "all_taken"}, ...] (날짜, 사용자 순)
+    """
+    from sqlalchemy import func, select, case
+    from app.services.user_service import get_accessible_user_ids
+    from app.services.regimen import expand_schedules
+
+    if user_id is None:
+        user_ids = get_accessible_user_ids(db, current_user.id)
+    else:
+        user_ids = _scoped_user_ids(db, current_user, user_id)
+    month_start, month_end = _month_range(year, month)
+
+    # 같은 (사용자, 기간) 끼리 DB 에서 먼저 묶음 (하루 단위 행이 대부분이라 날짜별 집계와 거의 같음)
+    stmt = select(
+        MedicationSchedule.user_id,
+        MedicationSchedule.start_date,
+        MedicationSchedule.end_date,
+        func.count().label("count"),
+        func.sum(case((MedicationSchedule.is_taken == True, 1), else_=0)).label("taken"),
+    ).where(*_overlapping(user_ids, month_start, month_end)).group_by(
+        MedicationSchedule.user_id, MedicationSchedule.start_date, MedicationSchedule.end_date
+    )
 
-    return query.all()
+    days = {}
+
+    def add(uid, day, count, taken):
+        entry = days.setdefault((day, uid), {"date": day, "user_id": uid, "count": 0, "taken": 0})
+        entry["count"] += count
+        entry["taken"] += taken
+
+    for r in db.execute(stmt):
+        day = max(r.start_date, month_start)
+        last = min(r.end_date, month_end)
+        while day <= last:
+            add(r.user_id, day, r.count, int(r.taken or 0))
+            day += timedelta(days=1)
+
+    for occ in expand_schedules(db, user_ids, month_start, month_end):
+        add(occ["user_id"], occ["occurrence_date"], 1, 1 if occ["is_taken"] else 0)
+
+    result = [days[k] for k in sorted(days)]
+    for entry in result:
+        entry["all_taken"] = entry["taken"] >= entry["count"]
+    return result
+
+ADHERENCE_DEFAULT_DAYS = 28
+ADHERENCE_MAX_DAYS = 366
+
+@router.get("/adherence")
+def get_adherence(
+    start: Optional[date_type] = None,
+    end: Optional[date_type] = None,
+    group: str = Query("day", pattern="^(day|week|month)$"),
+    user_id: Optional[int] = None,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    복약 순응도 (복용 / 예정) - adherence_daily 집계에서 읽음
+    - user_id 미지정 시 본인 + 가족 전체, 기간 미지정 시 최근 28일
+    - 반환: total, by_member, by_drug, series(group=day|week|month)
+    """
+    from app.services.user_service import get_accessible_user_ids
+    from app.services.adherence import summarize
+
+    if user_id is None:
+        user_ids = get_accessible_user_ids(db, current_user.id)
+    else:
+        user_ids = _scoped_user_ids(db, current_user, user_id)
+
+    end = end or datetime.now().date()
+    start = start or end - timedelta(days=ADHERENCE_DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before or equal to end")
+    if (end - start).days >= ADHERENCE_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"range must be at most {ADHERENCE_MAX_DAYS} days")
+
+    return summarize(db, user_ids, start, end, group)
+
+# =======================================================
+# 캘린더 앱 구독 (.ics)
+# =======================================================
+# 캘린더 앱은 헤더를 보낼 수 없으므로 구독 URL 에 키를 넣습니다.
+# 🚨 API 액세스 토큰은 60분이면 만료되고 권한도 전체이므로 쓰지 않고,
+#    피드 전용 구독 키(POST /medication/calendar/feed-key 로 발급)로만 인증합니다.
+def _feed_user_id(db: Session, key: str) -> int:
+    from app.services.ical_feed import user_for_feed_key
+
+    user_id = user_for_feed_key(db, key)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid calendar feed key")
+    return user_id
+
+@router.post("/calendar/feed-key")
+def issue_calendar_feed_key(request: Request, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    캘린더 구독 키 발급 (재발급하면 이전 구독 URL 은 더 이상 동작하지 않음)
+    - 키 원문은 이 응답에서만 확인 가능 (서버에는 해시만 저장)
+    """
+    from app.services.ical_feed import issue_feed_key
+
+    key = issue_feed_key(db, current_user.id)
+    db.commit()
+    return {"key": key, "url": str(request.url_for("get_calendar_feed").include_query_params(key=key))}
+
+@router.delete("/calendar/feed-key")
+def revoke_calendar_feed_key(current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+    """ 캘린더 구독 키 폐기 (구독 중인 캘린더 앱은 401 을 받음) """
+    from app.services.ical_feed import revoke_feed_key
+
+    revoked = revoke_feed_key(db, current_user.id)
+    db.commit()
+    return {"status": "success", "revoked": revoked}
+
+@router.get("/calendar.ics")
+def get_calendar_feed(request: Request, key: str, db: Session = Depends(get_db)):
+    """
+    복약 일정 iCalendar 피드
+    - ETag / If-None-Match: 바뀐 것이 없으면 304 (본문 생성/전송 없음)
+    - X-Sync-Token: 이후 /medication/calendar/changes 로 증분 동기화할 때 사용
+    """
+    from app.services.ical_feed import build_feed, feed_version
+
+    user_id = _feed_user_id(db, key)
+    sync_token, version = feed_version(db, user_id)
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "X-Sync-Token": str(sync_token), "Cache-Control": "private, no-cache"}
+
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    body = build_feed(db, user_id, version)
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+@router.get("/calendar/changes")
+def get_calendar_changes(sync_token: int, key: str, db: Session = Depends(get_db)):
+    """
+    sync_token 이후 바뀐 일정만 (객체 단위)
+    - changes[].uid_prefix 로 시작하는 UID 의 이벤트를 ics 로 교체하거나(upsert) 삭제(delete)
+    - 410: 토큰이 잘못되었거나 너무 오래됨 → calendar.ics 를 다시 받아야 함
+    """
+    from app.services.ical_feed import changes_since
+
+    user_id = _feed_user_id(db, key)
+    result = changes_since(db, user_id, sync_token)
+    if result is None:
+        raise HTTPException(status_code=410, detail="sync_token expired, fetch calendar.ics again")
+    return result
 
 @router.patch("/schedule/{schedule_id}", response_model=ScheduleResponse)
-def update_schedule(schedule_id: int, update_data: ScheduleUpdate, db: Session = Depends(get_db)):
+def update_schedule(
+    schedule_id: int,
+    update_data: ScheduleUpdate,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     db_schedule = db.query(MedicationSchedule).filter(MedicationSchedule.id == schedule_id).first()
     if not db_schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
+    _check_owner(db, current_user, db_schedule.user_id)
     
     # Exclude unset fields
     update_dict = update_data.dict(exclude_unset=True)
+    before = (db_schedule.pill_name, db_schedule.start_date)
     
     for key, value in update_dict.items():
         setattr(db_schedule, key, value)
+
+    # 순응도 집계: 바뀌기 전/후 칸 모두 다시 계산
+    from app.services.adherence import refresh
+    db.flush()
+    for pill_name, day in {before, (db_schedule.pill_name, db_schedule.start_date)}:
+        if day:
+            refresh(db, db_schedule.user_id, [pill_name], day, day)
+
+    from app.services.ical_feed import record_changes
+    record_changes(db, db_schedule.user_id, "schedule", [db_schedule.id])
     
     db.commit()
     db.refresh(db_schedule)
     return db_schedule
 
 @router.delete("/schedule/{schedule_id}")
-def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
+def delete_schedule(schedule_id: int, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
     db_schedule = db.query(MedicationSchedule).filter(MedicationSchedule.id == schedule_id).first()
     if not db_schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
+    _check_owner(db, current_user, db_schedule.user_id)
     
     db.delete(db_schedule)
+    if db_schedule.start_date:
+        from app.services.adherence import refresh
+        db.flush()
+        refresh(db, db_schedule.user_id, [db_schedule.pill_name], db_schedule.start_date, db_schedule.start_date)
+    from app.services.ical_feed import record_changes
+    record_changes(db, db_schedule.user_id, "schedule", [schedule_id], action="delete")
     db.commit()
     return {"status": "success", "message": "Schedule deleted"}
+
+# =======================================================
+# 반복 일정 (medication_regimen)
+# =======================================================
+def _accessible_regimen(db: Session, current_user: UserProfile, regimen_id: int) -> MedicationRegimen:
+    """ 본인 또는 가족 구성원의 반복 일정만 (없으면 404, 남의 것이면 403) """
+    regimen = db.query(MedicationRegimen).filter(MedicationRegimen.id == regimen_id).first()
+    if not regimen:
+        raise HTTPException(status_code=404, detail="Regimen not found")
+    _check_owner(db, current_user, regimen.user_id)
+    return regimen
+
+@router.get("/regimen")
+def get_regimens(
+    user_id: Optional[int] = None,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """ 반복 일정 목록 (user_id 미지정 시 본인, 가족 구성원만 지정 가능) """
+    user_ids = _scoped_user_ids(db, current_user, user_id)
+    regimens = db.query(MedicationRegimen).filter(MedicationRegimen.user_id.in_(user_ids)).order_by(MedicationRegimen.id).all()
+    return [{c.name: getattr(r, c.name) for c in MedicationRegimen.__table__.columns} for r in regimens]
+
+@router.patch("/regimen/{regimen_id}/occurrences/{occurrence_date}", response_model=ScheduleResponse)
+def update_occurrence(
+    regimen_id: int,
+    occurrence_date: date_type,
+    update_data: OccurrenceUpdate,
+    current_user: UserProfile = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """ 반복 일정의 하루만 변경 (복용 완료 / 건너뜀 / 시각·용량 변경) """
+    from app.services.regimen import upsert_occurrence, expand_schedules
+
+    regimen = _accessible_regimen(db, current_user, regimen_id)
+
+    update_dict = update_data.model_dump(exclude_unset=True)
+    fields = {}
+    for key in ("is_taken", "skipped", "memo"):
+        if key in update_dict:
+            fields[key] = update_dict[key]
+    if "timings" in update_dict:
+        fields["override_timings"] = ",".join(t for t in (update_dict["timings"] or []) if t) or None
+    if "dose" in update_dict:
+        fields["override_dose"] = update_dict["dose"]
+
+    try:
+        upsert_occurrence(db, regimen, occurrence_date, **fields)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    expanded = [o for o in expand_schedules(db, [regimen.user_id], occurrence_date, occurrence_date) if o["regimen_id"] == regimen_id]
+    if not expanded:
+        # 건너뜀 처리된 날짜
+        return {
+            "regimen_id": regimen_id, "occurrence_date": occurrence_date, "user_id": regimen.user_id,
+            "pill_name": regimen.pill_name, "dose": regimen.dose, "start_date": occurrence_date, "end_date": occurrence_date,
+            "meal_relation": regimen.meal_relation, "memo": regimen.memo, "notify": regimen.notify,
+            "is_taken": False, "created_at": regimen.created_at, "rrule": regimen.rrule,
+        }
+    return expanded[0]
+
+@router.delete("/regimen/{regimen_id}")
+def delete_regimen(regimen_id: int, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+    regimen = _accessible_regimen(db, current_user, regimen_id)
+
+    from app.services.ical_feed import record_changes
+    db.delete(regimen)
+    record_changes(db, regimen.user_id, "regimen", [regimen_id], action="delete")
+    db.commit()
+    return {"status": "success", "message": "Regimen deleted"}
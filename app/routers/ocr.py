@@ -1,4 +1,5 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from sqlalchemy.orm import Session
 from typing import List
 import pytesseract
 from PIL import Image, ImageFilter, ImageOps
@@ -31,6 +32,10 @@ from app.services.ocr_confidence import calculate_ocr_confidence
 from app.services.medication_normalizer import normalize_medications
 from app.services.prescription_comparator import compare_prescription_and_bag
 from app.services.alert_level import determine_alert_level
+from app.services.ocr_safety import screen_ocr_medications
+from app.db import get_db
+from app.security.jwt_handler import get_optional_user
+from app.models.user import UserProfile
 from app.services.ocr_cache import (
     make_file_hash,
     get_cached_result,
@@ -41,6 +46,7 @@ from app.services.ocr_cache import (
 # ✅ 설정값
 # -------------------------------------------------
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+SAFETY_SCREENING = True  # DUR 안전성 점검 단계 사용 여부 (요청별 safety_check 파라미터로도 끌 수 있음)
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
 ocr_router = APIRouter(prefix="/ocr", tags=["OCR Processing"])
@@ -85,11 +91,56 @@ def process_image(file_path: str):
     return text, img
 
 
+# -------------------------------------------------
+# ✅ (선택) DUR 안전성 점검 단계
+# -------------------------------------------------
+def run_safety_stage(db: Session, user: UserProfile | None, parsed: dict, enabled: bool):
+    """
+    normalize_medications 이후 단계: 컴파일된 지식베이스로 로그인 사용자 기준 점검
+    실패해도 OCR 결과 반환에는 영향을 주지 않습니다.
+    """
+    if not (SAFETY_SCREENING and enabled):
+        return None
+    try:
+        return screen_ocr_medications(db, user, normalize_medications(parsed))
+    except Exception as e:
+        logger.error(f"[OCR SAFETY] screening failed: {e}")
+        return None
+
+
+# -------------------------------------------------
+# ✅ 약봉투 복용 일정 → 캘린더 이벤트
+# -------------------------------------------------
+CALENDAR_DAYS = 3
+
+def build_bag_calendar_events(schedule: list, alert: dict) -> list:
+    """
+    오늘부터 CALENDAR_DAYS 일치 이벤트 (요청마다 만듦)
+    🚨 alert 에는 요청 사용자의 DUR 결과가 들어가므로 캐시된 이벤트를 그대로 돌려주지 않습니다.
+    """
+    # 🚨 build_calendar_events 호출 전 필수 키(time, drug_name 등) 검증
+    valid_schedule = [
+        s for s in schedule
+        if s.get("time") and (s.get("drug_name") or s.get("label"))
+    ]
+    return build_calendar_events(
+        schedules=valid_schedule,
+        start_date=date.today(),
+        days=CALENDAR_DAYS,
+        alert_level=alert,
+    )
+
+
 # -------------------------------------------------
 # ✅ 단일 문서 OCR
 # -------------------------------------------------
 @ocr_router.post("/read")
-async def read_text(file: UploadFile = File(...)):
+async def read_text(
+    file: UploadFile = File(...),
+    safety_check: bool = True,
+    db: Session = Depends(get_db),
+    current_user: UserProfile | None = Depends(get_optional_user),
+):
     start_time = time.time()
     logger.info(f"[OCR START] filename={file.filename}")
 
@@ -112,14 +163,25 @@ async def read_text(file: UploadFile = File(...)):
     # 2-3) 캐시 조회
     cached = get_cached_result(file_hash)
     if cached:
+        data = cached["data"]
+        alert = cached["alert"]
+
+        # 캐시는 사용자와 무관한 OCR 결과만 보관 → 안전성 점검은 요청 사용자 기준으로 다시 수행
+        if data.get("type") == "medicine_bag":
+            safety = run_safety_stage(db, current_user, {"medicines": data.get("parsed_medication", [])}, safety_check)
+            if safety:
+                data = {**data, "safety": safety}
+                alert = determine_alert_level(data["confidence"], safety=safety)
+            data = {**data, "calendar_events": build_bag_calendar_events(data.get("schedule", []), alert)}
+
         elapsed = time.time() - start_time
         logger.info(
             f"[OCR CACHE HIT] filename={file.filename}, elapsed={elapsed:.3f}s"
         )
         return build_response(
             message="캐시된 OCR 결과 반환",
-            data=cached["data"],
-            alert=cached["alert"],
+            data=data,
+            alert=alert,
         )
 
     # 캐시가 없으면, BytesIO로 다시 감싸서 실제 OCR 수행
@@ -150,9 +212,6 @@ async def read_text(file: UploadFile = File(...)):
         doc_type = detect_document_type(extracted_text)
         alert = determine_alert_level(confidence)
 
-        start_date = date.today()
-        days = 3
-
         # -------------------------------------------------
         # ✅ 약봉투
         # -------------------------------------------------
@@ -166,31 +225,19 @@ async def read_text(file: UploadFile = File(...)):
                 logger.error(f"Schedule building failed: {e}")
                 schedule = []
 
-            # 🚨 build_calendar_events 호출 전 필수 키(time, drug_name 등) 검증
-            valid_schedule = [
-                s for s in schedule 
-                if s.get("time") and (s.get("drug_name") or s.get("label"))
-            ]
-            
-            if len(valid_schedule) < len(schedule):
-                logger.warning(f"[OCR] Filtered {len(schedule) - len(valid_schedule)} invalid schedule items.")
-
-            calendar_events = build_calendar_events(
-                schedules=valid_schedule,
-                start_date=start_date,
-                days=days,
-                alert_level=alert,
-            )
+            invalid = sum(1 for s in schedule if not (s.get("time") and (s.get("drug_name") or s.get("label"))))
+            if invalid:
+                logger.warning(f"[OCR] Filtered {invalid} invalid schedule items.")
 
             response_data = {
                 "type": "medicine_bag",
                 "confidence": confidence,
                 "parsed_medication": parsed.get("medicines", []), # 🚨 리스트만 추출해서 전달
                 "schedule": schedule,
-                "calendar_events": calendar_events,
+                "calendar_events": build_bag_calendar_events(schedule, alert),
             }
 
-            # ✅ 캐시에 저장
+            # ✅ 캐시에 저장 (DUR 점검 전 - 사용자와 무관한 값만)
             set_cached_result(
                 file_hash,
                 {
@@ -199,6 +246,16 @@ async def read_text(file: UploadFile = File(...)):
                 },
             )
 
+            # ✅ DUR 안전성 점검 결과를 alert / 이벤트에 병합 (이 요청의 응답에만)
+            safety = run_safety_stage(db, current_user, parsed, safety_check)
+            if safety:
+                alert = determine_alert_level(confidence, safety=safety)
+                response_data = {
+                    **response_data,
+                    "safety": safety,
+                    "calendar_events": build_bag_calendar_events(schedule, alert),
+                }
+
             elapsed = time.time() - start_time
             logger.info(
                 f"[OCR DONE] type=medicine_bag filename={file.filename} elapsed={elapsed:.3f}s"
@@ -281,7 +338,12 @@ async def read_text(file: UploadFile = File(...)):
 # ✅ 처방전 + 약봉투 비교
 # -------------------------------------------------
 @ocr_router.post("/compare")
-async def compare_documents(files: List[UploadFile] = File(...)):
+async def compare_documents(
+    files: List[UploadFile] = File(...),
+    safety_check: bool = True,
+    db: Session = Depends(get_db),
+    current_user: UserProfile | None = Depends(get_optional_user),
+):
     if len(files) != 2:
         return build_response(
             success=False,
@@ -341,13 +403,16 @@ async def compare_documents(files: List[UploadFile] = File(...)):
         medicine_bag={"medicines": normalized_bag},
     )
 
-    alert = determine_alert_level(confidence_bag, comparison)
+    safety = run_safety_stage(db, current_user, parsed_bag, safety_check)
+    alert = determine_alert_level(confidence_bag, comparison, safety=safety)
 
     result = {
         "comparison": comparison,
         "prescription": normalized_rx,
         "medicine_bag": normalized_bag,
     }
+    if safety:
+        result["safety"] = safety
 
     if comparison["is_safe"]:
         start_date = date.today()
@@ -0,0 +1,107 @@
+# app/routers/safety.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.db import get_db
+from app.security.jwt_handler import get_current_user
+from app.models.user import UserProfile
+
+from app.schemas.safety import (
+    SafetyCheckRequest, SafetyCheckResponse, SafetyBatchRequest, SafetyBatchResponse,
+    DuplicationRequest, DuplicationGroup,
+)
+from app.services.safety_kb import get_safety_kb
+from app.services.safety_engine import run_comprehensive_safety_check, run_batch_safety_check
+from app.services.drug_safety_service import (
+    check_family_interactions,
+    check_efficacy_duplication_for_names,
+    check_efficacy_duplication_for_ocr,
+    check_active_efficacy_duplication,
+)
+
+safety_router = APIRouter(prefix="/safety", tags=["Safety"])
+
+MAX_BATCH_SIZE = 500
+
+
+# =======================================================
+# 1. 단건 안전성 점검 (POST /safety/check)
+# =======================================================
+@safety_router.post("/check", response_model=SafetyCheckResponse)
+def check_safety(req: SafetyCheckRequest, db: Session = Depends(get_db)):
+    """
+    노인/임부/수유부/연령/병용/용량/기간/효능군중복 DUR 항목을 한 번에 점검합니다.
+    """
+    kb = get_safety_kb(db)
+    findings = run_comprehensive_safety_check(kb, req.drugs, req.patient_info.model_dump())
+    return {"findings": findings}
+
+
+# =======================================================
+# 2. 배치 안전성 점검 (POST /safety/check/batch)
+# =======================================================
+@safety_router.post("/check/batch", response_model=SafetyBatchResponse)
+def check_safety_batch(req: SafetyBatchRequest, db: Session = Depends(get_db)):
+    """ 여러 (약 목록, 환자 정보) 조합을 한 번에 점검합니다. """
+    if len(req.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {MAX_BATCH_SIZE}건까지 점검할 수 있습니다."
+        )
+
+    kb = get_safety_kb(db)
+    results = run_batch_safety_check(
+        kb, [{"drugs": item.drugs, "patient_info": item.patient_info.model_dump()} for item in req.items]
+    )
+    return {"results": [{"findings": r} for r in results]}
+
+
+# =======================================================
+# 3. 가족 전체 병용금기 점검 (GET /safety/interactions)
+# =======================================================
+@safety_router.get("/interactions")
+def get_family_interactions(
+    db: Session = Depends(get_db),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """ 로그인한 사용자의 모든 환자 프로필에 대해 복용 중인 약 간 병용금기를 조회합니다. """
+    pairs = check_family_interactions(db, current_user.id)
+    return [{"patient_id": pid, "interactions": found} for pid, found in pairs.items()]
+
+
+# =======================================================
+# 4. 효능군 중복 점검 (POST /safety/duplication)
+# =======================================================
+@safety_router.post("/duplication", response_model=List[DuplicationGroup])
+def check_duplication(req: DuplicationRequest, db: Session = Depends(get_db)):
+    """ 약 이름 목록 또는 OCR 결과(medicines)에서 같은 효능군에 속한 약들을 찾습니다. """
+    if req.medicines:
+        return check_efficacy_duplication_for_ocr(db, req.medicines + [{"name": d} for d in req.drugs])
+    return check_efficacy_duplication_for_names(db, req.drugs)
+
+
+# =======================================================
+# 5. 복용 중인 약 효능군 중복 (GET /safety/duplication/active/{patient_id})
+# =======================================================
+@safety_router.get("/duplication/active/{patient_id}", response_model=List[DuplicationGroup])
+def check_active_duplication(
+    patient_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    """ 본인 계정에 속한 환자 프로필의 현재 복용약 효능군 중복을 조회합니다. """
+    from app.models.user import PatientProfile
+
+    patient = db.query(PatientProfile.id).filter(
+        PatientProfile.id == patient_id,
+        PatientProfile.user_id == current_user.id
+    ).first()
+    if not patient:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="해당 환자 프로필을 찾을 수 없거나 권한이 없습니다."
+        )
+
+    return check_active_efficacy_duplication(db, patient_id)
@@ -0,0 +1,60 @@
+# app/schemas/safety.py
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class DoseInfo(BaseModel):
+    """ 용량/기간 점검용 복용 정보 """
+    drug_name: str
+    dose_per_time: Optional[float] = None
+    times_per_day: Optional[int] = None
+    duration_days: Optional[int] = None
+
+
+class PatientInfo(BaseModel):
+    """ 안전성 점검 대상 환자 정보 (drug_safety_analyzer 형식과 동일) """
+    is_elderly: bool = False
+    is_pregnant: bool = False
+    is_lactating: bool = False
+    child_age: int = 0           # 성인은 0
+    age_unit: str = "년"          # '년' 또는 '개월'
+    dose_info: List[DoseInfo] = []
+
+
+class SafetyCheckRequest(BaseModel):
+    """ 약 목록 + 환자 정보 """
+    drugs: List[str]
+    patient_info: PatientInfo = PatientInfo()
+
+
+class SafetyFinding(BaseModel):
+    type: str
+    status: str                  # Critical / Warning / Info / Safe
+    message: str
+    details: Optional[str] = None
+
+
+class SafetyCheckResponse(BaseModel):
+    findings: List[SafetyFinding]
+
+
+class SafetyBatchRequest(BaseModel):
+    """ 여러 약 목록 × 환자 정보를 한 번에 점검 """
+    items: List[SafetyCheckRequest]
+
+
+class SafetyBatchResponse(BaseModel):
+    results: List[SafetyCheckResponse]
+
+
+class DuplicationRequest(BaseModel):
+    """ 효능군 중복 점검: 약 이름 목록 또는 OCR 표준화 결과 """
+    drugs: List[str] = []
+    medicines: List[dict] = []   # normalize_medications 결과 (name 키 사용)
+
+
+class DuplicationGroup(BaseModel):
+    efficacy_group: str
+    group_div: str
+    drugs: List[str]
@@ -63,3 +63,19 @@ def get_current_user(
 
     except JWTError:
         raise credentials_exception_token
+
+
+# ✅ 로그인하지 않아도 되는 엔드포인트용 (토큰이 없거나 잘못되면 None)
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/login", auto_error=False)
+
+
+def get_optional_user(
+    token: str | None = Depends(oauth2_scheme_optional),
+    db: Session = Depends(get_db),
+) -> UserProfile | None:
+    if not token:
+        return None
+    try:
+        return get_current_user(token=token, db=db)
+    except HTTPException:
+        return None
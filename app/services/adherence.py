@@ -0,0 +1,217 @@
+# app/services/adherence.py
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+# =======================================================
+# 복약 순응도 (adherence_daily 일별 집계)
+# =======================================================
+# 통계 요청마다 medication_schedule 원본 행을 세지 않고, 사용자 x 약 x 날짜 집계 행만 읽습니다.
+# 집계는 원본이 바뀔 때 바뀐 칸만 다시 계산합니다 (증감 누적 대신 재계산 → 어긋나도 다음 변경 때 바로잡힘)
+#   - 일정 생성 (schedule_materializer, 챗봇 등록)
+#   - 일정 수정/삭제 (PATCH/DELETE /medication/schedule)
+#   - 알림 확인 (POST /alarms/{id}/read, POST /alarms/read)
+# 반복 일정(medication_regimen)은 저장된 일별 행이 없으므로 조회 구간만 펼쳐서 더합니다.
+#
+# 모든 함수는 커밋하지 않습니다 (원본 변경과 같은 트랜잭션에서 호출)
+
+
+def _pill(name: Optional[str]) -> str:
+    return name or ""
+
+
+def _upsert_cells(db: Session, cells: List[Dict]):
+    """
+    집계 칸 쓰기 - INSERT ... ON DUPLICATE KEY UPDATE
+    🚨 DELETE 후 INSERT 는 같은 칸을 동시에 갱신하면 uq_adherence_daily_user_day_pill 충돌 / 갭 락 교착이 나므로 upsert
+    """
+    from app.models.medication import AdherenceDaily
+
+    if db.get_bind().dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as upsert
+        stmt = upsert(AdherenceDaily)
+        stmt = stmt.on_duplicate_key_update(scheduled=stmt.inserted.scheduled, taken=stmt.inserted.taken)
+    else:
+        # 로컬 SQLite (벤치 / 테스트)
+        from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(AdherenceDaily)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "day", "pill_name"],
+            set_={"scheduled": stmt.excluded.scheduled, "taken": stmt.excluded.taken},
+        )
+    db.execute(stmt, cells)
+
+
+def refresh(db: Session, user_id: int, pill_names: Iterable[Optional[str]], start: date, end: date):
+    """
+    (user_id, pill_names, start~end) 칸을 원본에서 다시 계산
+    - 원본이 있는 칸은 upsert, 원본이 0건이 된 칸만 id 로 삭제 (구간 DELETE 없음)
+    """
+    from app.models.medication import AdherenceDaily, MedicationSchedule
+
+    pills = {_pill(p) for p in pill_names}
+    if not pills:
+        return
+    pill_col = func.coalesce(MedicationSchedule.pill_name, "")
+    rows = db.execute(
+        select(
+            pill_col.label("pill_name"),
+            MedicationSchedule.start_date.label("day"),
+            func.count().label("scheduled"),
+            func.sum(case((MedicationSchedule.is_taken == True, 1), else_=0)).label("taken"),
+        )
+        .where(
+            MedicationSchedule.user_id == user_id,
+            pill_col.in_(pills),
+            MedicationSchedule.start_date >= start,
+            MedicationSchedule.start_date <= end,
+        )
+        .group_by(pill_col, MedicationSchedule.start_date)
+    ).all()
+
+    if rows:
+        _upsert_cells(db, [
+            {"user_id": user_id, "pill_name": r.pill_name, "day": r.day, "scheduled": r.scheduled, "taken": int(r.taken or 0)}
+            for r in rows
+        ])
+
+    present = {(r.pill_name, r.day) for r in rows}
+    stale = [
+        cell.id
+        for cell in db.execute(
+            select(AdherenceDaily.id, AdherenceDaily.pill_name, AdherenceDaily.day).where(
+                AdherenceDaily.user_id == user_id,
+                AdherenceDaily.pill_name.in_(pills),
+                AdherenceDaily.day >= start,
+                AdherenceDaily.day <= end,
+            )
+        )
+        if (cell.pill_name, cell.day) not in present
+    ]
+    if stale:
+        db.execute(
+            delete(AdherenceDaily).where(AdherenceDaily.id.in_(stale)).execution_options(synchronize_session=False)
+        )
+
+
+def refresh_schedules(db: Session, schedule_filter) -> int:
+    """
+    조건에 맞는 일정 행이 속한 칸 다시 계산 (schedule_filter: MedicationSchedule 조건식)
+    예) MedicationSchedule.id.in_(select(Alarm.schedule_id).where(...))
+    """
+    from app.models.medication import MedicationSchedule
+
+    keys = db.execute(
+        select(MedicationSchedule.user_id, MedicationSchedule.pill_name,
+               func.min(MedicationSchedule.start_date), func.max(MedicationSchedule.start_date))
+        .where(schedule_filter)
+        .group_by(MedicationSchedule.user_id, MedicationSchedule.pill_name)
+    ).all()
+
+    # 사용자별로 묶어서 칸 범위 1번씩
+    boxes: Dict[int, list] = {}
+    for user_id, pill_name, first, last in keys:
+        if first is None:
+            continue
+        box = boxes.setdefault(user_id, [set(), first, last])
+        box[0].add(pill_name)
+        box[1], box[2] = min(box[1], first), max(box[2], last)
+    for user_id, (pills, first, last) in boxes.items():
+        refresh(db, user_id, pills, first, last)
+    return len(boxes)
+
+
+def rebuild_all(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """ 백필: 기간 전체(또는 지정 구간)를 INSERT ... SELECT 한 번으로 다시 만듦 """
+    from app.models.medication import AdherenceDaily, MedicationSchedule
+
+    cond = [MedicationSchedule.start_date.isnot(None)]
+    target = []
+    if start:
+        cond.append(MedicationSchedule.start_date >= start)
+        target.append(AdherenceDaily.day >= start)
+    if end:
+        cond.append(MedicationSchedule.start_date <= end)
+        target.append(AdherenceDaily.day <= end)
+
+    pill_col = func.coalesce(MedicationSchedule.pill_name, "")
+    source = (
+        select(
+            MedicationSchedule.user_id,
+            MedicationSchedule.start_date,
+            pill_col,
+            func.count(),
+            func.sum(case((MedicationSchedule.is_taken == True, 1), else_=0)),
+        )
+        .where(*cond)
+        .group_by(MedicationSchedule.user_id, MedicationSchedule.start_date, pill_col)
+    )
+    db.execute(delete(AdherenceDaily).where(*target))
+    result = db.execute(
+        insert(AdherenceDaily).from_select(["user_id", "day", "pill_name", "scheduled", "taken"], source)
+    )
+    return result.rowcount
+
+
+# -------------------------------------------------
+# ✅ 조회
+# -------------------------------------------------
+def _rate(scheduled: int, taken: int) -> Optional[float]:
+    return round(taken / scheduled, 4) if scheduled else None
+
+
+def _period(day: date, group: str) -> date:
+    if group == "week":
+        return day - timedelta(days=day.weekday())
+    if group == "month":
+        return day.replace(day=1)
+    return day
+
+
+def summarize(db: Session, user_ids: List[int], start: date, end: date, group: str = "day") -> Dict:
+    """
+    기간 순응도: 전체 / 약별 / 구성원별 / 기간(day|week|month) 별 scheduled·taken·rate
+    읽는 양은 집계 행 (날짜 x 약) + 반복 일정 전개분
+    """
+    from app.models.medication import AdherenceDaily
+    from app.services.regimen import expand_schedules
+
+    cells: List[Tuple[int, str, date, int, int]] = [
+        (r.user_id, r.pill_name, r.day, r.scheduled, r.taken)
+        for r in db.execute(
+            select(AdherenceDaily.user_id, AdherenceDaily.pill_name, AdherenceDaily.day,
+                   AdherenceDaily.scheduled, AdherenceDaily.taken)
+            .where(AdherenceDaily.user_id.in_(user_ids), AdherenceDaily.day >= start, AdherenceDaily.day <= end)
+        )
+    ]
+    cells += [
+        (occ["user_id"], _pill(occ["pill_name"]), occ["occurrence_date"], 1, 1 if occ["is_taken"] else 0)
+        for occ in expand_schedules(db, user_ids, start, end)
+    ]
+
+    total = [0, 0]
+    by_drug = defaultdict(lambda: [0, 0])
+    by_member = defaultdict(lambda: [0, 0])
+    series = defaultdict(lambda: [0, 0])
+    for user_id, pill_name, day, scheduled, taken in cells:
+        for acc in (total, by_drug[(user_id, pill_name)], by_member[user_id], series[_period(day, group)]):
+            acc[0] += scheduled
+            acc[1] += taken
+
+    def entry(scheduled_taken, **keys):
+        scheduled, taken = scheduled_taken
+        return dict(keys, scheduled=scheduled, taken=taken, rate=_rate(scheduled, taken))
+
+    return {
+        "start": start,
+        "end": end,
+        "group": group,
+        "total": entry(total),
+        "by_member": [entry(by_member[u], user_id=u) for u in sorted(by_member)],
+        "by_drug": [entry(by_drug[k], user_id=k[0], pill_name=k[1]) for k in sorted(by_drug)],
+        "series": [entry(series[p], period=p) for p in sorted(series)],
+    }
@@ -0,0 +1,488 @@
+# app/services/alarm_dispatcher.py
+
+import heapq
+import logging
+import threading
+import time as _time
+from bisect import bisect_right
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+
+from app.services.alarm_notifiers import Notifier, OutboxNotifier, SSENotifier
+
+logger = logging.getLogger("alarm")
+
+# =======================================================
+# 알림 디스패처 (push 방식)
+# =======================================================
+# 클라이언트가 1분마다 /alarms/pending 을 폴링하던 것을 대체합니다.
+# - 앞으로 LOOKAHEAD 안에 울릴 알림만 메모리(분 단위 버킷 인덱스)에 보관
+# - 백그라운드 스레드 1개가 가장 이른 알림 시각까지 잠들었다가 깨어나서
+#   notifier 들에 순서대로 전달 (기본: outbox 기록(영속) → SSE)
+# - 접속하지 않은 사용자는 비용 0, 다시 접속하면 outbox 의 미전달 행을 재전송
+# - 재시작 시 CATCHUP 구간 안에서 outbox 에 없는 알림은 다시 발송 (중복 발송은 outbox 로 방지)
+#
+# 로드는 증분으로만 합니다 (alarms 가 수백만 행이어도 한 번에 읽는 양은 창 크기만큼)
+#   - 최초/재동기화 : (now - CATCHUP, now + LOOKAHEAD] + outbox 대조
+#   - 창 전진       : (loaded_until, now + LOOKAHEAD]           ← ix_alarms_alarm_time
+#   - 새로 생긴 행  : id > 마지막으로 본 id (창 안에 있는 것만)  ← PK
+#   - reload() 후   : (now, now + LOOKAHEAD] 재조회                ← ix_alarms_alarm_time
+#     🚨 id 는 INSERT 시점에 정해지고 커밋은 늦을 수 있어서, 더 큰 id 가 먼저 보이면
+#        늦게 커밋된 작은 id 는 워터마크로 못 잡음 → 아직 울리지 않은 구간을 다시 읽어 보완
+#   - 레지멘 알림   : REGIMEN_HORIZON 만큼 한 번 전개해 정렬 목록으로 보관, 창만큼 잘라서 추가
+
+LOOKAHEAD = timedelta(minutes=10)
+REFRESH_INTERVAL_SECONDS = 60
+CATCHUP = timedelta(minutes=30)
+REGIMEN_HORIZON = timedelta(hours=6)
+MAX_BATCH = 2000
+
+_EPOCH = datetime(1970, 1, 1)
+_MINUTE = timedelta(minutes=1)
+
+# 인덱스에 넣는 항목 (payload dict 는 발송 시점에만 생성)
+#   (id, user_id, schedule_id, regimen_id, alarm_time, message, pill_name)
+Entry = Tuple[Optional[int], int, Optional[int], Optional[int], datetime, Optional[str], Optional[str]]
+
+
+def _alarm_key(entry: Entry) -> tuple:
+    return ("a", entry[0]) if entry[0] is not None else ("r", entry[3], entry[4])
+
+
+def _alarm_payload(entry: Entry) -> Dict:
+    alarm_id, user_id, schedule_id, regimen_id, alarm_time, message, pill_name = entry
+    return {
+        "id": alarm_id,
+        "user_id": user_id,
+        "schedule_id": schedule_id,
+        "regimen_id": regimen_id,
+        "occurrence_date": alarm_time.date().isoformat() if regimen_id else None,
+        "alarm_time": alarm_time.isoformat(),
+        "message": message or "",
+        "is_read": False,
+        "pill_name": pill_name,
+        "kind": "a" if alarm_id is not None else "r",
+    }
+
+
+# =======================================================
+# 분 단위 버킷 인덱스
+# =======================================================
+class DueIndex:
+    """
+    minute → [(alarm_time, key, entry)] 버킷 + 분 키 min-heap
+    - 추가 O(1) (새 분일 때만 heap push), 같은 분 알림 수만큼 heap 이 커지지 않음
+    - pop_due 는 지난 분 버킷을 통째로 꺼내고 현재 분 버킷만 시각 비교
+    - remove 는 지연 삭제 (키만 지우고 꺼낼 때 건너뜀)
+    """
+
+    def __init__(self):
+        self._buckets: Dict[int, List[Tuple[datetime, tuple, Entry]]] = {}
+        self._minutes: List[int] = []
+        self._keys: Set[tuple] = set()
+
+    @staticmethod
+    def _minute(when: datetime) -> int:
+        return (when - _EPOCH) // _MINUTE
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._keys
+
+    def add(self, when: datetime, key: tuple, entry: Entry) -> bool:
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        m = self._minute(when)
+        bucket = self._buckets.get(m)
+        if bucket is None:
+            bucket = self._buckets[m] = []
+            heapq.heappush(self._minutes, m)
+        bucket.append((when, key, entry))
+        return True
+
+    def remove(self, key: tuple):
+        self._keys.discard(key)
+
+    def pop_due(self, now: datetime, limit: Optional[int] = None) -> List[Tuple[tuple, Entry]]:
+        due: List[Tuple[tuple, Entry]] = []
+        current = self._minute(now)
+        while self._minutes and self._minutes[0] <= current:
+            if limit is not None and len(due) >= limit:
+                break
+            m = self._minutes[0]
+            bucket = self._buckets[m]
+            if m < current:
+                ready, rest = bucket, []
+            else:
+                ready = [b for b in bucket if b[0] <= now]
+                rest = [b for b in bucket if b[0] > now]
+            if limit is not None and len(due) + len(ready) > limit:
+                # 한 번에 너무 많이 꺼내지 않도록 (나머지는 다음 tick)
+                ready.sort(key=lambda b: b[0])
+                cut = limit - len(due)
+                ready, rest = ready[:cut], ready[cut:] + rest
+            for _, key, entry in ready:
+                if key in self._keys:
+                    self._keys.discard(key)
+                    due.append((key, entry))
+            if rest:
+                self._buckets[m] = rest
+                break
+            heapq.heappop(self._minutes)
+            del self._buckets[m]
+        return due
+
+    def next_due(self) -> Optional[datetime]:
+        while self._minutes:
+            live = [b[0] for b in self._buckets[self._minutes[0]] if b[1] in self._keys]
+            if live:
+                return min(live)
+            del self._buckets[heapq.heappop(self._minutes)]
+        return None
+
+
+class AlarmDispatcher:
+
+    def __init__(
+        self,
+        session_factory=None,
+        lookahead: timedelta = LOOKAHEAD,
+        refresh_interval: float = REFRESH_INTERVAL_SECONDS,
+        notifiers: Optional[List[Notifier]] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.session_factory = session_factory
+        self.lookahead = lookahead
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+
+        if notifiers is None:
+            self.outbox: Optional[OutboxNotifier] = OutboxNotifier(session_factory)
+            self.sse: Optional[SSENotifier] = SSENotifier()
+            notifiers = [self.outbox, self.sse]
+        else:
+            self.outbox = next((n for n in notifiers if isinstance(n, OutboxNotifier)), None)
+            self.sse = next((n for n in notifiers if isinstance(n, SSENotifier)), None)
+        self.notifiers: List[Notifier] = notifiers
+
+        self._index = DueIndex()
+        self._loaded_until: Optional[datetime] = None
+        self._last_alarm_id = 0
+        self._resync = True
+        self._rescan = False
+
+        # 레지멘 알림 전개 결과 (alarm_time 정렬) - _regimen_times 는 bisect 용
+        self._regimen_entries: List[Entry] = []
+        self._regimen_times: List[datetime] = []
+        self._regimen_until: Optional[datetime] = None
+        self._regimen_dirty = True
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.fired = 0
+        self.dropped = 0
+        self.loaded = 0
+        self._fire_seconds = 0.0
+        self._lags: deque = deque(maxlen=1000)
+
+    # ---------------------------------------------
+    # 시작 / 종료
+    # ---------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.session_factory is None:
+                from app.db import SessionLocal
+                self.session_factory = SessionLocal
+            if self.outbox is not None and self.outbox.session_factory is None:
+                self.outbox.session_factory = self.session_factory
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alarm-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def reload(self, full: bool = False):
+        """
+        알림이 새로 생기거나 바뀌었을 때 (일정 등록/삭제, 레지멘 변경) 즉시 다시 읽기
+        - 일반 알림은 id 워터마크 + 아직 울리지 않은 구간 재조회 (늦게 커밋된 작은 id 보완)
+        - 레지멘은 전개 결과를 다시 만들어야 하므로 표시
+        """
+        with self._lock:
+            self._regimen_dirty = True
+            self._rescan = True
+            if full:
+                self._resync = True
+        self._wakeup.set()
+
+    # ---------------------------------------------
+    # 구독 (SSE 연결) / outbox 조회 - notifier 로 위임
+    # ---------------------------------------------
+    def subscribe(self, user_id: int):
+        return self.sse.subscribe(user_id)
+
+    def unsubscribe(self, user_id: int, queue):
+        self.sse.unsubscribe(user_id, queue)
+
+    def connected(self, user_id: int) -> bool:
+        return self.sse is not None and user_id in self.sse._subscribers
+
+    def undelivered(self, db, user_id: int, limit: int = 100) -> List[Dict]:
+        return self.outbox.undelivered(db, user_id, limit)
+
+    def mark_delivered(self, db, outbox_ids: List[int]):
+        self.outbox.mark_delivered(db, outbox_ids)
+
+    def acknowledge(self, db, alarm_ids: List[int] = (), regimen_id: Optional[int] = None, until: Optional[datetime] = None):
+        """ 확인된 알림은 인덱스에서도 빼고 outbox 미전달 행도 닫음 (커밋은 호출 측) """
+        with self._lock:
+            for alarm_id in alarm_ids:
+                self._index.remove(("a", alarm_id))
+            if regimen_id is not None:
+                self._regimen_dirty = True
+        if self.outbox is not None:
+            self.outbox.acknowledge(db, alarm_ids, regimen_id, until)
+
+    # ---------------------------------------------
+    # 로드 (증분)
+    # ---------------------------------------------
+    def poll(self, now: Optional[datetime] = None) -> int:
+        """ 창을 now + LOOKAHEAD 까지 전진시키고 새 알림을 인덱스에 추가, 추가 수 반환 """
+        from app.models.alarm import Alarm, AlarmOutbox
+        from app.models.medication import MedicationSchedule
+
+        now = now or self.clock()
+        until = now + self.lookahead
+        floor = now - CATCHUP
+        with self._lock:
+            resync = self._resync or self._loaded_until is None
+            since = floor if resync else max(self._loaded_until, floor)
+            last_id = self._last_alarm_id
+            rescan, self._rescan = self._rescan, False
+
+        base = (
+            select(Alarm.id, Alarm.user_id, Alarm.schedule_id, Alarm.alarm_time, Alarm.message,
+                   MedicationSchedule.pill_name)
+            .join(MedicationSchedule, Alarm.schedule_id == MedicationSchedule.id)
+            .where(Alarm.is_read == False)
+        )
+
+        entries: List[Entry] = []
+        db = self.session_factory()
+        try:
+            max_id = db.scalar(select(func.max(Alarm.id))) or 0
+            if resync:
+                # 재시작 직후: 이미 발송한 알림(outbox)은 제외
+                stmt = base.outerjoin(AlarmOutbox, AlarmOutbox.alarm_id == Alarm.id).where(
+                    Alarm.alarm_time > since, Alarm.alarm_time <= until, Alarm.id <= max_id,
+                    AlarmOutbox.id.is_(None),
+                )
+            else:
+                # 창 전진분 + 마지막 로드 이후 생긴 행 (outbox 에 있을 수 없음)
+                # reload() 뒤에는 아직 울리지 않은 구간 전체 (이미 인덱스에 있는 키는 DueIndex 가 무시)
+                lower = min(now, since) if rescan else since
+                stmt = base.where(
+                    Alarm.alarm_time <= until,
+                    ((Alarm.alarm_time > lower) & (Alarm.id <= max_id))
+                    | ((Alarm.id > last_id) & (Alarm.id <= max_id) & (Alarm.alarm_time > floor)),
+                )
+            entries += [(r[0], r[1], r[2], None, r[3], r[4], r[5]) for r in db.execute(stmt)]
+            entries += self._regimen_window(db, now, since, until, resync)
+        except Exception:
+            if rescan:
+                with self._lock:
+                    self._rescan = True
+            raise
+        finally:
+            db.close()
+
+        added = 0
+        with self._lock:
+            for e in entries:
+                added += self._index.add(e[4], _alarm_key(e), e)
+            self._loaded_until = until
+            self._last_alarm_id = max(last_id, max_id)
+            self._resync = False
+            self.loaded += added
+        return added
+
+    def _regimen_window(self, db, now: datetime, since: datetime, until: datetime, resync: bool) -> List[Entry]:
+        """ 레지멘 알림 중 (since, until] 구간 (전개는 REGIMEN_HORIZON 마다 또는 변경 시에만) """
+        from app.models.alarm import AlarmOutbox
+        from app.services.regimen import expand_alarms
+
+        with self._lock:
+            dirty = self._regimen_dirty
+            self._regimen_dirty = False
+        if dirty or self._regimen_until is None or self._regimen_until < until:
+            start = now - CATCHUP
+            horizon = max(until, now + REGIMEN_HORIZON)
+            rows = [a for a in expand_alarms(db, None, start, horizon) if not a["is_read"]]
+            if rows:
+                sent = set(db.execute(
+                    select(AlarmOutbox.regimen_id, AlarmOutbox.alarm_time).where(
+                        AlarmOutbox.regimen_id.in_({a["regimen_id"] for a in rows}),
+                        AlarmOutbox.alarm_time > start,
+                        AlarmOutbox.alarm_time <= horizon,
+                    )
+                ).all())
+                rows = [a for a in rows if (a["regimen_id"], a["alarm_time"]) not in sent]
+            rows.sort(key=lambda a: a["alarm_time"])
+            entries = [
+                (None, a["user_id"], None, a["regimen_id"], a["alarm_time"], a.get("message"), a.get("pill_name"))
+                for a in rows
+            ]
+            # 삭제/확인된 레지멘 알림은 인덱스에서도 제거
+            stale = {_alarm_key(e) for e in self._regimen_entries} - {_alarm_key(e) for e in entries}
+            with self._lock:
+                for key in stale:
+                    self._index.remove(key)
+            self._regimen_entries = entries
+            self._regimen_times = [e[4] for e in self._regimen_entries]
+            self._regimen_until = horizon
+            # 전개를 새로 했으면 창 전체를 다시 넣음 (이미 인덱스에 있는 키는 DueIndex 가 무시)
+            since = now - CATCHUP
+        elif resync:
+            since = now - CATCHUP
+
+        lo = bisect_right(self._regimen_times, since)
+        hi = bisect_right(self._regimen_times, until)
+        return self._regimen_entries[lo:hi]
+
+    # ---------------------------------------------
+    # 발송
+    # ---------------------------------------------
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """ 시각이 된 알림을 MAX_BATCH 씩 notifier 에 전달, 발송 수 반환 (실패한 배치는 인덱스로 복귀) """
+        now = now or self.clock()
+        sent = 0
+        while True:
+            with self._lock:
+                due = self._index.pop_due(now, MAX_BATCH)
+            if not due:
+                return sent
+            fired = self._fire(due, now)
+            if fired is None:
+                return sent
+            sent += fired
+
+    def _fire(self, due: List[Tuple[tuple, Entry]], now: datetime) -> Optional[int]:
+        from app.models.alarm import Alarm
+
+        started = _time.perf_counter()
+
+        # 인덱스에 넣은 뒤 삭제되었거나 이미 확인된 알림은 제외
+        alarm_ids = [key[1] for key, _ in due if key[0] == "a"]
+        if alarm_ids:
+            db = self.session_factory()
+            try:
+                alive = set(db.execute(
+                    select(Alarm.id).where(Alarm.id.in_(alarm_ids), Alarm.is_read == False)
+                ).scalars())
+            except Exception as e:
+                logger.error(f"[ALARM] revalidate failed ({len(due)} alarms), will retry: {e}")
+                self._requeue(due)
+                return None
+            finally:
+                db.close()
+            kept = [(key, e) for key, e in due if key[0] != "a" or key[1] in alive]
+            self.dropped += len(due) - len(kept)
+            due = kept
+        if not due:
+            return 0
+
+        payloads = [_alarm_payload(e) for _, e in due]
+        for i, notifier in enumerate(self.notifiers):
+            try:
+                notifier.notify(payloads)
+            except Exception as e:
+                if i == 0:
+                    # 첫 notifier(영속 단계)가 실패하면 배치 전체 재시도
+                    logger.error(f"[ALARM] {notifier.name} failed ({len(due)} alarms), will retry: {e}")
+                    self._requeue(due)
+                    return None
+                logger.error(f"[ALARM] {notifier.name} failed ({len(due)} alarms): {e}")
+
+        # outbox 가 다른 프로세스에 진 알림을 뺐으면 그만큼 발송 수에서 제외
+        with self._lock:
+            self.fired += len(payloads)
+            self.dropped += len(due) - len(payloads)
+            self._fire_seconds += _time.perf_counter() - started
+            for _, e in due:
+                self._lags.append((now - e[4]).total_seconds())
+        return len(payloads)
+
+    def _requeue(self, due: List[Tuple[tuple, Entry]]):
+        with self._lock:
+            for key, e in due:
+                self._index.add(e[4], key, e)
+
+    def _run(self):
+        next_refresh = datetime.min
+        while not self._stop.is_set():
+            now = self.clock()
+            if now >= next_refresh:
+                try:
+                    self.poll(now)
+                except Exception as e:
+                    logger.error(f"[ALARM] load failed: {e}")
+                next_refresh = now + timedelta(seconds=self.refresh_interval)
+
+            self.tick()
+
+            # 다음 알림 시각 또는 다음 로드 시각까지 대기 (reload() / stop() 이 깨움)
+            with self._lock:
+                next_due = self._index.next_due()
+            wake_at = min(next_due, next_refresh) if next_due else next_refresh
+            timeout = (wake_at - self.clock()).total_seconds()
+            if timeout <= 0:
+                # 방금 tick 뒤에도 시각이 지난 알림이 남아 있으면 발송 실패 → 잠시 후 재시도
+                timeout = 1.0
+            if self._wakeup.wait(timeout):
+                # reload(): 새 행을 바로 읽도록 다음 로드를 앞당김
+                next_refresh = datetime.min
+            self._wakeup.clear()
+
+    # ---------------------------------------------
+    # 상태
+    # ---------------------------------------------
+    def stats(self) -> Dict:
+        with self._lock:
+            lags = sorted(self._lags)
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "scheduled": len(self._index),
+                "loaded_until": self._loaded_until.isoformat() if self._loaded_until else None,
+                "last_alarm_id": self._last_alarm_id,
+                "regimen_cached": len(self._regimen_entries),
+                "loaded": self.loaded,
+                "fired": self.fired,
+                "dropped": self.dropped,
+                "dispatch_per_sec": round(self.fired / self._fire_seconds, 1) if self._fire_seconds else None,
+                "lag_p50_s": lags[len(lags) // 2] if lags else None,
+                "lag_max_s": lags[-1] if lags else None,
+                "notifiers": {n.name: n.stats() for n in self.notifiers},
+            }
+
+
+_alarm_dispatcher = AlarmDispatcher()
+
+
+def get_alarm_dispatcher() -> AlarmDispatcher:
+    return _alarm_dispatcher
@@ -0,0 +1,218 @@
+# app/services/alarm_notifiers.py
+
+import asyncio
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Protocol, Set, Tuple
+
+from sqlalchemy import insert, or_, select, tuple_, update
+
+logger = logging.getLogger("alarm")
+
+# =======================================================
+# 알림 발송 수단 (디스패처가 시각이 된 알림 묶음을 순서대로 전달)
+# =======================================================
+# notify(alarms) 는 같은 배치의 payload dict 목록을 받습니다.
+#   - 앞 단계 notifier 가 payload 에 값을 채울 수 있음 (예: outbox → outbox_id)
+#   - 앞 단계 notifier 가 목록에서 뺀 알림은 다음 단계로 가지 않음 (예: 다른 프로세스가 이미 기록한 알림)
+#   - 예외를 던지면 디스패처가 배치 전체를 다시 시도 (영속 단계는 맨 앞에 둘 것)
+#
+#   OutboxNotifier : alarm_outbox 에 기록 (재시작/미접속 사용자 재전송 근거)
+#   SSENotifier    : 접속 중인 사용자 asyncio 큐로 전달
+#   FakeNotifier   : 메모리에 쌓기만 함 (벤치마크/점검용)
+
+
+class Notifier(Protocol):
+    name: str
+
+    def notify(self, alarms: List[Dict]) -> None:
+        ...
+
+    def stats(self) -> Dict:
+        ...
+
+
+# -------------------------------------------------
+# ✅ outbox (영속)
+# -------------------------------------------------
+class OutboxNotifier:
+    name = "outbox"
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self.written = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _insert_ignore(db):
+        """ 유니크 키(alarm_id / regimen_id+alarm_time)가 겹치는 행은 건너뛰는 INSERT """
+        from app.models.alarm import AlarmOutbox
+
+        if db.get_bind().dialect.name == "mysql":
+            return insert(AlarmOutbox.__table__).prefix_with("IGNORE")
+        # 로컬 SQLite (벤치 / 테스트)
+        return insert(AlarmOutbox.__table__).prefix_with("OR IGNORE")
+
+    def notify(self, alarms: List[Dict]):
+        from app.models.alarm import AlarmOutbox
+
+        rows = [
+            {
+                "user_id": a["user_id"],
+                "alarm_id": a["id"],
+                "regimen_id": a["regimen_id"],
+                "alarm_time": datetime.fromisoformat(a["alarm_time"]),
+                "payload": json.dumps(a, ensure_ascii=False),
+            }
+            for a in alarms
+        ]
+        db = self.session_factory()
+        try:
+            stmt = self._insert_ignore(db)
+            won = [True] * len(rows)
+            if db.execute(stmt, rows).rowcount != len(rows):
+                # 🚨 다른 프로세스가 이미 기록한 알림이 섞여 있음 → 한 행씩 다시 기록해서 이긴 행만 남김
+                db.rollback()
+                won = [db.execute(stmt, r).rowcount == 1 for r in rows]
+            db.commit()
+
+            # 방금 기록한 행 id (MySQL 은 RETURNING 미지원 → 유니크 키로 한 번 조회)
+            alarm_ids = [r["alarm_id"] for r in rows if r["alarm_id"]]
+            occurrences = [(r["regimen_id"], r["alarm_time"]) for r in rows if not r["alarm_id"]]
+            cond = []
+            if alarm_ids:
+                cond.append(AlarmOutbox.alarm_id.in_(alarm_ids))
+            if occurrences:
+                cond.append(tuple_(AlarmOutbox.regimen_id, AlarmOutbox.alarm_time).in_(occurrences))
+            written = db.execute(
+                select(AlarmOutbox.id, AlarmOutbox.alarm_id, AlarmOutbox.regimen_id, AlarmOutbox.alarm_time)
+                .where(or_(*cond))
+            ).all()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        by_key = {}
+        for r in written:
+            by_key[("a", r.alarm_id) if r.alarm_id else ("r", r.regimen_id, r.alarm_time)] = r.id
+        kept = []
+        for a, r, ok in zip(alarms, rows, won):
+            if not ok:
+                continue
+            key = ("a", a["id"]) if a["id"] else ("r", a["regimen_id"], r["alarm_time"])
+            a["outbox_id"] = by_key.get(key)
+            kept.append(a)
+        # 진 행은 다음 notifier(SSE)로 넘기지 않음 (이긴 프로세스가 보냄)
+        self.skipped += len(alarms) - len(kept)
+        alarms[:] = kept
+        self.written += len(kept)
+
+    # ---------------------------------------------
+    # 조회 / 전달 확인 (SSE 엔드포인트, 읽음 처리에서 사용)
+    # ---------------------------------------------
+    def undelivered(self, db, user_id: int, limit: int = 100) -> List[Dict]:
+        from app.models.alarm import AlarmOutbox
+
+        stmt = (
+            select(AlarmOutbox.id, AlarmOutbox.payload)
+            .where(AlarmOutbox.user_id == user_id, AlarmOutbox.delivered_at.is_(None))
+            .order_by(AlarmOutbox.id)
+            .limit(limit)
+        )
+        return [dict(json.loads(r.payload), outbox_id=r.id) for r in db.execute(stmt)]
+
+    def mark_delivered(self, db, outbox_ids: List[int]):
+        from app.models.alarm import AlarmOutbox
+
+        ids = [i for i in outbox_ids if i]
+        if not ids:
+            return
+        db.execute(update(AlarmOutbox).where(AlarmOutbox.id.in_(ids)).values(delivered_at=datetime.now()))
+        db.commit()
+
+    def acknowledge(self, db, alarm_ids: List[int] = (), regimen_id: Optional[int] = None, until: Optional[datetime] = None):
+        """ 알림을 확인(읽음) 처리하면 아직 전달되지 않은 outbox 행도 재전송하지 않도록 닫음 (커밋은 호출 측) """
+        from app.models.alarm import AlarmOutbox
+
+        now = datetime.now()
+        if alarm_ids:
+            db.execute(update(AlarmOutbox).where(
+                AlarmOutbox.alarm_id.in_(list(alarm_ids)), AlarmOutbox.delivered_at.is_(None)
+            ).values(delivered_at=now))
+        if regimen_id is not None and until is not None:
+            db.execute(update(AlarmOutbox).where(
+                AlarmOutbox.regimen_id == regimen_id,
+                AlarmOutbox.alarm_time <= until,
+                AlarmOutbox.delivered_at.is_(None),
+            ).values(delivered_at=now))
+
+    def stats(self) -> Dict:
+        return {"written": self.written, "skipped": self.skipped}
+
+
+# -------------------------------------------------
+# ✅ SSE (접속 중인 사용자)
+# -------------------------------------------------
+class SSENotifier:
+    name = "sse"
+
+    def __init__(self):
+        # user_id → {(loop, queue)}
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+        self.pushed = 0
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """ 이벤트 루프 안에서 호출 """
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subs = self._subscribers.get(user_id)
+            if not subs:
+                return
+            subs.difference_update({s for s in subs if s[1] is queue})
+            if not subs:
+                del self._subscribers[user_id]
+
+    def notify(self, alarms: List[Dict]):
+        with self._lock:
+            if not self._subscribers:
+                return
+            for a in alarms:
+                for loop, queue in self._subscribers.get(a["user_id"], ()):
+                    loop.call_soon_threadsafe(queue.put_nowait, a)
+                    self.pushed += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"subscribers": sum(len(s) for s in self._subscribers.values()), "pushed": self.pushed}
+
+
+# -------------------------------------------------
+# ✅ 메모리 (벤치마크/점검용)
+# -------------------------------------------------
+class FakeNotifier:
+    name = "fake"
+
+    def __init__(self, keep: bool = True):
+        self.keep = keep
+        self.sent: List[Dict] = []
+        self.count = 0
+        self.batches = 0
+
+    def notify(self, alarms: List[Dict]):
+        self.count += len(alarms)
+        self.batches += 1
+        if self.keep:
+            self.sent.extend(alarms)
+
+    def stats(self) -> Dict:
+        return {"sent": self.count, "batches": self.batches}
@@ -1,6 +1,9 @@
-def determine_alert_level(confidence: dict, comparison: dict | None = None):
+LEVEL_PRIORITY = {"NORMAL": 0, "CAUTION": 1, "WARNING": 2, "BLOCKED": 3}
+
+
+def determine_alert_level(confidence: dict, comparison: dict | None = None, safety: dict | None = None):
     """
-    OCR 신뢰도 + 비교 결과 기반 alert 레벨 생성
+    OCR 신뢰도 + 비교 결과 + (선택) DUR 안전성 점검 결과 기반 alert 레벨 생성
     """
 
     # ① 비교 결과가 위험하면 최우선 차단
@@ -12,19 +15,27 @@ def determine_alert_level(confidence: dict, comparison: dict | None = None):
 
     # ② OCR 신뢰도 기준
     if confidence["level"] == "LOW":
-        return {
+        alert = {
             "level": "WARNING",
             "reason": "OCR 인식 정확도가 낮습니다."
         }
-
-    if confidence["level"] == "MEDIUM":
-        return {
+    elif confidence["level"] == "MEDIUM":
+        alert = {
             "level": "CAUTION",
             "reason": "OCR 인식 정확도가 보통 수준입니다."
         }
+    else:
+        # ③ 문제 없음
+        alert = {
+            "level": "NORMAL",
+            "reason": None
+        }
+
+    # ④ DUR 점검 결과가 더 심각하면 그 결과를 우선
+    if safety and LEVEL_PRIORITY.get(safety.get("level"), 0) > LEVEL_PRIORITY[alert["level"]]:
+        alert = {
+            "level": safety["level"],
+            "reason": safety.get("reason")
+        }
 
-    # ③ 문제 없음
-    return {
-        "level": "NORMAL",
-        "reason": None
-    }
+    return alert
@@ -1,6 +1,113 @@
 # app/services/calendar_builder.py
 
-from datetime import datetime, date, timedelta
+# 복용 시각 x 날짜 확장 엔진
+# - "HH:MM" 은 스케줄마다 한 번만 파싱해 자정 기준 분(minute) 오프셋 배열로 만들고
+# - 날짜 x 시각 조합은 NumPy datetime64 브로드캐스트 한 번으로 계산 (날짜 x 시각마다 datetime 생성 X)
+# - 긴 기간은 chunk_days 단위로 잘라 생성하는 제너레이터(iter_*)로 스트리밍
+
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_TIME = "09:00"
+CHUNK_DAYS = 31
+
+
+# -------------------------------------------------
+# ✅ 확장 엔진 (schedule_builder 와 공용)
+# -------------------------------------------------
+def parse_time_offset(raw_time) -> Tuple[str, int]:
+    """ "HH:MM" → (원본 문자열, 자정 기준 분) - 형식이 틀리면 DEFAULT_TIME """
+    if isinstance(raw_time, str) and ":" in raw_time:
+        try:
+            hour, minute = map(int, raw_time.split(":"))
+            if 0 <= hour < 24 and 0 <= minute < 60:
+                return raw_time, hour * 60 + minute
+        except (ValueError, AttributeError):
+            pass
+    hour, minute = map(int, DEFAULT_TIME.split(":"))
+    return DEFAULT_TIME, hour * 60 + minute
+
+
+def expand_offsets(start_date: date, days: int, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (날짜 배열 datetime64[D], 일시 배열 datetime64[m]) - 일시는 (days, len(offsets)) 모양
+    행 순서 = 날짜, 열 순서 = offsets 순서 (기존 이중 루프 순서와 동일)
+    """
+    day_arr = np.datetime64(start_date, "D") + np.arange(days)
+    when = day_arr.astype("datetime64[m]")[:, None] + offsets.astype("timedelta64[m]")[None, :]
+    return day_arr, when
+
+
+def iter_offset_chunks(start_date: date, days: int, offsets: np.ndarray, chunk_days: int = CHUNK_DAYS
+                       ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """ expand_offsets 를 chunk_days 씩 나눠 생성 (메모리 사용량이 기간과 무관) """
+    for first in range(0, days, chunk_days):
+        yield expand_offsets(start_date + timedelta(days=first), min(chunk_days, days - first), offsets)
+
+
+# -------------------------------------------------
+# ✅ 캘린더 이벤트
+# -------------------------------------------------
+def _default_alert(alert_level: Optional[dict]) -> dict:
+    # ✅ 기본 alert_level (없으면 NORMAL)
+    if alert_level is None:
+        return {"level": "NORMAL", "reason": None}
+    return alert_level
+
+
+def _compile_schedules(schedules: list) -> Tuple[List[Dict], np.ndarray]:
+    """ 스케줄마다 날짜와 무관한 값(시각/제목/알림 여부)을 한 번만 계산 """
+    static, offsets = [], []
+    for s in schedules:
+        # 🚨 time 키가 없거나 값이 부적절할 경우 09:00
+        raw_time, offset = parse_time_offset(s.get("time") or DEFAULT_TIME)
+        static.append({
+            "time": raw_time,
+            "title": s.get("label") or s.get("drug_name") or "약 복용",
+            "notify": s.get("notify", True),
+        })
+        offsets.append(offset)
+    return static, np.array(offsets, dtype=np.int64)
+
+
+def iter_calendar_events(
+    schedules: list,
+    start_date: date = None,
+    days: int = 1,
+    alert_level: dict | None = None,
+    chunk_days: int = CHUNK_DAYS,
+) -> Iterator[Dict]:
+    """
+    build_calendar_events 의 제너레이터 버전 (긴 기간 스트리밍용, 같은 순서/같은 값)
+    """
+    if start_date is None:
+        start_date = date.today()
+    alert_level = _default_alert(alert_level)
+    if not schedules or days <= 0:
+        return
+
+    static, offsets = _compile_schedules(schedules)
+    level, reason = alert_level["level"], alert_level.get("reason")
+
+    for day_arr, when in iter_offset_chunks(start_date, days, offsets, chunk_days):
+        date_strs = np.datetime_as_string(day_arr, unit="D").tolist()
+        when_strs = np.datetime_as_string(when, unit="s").tolist()
+        for date_str, row in zip(date_strs, when_strs):
+            for s, dt_str in zip(static, row):
+                yield {
+                    # ✅ 기존 필드
+                    "datetime": dt_str,
+                    "date": date_str,
+                    "time": s["time"],
+                    "title": s["title"],
+                    "notify": s["notify"],
+
+                    # ✅ 핵심 추가
+                    "alert_level": level,
+                    "alert_reason": reason,
+                }
 
 
 def build_calendar_events(
@@ -12,53 +119,4 @@ def build_calendar_events(
     """
     복용 시간 목록을 날짜 기준 이벤트로 확장
     """
-
-    if start_date is None:
-        start_date = date.today()
-
-    # ✅ 기본 alert_level (없으면 NORMAL)
-    if alert_level is None:
-        alert_level = {
-            "level": "NORMAL",
-            "reason": None
-        }
-
-    events = []
-
-    for day_offset in range(days):
-        current_date = start_date + timedelta(days=day_offset)
-
-        for s in schedules:
-            # 🚨 1. time 키가 없거나 값이 부적절할 경우를 대비한 예외 처리
-            raw_time = s.get("time") or "09:00"
-            if not isinstance(raw_time, str) or ":" not in raw_time:
-                raw_time = "09:00"
-
-            try:
-                hour, minute = map(int, raw_time.split(":"))
-            except (ValueError, AttributeError):
-                hour, minute = 9, 0
-                raw_time = "09:00"
-
-            event_datetime = datetime(
-                year=current_date.year,
-                month=current_date.month,
-                day=current_date.day,
-                hour=hour,
-                minute=minute
-            )
-
-            events.append({
-                # ✅ 기존 필드
-                "datetime": event_datetime.isoformat(),
-                "date": current_date.isoformat(),
-                "time": raw_time,
-                "title": s.get("label") or s.get("drug_name") or "약 복용",
-                "notify": s.get("notify", True),
-
-                # ✅ 핵심 추가
-                "alert_level": alert_level["level"],
-                "alert_reason": alert_level.get("reason")
-            })
-
-    return events
+    return list(iter_calendar_events(schedules, start_date, days, alert_level))
@@ -0,0 +1,201 @@
+# app/services/chat_intent.py
+
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+# =======================================================
+# 복약 일정 등록 의도 / 슬롯 추출 (규칙 기반)
+# =======================================================
+# "타이레놀 내일 아침 8시에 2정 먹을게 등록해줘" 같은 자주 쓰는 표현은
+# LLM 없이 바로 create_schedule 로 등록합니다.
+# 조금이라도 애매하면(None 반환) 기존대로 LLM 이 처리합니다.
+
+REGISTER_RE = re.compile(r"등록|추가해|저장해|알림|알람|먹을게|먹을께|복용할게|복용할께|챙겨")
+# 부정/취소/질문형은 규칙으로 처리하지 않음
+REJECT_RE = re.compile(r"취소|삭제|빼줘|말고|하지\s*마|안\s*먹|못\s*먹|꺼|끄|해제|중지|중단|멈춰|그만|"
+                       r"\?|할까|될까|돼요|되나|어떻게|언제")
+
+# 🚨 긴 단어부터 비교 ("내일모레" 가 "내일" 로 잡히지 않도록)
+DAY_WORDS = {"내일모레": 2, "오늘": 0, "내일": 1, "모레": 2, "글피": 3}
+WEEKDAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 시간대 단어 → 기본 시각 (schedule_builder.BASE_TIMES 와 동일한 기준)
+TIME_WORDS = {"아침": "09:00", "점심": "13:00", "저녁": "19:00", "자기 전": "22:30", "자기전": "22:30",
+              "취침 전": "22:30", "취침전": "22:30"}
+
+DRUG_SUFFIXES = ("정", "캡슐", "시럽", "정제", "연질캡슐", "액", "현탁액", "과립", "산")
+# 제형 접미사로 끝나지만 약 이름이 아닌 흔한 단어 ("알림 설정", "수정해줘" 등)
+COMMON_NOUNS = {"설정", "예정", "결정", "수정", "계산", "일정", "확인", "안정", "인정", "지정", "걱정", "예산", "생산",
+                "결산", "재산", "시정", "조정", "측정", "과정", "감정", "작정", "액정", "금액", "잔액", "전액"}
+
+_WEEKDAY_RE = re.compile(r"(다음\s*주\s*)?([월화수목금토일])요일")
+_MONTH_DAY_RE = re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+_DAYS_LATER_RE = re.compile(r"(\d{1,2})\s*일\s*(후|뒤)")
+_PERIOD = r"(오전|오후|아침|점심|저녁|밤)"
+_CLOCK_RE = re.compile(_PERIOD + r"?\s*(\d{1,2})\s*시(?!간)\s*(반|(\d{1,2})\s*분)?")
+_PERIOD_BEFORE_RE = re.compile(_PERIOD + r"\s*$")
+_HHMM_RE = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)\b")
+_DOSE_RE = re.compile(r"(?<![\w.])(\d+(?:\.\d+)?)\s*(정|알|캡슐|포|mg|ml|밀리)")
+_PARTICLE_RE = re.compile(r"(이랑|하고|이나|은|는|이|가|을|를|도|좀|랑|에)$")
+_NON_DRUG_RE = re.compile(r"^(오늘|내일|모레|글피|다음|주|아침|점심|저녁|자기|취침|전|밤|오전|오후|매일|약|복약|일정|알림|알람|"
+                          r"등록|등록해줘|등록해|추가해줘|먹을게|먹을께|복용할게|챙겨줘|해줘|부탁해|시에|\d.*)$")
+
+
+# -------------------------------------------------
+# ✅ 슬롯 추출
+# -------------------------------------------------
+def parse_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    today = today or date.today()
+
+    for word, offset in sorted(DAY_WORDS.items(), key=lambda kv: -len(kv[0])):
+        if word in text:
+            return today + timedelta(days=offset)
+
+    m = _DAYS_LATER_RE.search(text)
+    if m:
+        return today + timedelta(days=int(m.group(1)))
+
+    m = _MONTH_DAY_RE.search(text)
+    if m:
+        month, day = int(m.group(1)), int(m.group(2))
+        try:
+            target = date(today.year, month, day)
+        except ValueError:
+            return None
+        # 이미 지난 날짜면 내년으로
+        return target if target >= today else date(today.year + 1, month, day)
+
+    m = _WEEKDAY_RE.search(text)
+    if m:
+        target = WEEKDAYS.index(m.group(2))
+        if m.group(1):
+            # 다음 주 (월요일 시작) 의 해당 요일
+            return today + timedelta(days=7 - today.weekday() + target)
+        return today + timedelta(days=(target - today.weekday()) % 7)
+
+    return None
+
+
+def _apply_period(prefix: Optional[str], hour: int) -> int:
+    """ 시간대 단어 + 시 → 24시간제 시 ("밤 12시" / "오전 12시" = 0시, "점심 1시" = 13시) """
+    if prefix in ("오전", "밤") and hour == 12:
+        return 0
+    if prefix in ("오후", "저녁", "밤") and hour < 12:
+        return hour + 12
+    if prefix == "점심" and hour < 6:
+        return hour + 12
+    return hour
+
+
+def parse_times(text: str) -> List[str]:
+    """ 시각 표현 → ["HH:MM", ...] (등장 순서, 중복 제거) """
+    times: List[str] = []
+    covered = []
+
+    for m in _CLOCK_RE.finditer(text):
+        prefix, hour, tail, minute = m.group(1), int(m.group(2)), m.group(3), m.group(4)
+        if hour > 24:
+            continue
+        hour = _apply_period(prefix, hour)
+        minutes = 30 if tail == "반" else int(minute or 0)
+        times.append(f"{hour % 24:02d}:{minutes:02d}")
+        if prefix:
+            covered.append(prefix)
+
+    for m in _HHMM_RE.finditer(text):
+        # "아침 9:30" 처럼 바로 앞의 시간대 단어도 이 시각에 포함
+        before = _PERIOD_BEFORE_RE.search(text[:m.start()])
+        prefix = before.group(1) if before else None
+        hour = _apply_period(prefix, int(m.group(1)))
+        times.append(f"{hour % 24:02d}:{m.group(2)}")
+        if prefix:
+            covered.append(prefix)
+
+    # "아침 8시" 처럼 시각과 함께 쓰인 시간대 단어는 중복으로 세지 않음
+    for word, base in TIME_WORDS.items():
+        if word in text and word not in covered and not any(word.startswith(c) for c in covered):
+            times.append(base)
+
+    seen = set()
+    return [t for t in times if not (t in seen or seen.add(t))]
+
+
+def parse_dose(text: str) -> Optional[str]:
+    m = _DOSE_RE.search(text)
+    if not m:
+        return None
+    unit = "정" if m.group(2) == "알" else m.group(2)
+    return f"{m.group(1)}{unit}"
+
+
+def candidate_drug_tokens(text: str) -> List[str]:
+    tokens = []
+    for raw in re.split(r"\s+", text.strip()):
+        token = re.sub(r"[^\w가-힣]", "", raw)
+        token = _PARTICLE_RE.sub("", token)
+        if len(token) >= 2 and not _NON_DRUG_RE.match(token):
+            tokens.append(token)
+    return tokens
+
+
+def is_drug_token(token: str, is_known_drug: Optional[Callable[[str], bool]]) -> bool:
+    """
+    약 이름 판정 - 품목명 색인(is_known_drug)으로 확인된 것만
+    제형 접미사만으로는 인정하지 않고, 접미사를 뗀 이름이 색인에 있어야 함 ("타이레놀시럽" → "타이레놀")
+    """
+    if is_known_drug is None or token in COMMON_NOUNS:
+        return False
+    if is_known_drug(token):
+        return True
+    for suffix in DRUG_SUFFIXES:
+        stem = token[:-len(suffix)]
+        if token.endswith(suffix) and len(stem) >= 2 and is_known_drug(stem):
+            return True
+    return False
+
+
+def extract_slots(text: str, today: Optional[date] = None) -> Dict:
+    """ 날짜/시각/용량 슬롯 (약 이름 제외) """
+    return {
+        "date": parse_date(text, today),
+        "times": parse_times(text),
+        "dose": parse_dose(text),
+    }
+
+
+# -------------------------------------------------
+# ✅ 의도 판정
+# -------------------------------------------------
+def extract_schedule_intent(
+    text: str,
+    is_known_drug: Optional[Callable[[str], bool]] = None,
+    today: Optional[date] = None,
+) -> Optional[Dict]:
+    """
+    확실한 일정 등록 요청이면 create_schedule 입력(dict)을, 아니면 None
+    - 등록 동사 + 약 이름 1개 + 복용 시각이 모두 있어야 함 (시각이 없으면 LLM 에 맡김)
+    - 약 이름: is_drug_token (색인이 없으면 판정 불가 → None)
+    """
+    if not text or not REGISTER_RE.search(text) or REJECT_RE.search(text):
+        return None
+
+    slots = extract_slots(text, today)
+    if not slots["times"]:
+        return None
+
+    drugs = [t for t in candidate_drug_tokens(text) if is_drug_token(t, is_known_drug)]
+    # 약이 여러 개거나 없으면 LLM 에 맡김
+    if len(set(drugs)) != 1:
+        return None
+
+    start = slots["date"] or (today or date.today())
+    return {
+        "intent": "REGISTER_SCHEDULE",
+        "medication_name": drugs[0],
+        "start_date": start.isoformat(),
+        "notes": ", ".join(slots["times"]),
+        "timings": slots["times"],
+        "dose": slots["dose"] or "1정",
+        "source": "rule",
+    }
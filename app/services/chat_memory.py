@@ -0,0 +1,148 @@
+# app/services/chat_memory.py
+
+import math
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# =======================================================
+# 챗봇 대화 메모리
+# =======================================================
+# - 최근 N개 메시지는 원문 그대로 (복합 인덱스 user_id, conversation_id, id 로 조회)
+# - 그 이전 메시지는 conversation_summary 에 점진적으로 요약 (LLM 호출 없이 추출식)
+# - 프롬프트에 넣을 때는 토큰 예산에 맞게 오래된 턴부터 잘라냄
+
+RECENT_MESSAGES = 10              # 원문으로 유지할 최근 메시지 수 (user/bot 합산)
+FOLD_BATCH_LIMIT = 200            # 한 번에 요약에 반영할 최대 메시지 수
+SUMMARY_LINE_CHARS = 60
+SUMMARY_MAX_CHARS = 1200
+MEMORY_HEADER = "=== 이전 대화 ==="
+
+SENDER_LABEL = {"user": "사용자", "bot": "챗봇"}
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。])\s|\n")
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """ 대략적인 토큰 수 (한글 위주 텍스트 기준 2글자 ≈ 1토큰) """
+    return math.ceil(len(text or "") / 2)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[:max(0, max_tokens * 2 - 1)] + "…"
+
+
+def _first_sentence(message: str) -> str:
+    text = _SENTENCE_END_RE.split((message or "").strip(), maxsplit=1)[0]
+    return text if len(text) <= SUMMARY_LINE_CHARS else text[:SUMMARY_LINE_CHARS] + "…"
+
+
+def fold_summary(summary: str, messages: List[Dict]) -> str:
+    """ 기존 요약 + 새로 밀려난 메시지(첫 문장) → 최대 길이를 넘으면 오래된 줄부터 제거 """
+    lines = [l for l in (summary or "").split("\n") if l]
+    for m in messages:
+        lines.append(f"{SENDER_LABEL.get(m['sender'], m['sender'])}: {_first_sentence(m['message'])}")
+
+    while lines and sum(len(l) + 1 for l in lines) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def load_conversation_memory(db: Session, user_id: int, conversation_id: Optional[str], question: Optional[str] = None) -> Dict:
+    """
+    반환: {"summary": 요약 문자열, "turns": [{"id", "sender", "message"}, ...] (오래된 순, 미저장 메시지는 id=None)}
+    - 방금 저장된 현재 질문(마지막 user 메시지 == question)은 turns 에서 제외
+    - 최근 창 밖으로 밀려난 메시지가 있으면 요약에 반영하고 저장
+    """
+    from app.models.chat_history import ChatHistory, ConversationSummary
+
+    if not conversation_id:
+        return {"summary": "", "turns": []}
+
+    # write-behind 큐에서 아직 저장되지 않은 메시지는 가장 최근 턴이므로 뒤에 붙임
+    # (조회와 큐 확인 사이에 배치가 커밋되면 같은 메시지가 두 번 들어가므로 커밋 경계 잠금 안에서)
+    from app.services.chat_writer import get_chat_writer
+    writer = get_chat_writer()
+    with writer.consistent_read():
+        recent = db.execute(
+            select(ChatHistory.id, ChatHistory.sender, ChatHistory.message).where(
+                ChatHistory.user_id == user_id,
+                ChatHistory.conversation_id == conversation_id,
+            ).order_by(ChatHistory.id.desc()).limit(RECENT_MESSAGES + 1)
+        ).all()
+        unsaved = writer.pending(user_id, conversation_id)
+    turns = [dict(r._mapping) for r in reversed(recent)]
+    turns.extend({"id": None, "sender": r["sender"], "message": r["message"]} for r in unsaved)
+
+    if turns and question is not None and turns[-1]["sender"] == "user" and turns[-1]["message"] == question:
+        turns.pop()
+    if len(turns) > RECENT_MESSAGES:
+        turns = turns[-RECENT_MESSAGES:]
+    if not turns:
+        return {"summary": "", "turns": []}
+
+    summary_row = db.execute(
+        select(ConversationSummary).where(
+            ConversationSummary.user_id == user_id,
+            ConversationSummary.conversation_id == conversation_id,
+        )
+    ).scalar_one_or_none()
+
+    summary = summary_row.summary if summary_row else ""
+    folded_upto = summary_row.last_message_id if summary_row else 0
+
+    # 최근 창보다 오래되었고 아직 요약되지 않은 메시지만 반영
+    oldest_recent = turns[0]["id"]
+    if oldest_recent is not None and oldest_recent - 1 > folded_upto:
+        pending = db.execute(
+            select(ChatHistory.id, ChatHistory.sender, ChatHistory.message).where(
+                ChatHistory.user_id == user_id,
+                ChatHistory.conversation_id == conversation_id,
+                ChatHistory.id > folded_upto,
+                ChatHistory.id < oldest_recent,
+            ).order_by(ChatHistory.id.desc()).limit(FOLD_BATCH_LIMIT)
+        ).all()
+
+        if pending:
+            pending = [dict(r._mapping) for r in reversed(pending)]
+            summary = fold_summary(summary, pending)
+            if summary_row is None:
+                summary_row = ConversationSummary(user_id=user_id, conversation_id=conversation_id)
+                db.add(summary_row)
+            summary_row.summary = summary
+            # 최근 창 이전 메시지는 모두 처리된 것으로 기록 (FOLD_BATCH_LIMIT 초과분은 버림)
+            summary_row.last_message_id = oldest_recent - 1
+            db.commit()
+
+    return {"summary": summary, "turns": turns}
+
+
+def render_memory(memory: Dict, max_tokens: int) -> str:
+    """ 토큰 예산 안에서 [요약 + 최근 턴] 텍스트 구성 (최근 턴 우선, 오래된 턴부터 제외) """
+    if max_tokens <= 0 or not (memory.get("summary") or memory.get("turns")):
+        return ""
+
+    budget = max_tokens - estimate_tokens(MEMORY_HEADER)
+    kept: List[str] = []
+    for t in reversed(memory.get("turns") or []):
+        line = f"{SENDER_LABEL.get(t['sender'], t['sender'])}: {t['message']}"
+        cost = estimate_tokens(line)
+        if cost > budget:
+            if not kept:
+                # 가장 최근 턴은 잘라서라도 포함
+                kept.append(truncate_to_tokens(line, budget))
+                budget = 0
+            break
+        kept.append(line)
+        budget -= cost
+
+    parts = [MEMORY_HEADER]
+    summary = memory.get("summary") or ""
+    if summary and budget > 20:
+        parts.append("(요약) " + truncate_to_tokens(summary.replace("\n", " / "), budget - 5))
+    parts.extend(reversed(kept))
+    return "\n".join(parts) if len(parts) > 1 else ""
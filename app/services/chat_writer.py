@@ -0,0 +1,202 @@
+# app/services/chat_writer.py
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+logger = logging.getLogger("chatbot")
+
+# =======================================================
+# chat_history write-behind 저장기
+# =======================================================
+# 챗봇 응답 경로에서 메시지마다 db.commit() 하던 것을 큐에 넣기만 하고,
+# 백그라운드 스레드 1개가 FLUSH_INTERVAL 또는 FLUSH_BATCH_SIZE 마다 한 번에 bulk insert 합니다.
+# - 단일 스레드 + FIFO 이므로 대화 내 순서(id 순서) 보장
+# - created_at 은 큐에 넣은 시각으로 기록 (flush 시각이 아님)
+# - flush 실패 시 행을 버리지 않고 다음 주기에 재시도
+# - 커밋과 _in_flight 비우기는 _commit_lock 안에서 함께 → consistent_read() 안의 DB 조회 + pending() 은
+#   같은 메시지를 양쪽에서 보거나(중복 턴) 양쪽 모두에서 놓치지 않음
+# - 종료 시(lifespan / atexit) 남은 행을 모두 저장
+
+FLUSH_INTERVAL_SECONDS = 0.2
+FLUSH_BATCH_SIZE = 100
+RETRY_BACKOFF_SECONDS = 1.0
+SHUTDOWN_RETRIES = 3
+
+
+class ChatHistoryWriter:
+
+    def __init__(self, session_factory=None, interval: float = FLUSH_INTERVAL_SECONDS, batch_size: int = FLUSH_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flushed = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight: List[Dict] = []
+        # 커밋 경계 잠금 (_lock 과 분리: enqueue 는 DB 커밋을 기다리지 않음)
+        self._commit_lock = threading.Lock()
+
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+
+    # ---------------------------------------------
+    # 시작 / 종료
+    # ---------------------------------------------
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.session_factory is None:
+                from app.db import SessionLocal
+                self.session_factory = SessionLocal
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="chat-history-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """ 남은 행을 모두 저장한 뒤 스레드 종료 """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error(f"[CHAT WRITER] shutdown timed out with {len(self._queue)} rows queued")
+            return
+        self._thread = None
+        if self._queue:
+            logger.error(f"[CHAT WRITER] {len(self._queue)} rows could not be saved on shutdown")
+
+    # ---------------------------------------------
+    # 적재
+    # ---------------------------------------------
+    def enqueue(self, user_id: int, message: str, sender: str, conversation_id: Optional[str]):
+        if self._thread is None:
+            self.start()
+        row = {
+            "user_id": user_id,
+            "message": message,
+            "sender": sender,
+            "conversation_id": conversation_id,
+            "is_read": False,
+            "created_at": datetime.now(),
+        }
+        with self._lock:
+            self._queue.append(row)
+            size = len(self._queue)
+        if size >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self, user_id: int, conversation_id: Optional[str]) -> List[Dict]:
+        """ 아직 DB 에 반영되지 않은 메시지 (대화 메모리가 최근 턴에 합치는 용도, 오래된 순) """
+        with self._lock:
+            return [
+                dict(r) for r in list(self._in_flight) + list(self._queue)
+                if r["user_id"] == user_id and r["conversation_id"] == conversation_id
+            ]
+
+    def consistent_read(self):
+        """
+        with get_chat_writer().consistent_read():  DB 조회 → pending()
+        블록 안에서는 배치 커밋이 끼어들지 않음 (새 세션의 첫 조회여야 커밋된 행이 보임)
+        """
+        return self._commit_lock
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """ 지금까지 적재된 행이 저장될 때까지 대기 (삭제/읽음 처리 전 호출) """
+        if self._thread is None:
+            return self._drain()
+        deadline = time.monotonic() + timeout
+        self._wakeup.set()
+        with self._lock:
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    # ---------------------------------------------
+    # 저장
+    # ---------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if not self._drain():
+                self._stop.wait(RETRY_BACKOFF_SECONDS)
+        # 종료: 남은 행 저장 (실패 시 몇 번 더 재시도)
+        self._drain(retries=SHUTDOWN_RETRIES)
+
+    def _drain(self, retries: int = 0) -> bool:
+        attempts = 0
+        while self._queue:
+            if self._flush_once():
+                continue
+            attempts += 1
+            if attempts > retries:
+                return False
+            time.sleep(RETRY_BACKOFF_SECONDS)
+        return True
+
+    def _flush_once(self) -> bool:
+        with self._lock:
+            if not self._queue:
+                return True
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._in_flight = batch
+
+        from app.models.chat_history import ChatHistory
+
+        db = self.session_factory()
+        try:
+            db.execute(insert(ChatHistory), batch)
+            with self._commit_lock:
+                db.commit()
+                with self._lock:
+                    self._in_flight = []
+        except Exception as e:
+            db.rollback()
+            self.failures += 1
+            logger.error(f"[CHAT WRITER] flush failed ({len(batch)} rows), will retry: {e}")
+            with self._lock:
+                # 실패한 배치를 큐 앞에 되돌려 순서 유지
+                self._queue.extendleft(reversed(batch))
+                self._in_flight = []
+            return False
+        finally:
+            db.close()
+
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+            self._flushed.notify_all()
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+        }
+
+
+_chat_writer = ChatHistoryWriter()
+atexit.register(_chat_writer.stop)
+
+
+def get_chat_writer() -> ChatHistoryWriter:
+    return _chat_writer
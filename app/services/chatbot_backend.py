@@ -0,0 +1,184 @@
+# app/services/chatbot_backend.py
+
+import asyncio
+import json
+import re
+import time
+from datetime import date
+from typing import AsyncIterator, Dict, Optional
+
+from app.config import settings
+from app.services.chatbot_client import get_chatbot_client
+from app.services.chat_intent import extract_slots
+
+# =======================================================
+# 챗봇 LLM 백엔드
+# =======================================================
+# chatbot_service 는 아래 인터페이스만 사용합니다.
+#   - available()                 : 응답 생성 가능 여부 (API 키 등)
+#   - generate(prompt) -> str     : 동기 생성 (안전 정책 차단 시 ValueError)
+#   - generate_async(prompt)      : 비동기 생성
+#   - stream(prompt)              : 텍스트 조각 async iterator
+#   - health() -> dict
+#
+# CHATBOT_BACKEND=gemini (기본) | local
+# local 은 네트워크 없이 결정적으로 응답하는 대체 백엔드 (부하 테스트/벤치마크용)
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def _model(self):
+        return get_chatbot_client().get_model()
+
+    def available(self) -> bool:
+        return self._model() is not None
+
+    def generate(self, prompt: str) -> str:
+        response = self._model().generate_content(prompt)
+        return response.text.strip()
+
+    async def generate_async(self, prompt: str) -> str:
+        response = await self._model().generate_content_async(prompt)
+        return response.text.strip()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self._model().generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            try:
+                piece = chunk.text
+            except ValueError:
+                continue
+            if piece:
+                yield piece
+
+    def health(self) -> Dict:
+        return dict(get_chatbot_client().health(), backend=self.name)
+
+
+# -------------------------------------------------
+# ✅ 로컬 대체 백엔드
+# -------------------------------------------------
+REGISTER_KEYWORDS = ["등록", "알림", "먹을게", "복용할게", "챙겨줘"]
+
+_QUESTION_RE = re.compile(r"사용자 질문:\s*(.*)\s*$", re.DOTALL)
+_DATA_RE = re.compile(r"\[데이터 근거\]\s*(.*?)\n\s*데이터에 없는 내용은", re.DOTALL)
+_DRUG_NAME_RE = re.compile(r"=== 약물 정보: (.+?) ===|\[의약품\] ([^|]+?)\s*\|")
+_PARTICLE_RE = re.compile(r"(은|는|이|가|을|를|도|좀)$")
+
+
+class LocalBackend:
+    """
+    결정적 템플릿 응답기
+    - 일정 등록 의도(REGISTER_KEYWORDS) → 프롬프트 형식 그대로 REGISTER_SCHEDULE JSON
+    - 그 외 → [데이터 근거] 섹션 첫 줄들을 인용한 해요체 답변
+    - latency_ms: 첫 응답까지 지연, 스트리밍 시 조각 사이 지연은 chunk_delay_ms
+    """
+
+    name = "local"
+
+    def __init__(self, latency_ms: int = 0, chunk_delay_ms: int = 0, chunk_chars: int = 8):
+        self.latency_ms = latency_ms
+        self.chunk_delay_ms = chunk_delay_ms
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+    def available(self) -> bool:
+        return True
+
+    # ---------------------------------------------
+    # 응답 생성 (결정적)
+    # ---------------------------------------------
+    def respond(self, prompt: str) -> str:
+        match = _QUESTION_RE.search(prompt)
+        question = match.group(1).strip() if match else prompt.strip()
+        data_match = _DATA_RE.search(prompt)
+        data = data_match.group(1).strip() if data_match else ""
+
+        if any(k in question for k in REGISTER_KEYWORDS):
+            return json.dumps(self._schedule_intent(question, data), ensure_ascii=False, indent=2)
+
+        lines = [l.strip() for l in data.splitlines() if l.strip() and not l.strip().startswith("===")]
+        if lines:
+            return "관련 정보를 찾았어요.\n" + "\n".join(lines[:3]) + "\n자세한 내용은 의사나 약사와 상담해 주세요."
+        return f"'{question}'에 대한 데이터가 없어요. 일반적인 내용은 의사나 약사와 상담해 주세요. (출처 없음)"
+
+    def _schedule_intent(self, question: str, data: str) -> Dict:
+        # 날짜/시각/용량은 규칙 기반 빠른 경로와 같은 추출기 사용
+        slots = extract_slots(question)
+
+        name_match = _DRUG_NAME_RE.search(data)
+        if name_match:
+            name = (name_match.group(1) or name_match.group(2)).strip()
+        else:
+            name = _PARTICLE_RE.sub("", question.split()[0]) if question.split() else ""
+
+        return {
+            "intent": "REGISTER_SCHEDULE",
+            "medication_name": name,
+            "start_date": (slots["date"] or date.today()).isoformat(),
+            "notes": ", ".join(slots["times"]),
+            "dose": slots["dose"] or "1정",
+        }
+
+    # ---------------------------------------------
+    # 인터페이스
+    # ---------------------------------------------
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self.respond(prompt)
+
+    async def generate_async(self, prompt: str) -> str:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.respond(prompt)
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        text = await self.generate_async(prompt)
+        for i in range(0, len(text), self.chunk_chars):
+            if i and self.chunk_delay_ms:
+                await asyncio.sleep(self.chunk_delay_ms / 1000)
+            yield text[i:i + self.chunk_chars]
+
+    def health(self) -> Dict:
+        return {
+            "backend": self.name,
+            "configured": True,
+            "latency_ms": self.latency_ms,
+            "chunk_delay_ms": self.chunk_delay_ms,
+            "calls": self.calls,
+        }
+
+
+# -------------------------------------------------
+# ✅ 선택
+# -------------------------------------------------
+_backend = None
+
+
+def create_backend(name: Optional[str] = None):
+    name = (name or settings.CHATBOT_BACKEND or "gemini").lower()
+    if name == "local":
+        return LocalBackend(
+            latency_ms=settings.CHATBOT_LOCAL_LATENCY_MS,
+            chunk_delay_ms=settings.CHATBOT_LOCAL_CHUNK_DELAY_MS,
+        )
+    if name == "gemini":
+        return GeminiBackend()
+    raise ValueError(f"Unknown CHATBOT_BACKEND: {name}")
+
+
+def get_chatbot_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_chatbot_backend(backend):
+    """ 백엔드 교체 (부하 테스트 스크립트 등) """
+    global _backend
+    _backend = backend
@@ -0,0 +1,212 @@
+# app/services/chatbot_cache.py
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger("chatbot")
+
+# =======================================================
+# 챗봇 응답 캐시
+# =======================================================
+# 키 = (범위, 정규화 질문, RAG 컨텍스트 sha256)
+# - 범위: 컨텍스트에 개인 복약 일정이 들어있으면 "u:{user_id}", 아니면 "shared"
+#   → 개인 데이터가 섞인 답변은 절대 다른 사용자에게 재사용되지 않음
+# - 컨텍스트에는 프롬프트에 들어간 프로필(나이/특이사항)도 포함 → 나이·알러지·임신 여부가 다르면 다른 키
+# - 공유 답변의 첫머리 호칭("OO님")만 자리표시자로 바꿔 저장하고, 꺼낼 때 현재 사용자 이름으로 치환
+#   (본문에 이름이 또 나오면 공유 캐시에 저장하지 않음 - 부분 문자열 치환으로 본문이 깨지지 않도록)
+# - (선택) 임베딩 유사도 계층: 같은 범위 + 같은 컨텍스트 해시 안에서만 비교
+
+MAX_ENTRIES = 2000
+SHARED_TTL_SECONDS = 12 * 60 * 60
+PERSONAL_TTL_SECONDS = 5 * 60          # 일정이 바뀔 수 있으므로 짧게
+
+# 이 헤더가 컨텍스트에 있으면 개인 데이터로 취급 (fetch_rag_context 일정 섹션 / 대화 메모리)
+PERSONAL_CONTEXT_MARKERS = ("=== 사용자 복약 일정 ===", "=== 이전 대화 ===")
+
+NAME_PLACEHOLDER = "\u0000NAME\u0000"
+
+# 임베딩 계층 (기본 비활성: 질문마다 임베딩 API 호출이 추가되므로)
+# 🚨 켜져 있으면 get / put 이 embed_content 를 동기 호출 → 이벤트 루프에서는 run_in_threadpool 로 호출할 것
+EMBEDDING_ENABLED = os.getenv("CHATBOT_CACHE_EMBEDDINGS", "0") == "1"
+EMBEDDING_MODEL = "models/text-embedding-004"
+SIMILARITY_THRESHOLD = 0.95
+
+_PUNCT_RE = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def normalize_question(question: str) -> str:
+    """ 전각/반각 통일, 소문자, 공백·문장부호 제거 """
+    q = unicodedata.normalize("NFKC", question or "").lower()
+    return _PUNCT_RE.sub("", q)
+
+
+def context_hash(rag_context: str) -> str:
+    return hashlib.sha256((rag_context or "").encode("utf-8")).hexdigest()
+
+
+def is_personal_context(rag_context: str) -> bool:
+    return any(m in (rag_context or "") for m in PERSONAL_CONTEXT_MARKERS)
+
+
+def _embed(text: str) -> Optional[np.ndarray]:
+    try:
+        import google.generativeai as genai
+        result = genai.embed_content(model=EMBEDDING_MODEL, content=text)
+        vec = np.asarray(result["embedding"], dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else None
+    except Exception as e:
+        logger.warning(f"[CHATBOT CACHE] embedding failed: {e}")
+        return None
+
+
+class ChatResponseCache:
+    """ 정확 일치(LRU + TTL) → 임베딩 유사도 순으로 조회하는 응답 캐시 """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, embeddings: bool = EMBEDDING_ENABLED, embed_fn=_embed):
+        self.max_entries = max_entries
+        self.embeddings = embeddings
+        self.embed_fn = embed_fn
+
+        # key → {"answer", "expires_at", "latency_ms", "vector"}
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    # ---------------------------------------------
+    # 키
+    # ---------------------------------------------
+    @staticmethod
+    def make_key(question: str, rag_context: str, user_id: int) -> tuple:
+        scope = f"u:{user_id}" if is_personal_context(rag_context) else "shared"
+        return (scope, context_hash(rag_context), normalize_question(question))
+
+    # ---------------------------------------------
+    # 조회 / 저장
+    # ---------------------------------------------
+    def get(self, question: str, rag_context: str, user_id: int, user_name: str = "") -> Optional[str]:
+        key = self.make_key(question, rag_context, user_id)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_ms += entry["latency_ms"]
+                return self._render(entry["answer"], user_name)
+            if entry:
+                del self._entries[key]
+
+        if self.embeddings:
+            entry = self._semantic_lookup(key, question, now)
+            if entry:
+                with self._lock:
+                    self.semantic_hits += 1
+                    self.saved_ms += entry["latency_ms"]
+                return self._render(entry["answer"], user_name)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, question: str, rag_context: str, user_id: int, answer: str, latency_ms: float, user_name: str = ""):
+        key = self.make_key(question, rag_context, user_id)
+        ttl = SHARED_TTL_SECONDS if key[0] == "shared" else PERSONAL_TTL_SECONDS
+
+        if key[0] == "shared" and user_name:
+            answer = self._strip_greeting_name(answer, user_name)
+            if answer is None:
+                return
+
+        vector = self.embed_fn(question) if self.embeddings else None
+
+        with self._lock:
+            self._entries[key] = {
+                "answer": answer,
+                "expires_at": time.time() + ttl,
+                "latency_ms": latency_ms,
+                "vector": vector,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _semantic_lookup(self, key: tuple, question: str, now: float) -> Optional[Dict]:
+        scope, ctx, _ = key
+        with self._lock:
+            candidates = [
+                e for (s, c, _), e in self._entries.items()
+                if s == scope and c == ctx and e["vector"] is not None and e["expires_at"] > now
+            ]
+        if not candidates:
+            return None
+
+        vector = self.embed_fn(question)
+        if vector is None:
+            return None
+
+        sims = np.stack([e["vector"] for e in candidates]) @ vector
+        best = int(np.argmax(sims))
+        return candidates[best] if sims[best] >= SIMILARITY_THRESHOLD else None
+
+    @staticmethod
+    def _strip_greeting_name(answer: str, user_name: str) -> Optional[str]:
+        """ 첫머리 호칭의 이름만 자리표시자로 (그 밖에 이름이 남아 있으면 None = 공유 저장 안 함) """
+        body = answer.lstrip()
+        lead = answer[:len(answer) - len(body)]
+        if body.startswith(user_name):
+            body = NAME_PLACEHOLDER + body[len(user_name):]
+        if user_name in body:
+            return None
+        return lead + body
+
+    @staticmethod
+    def _render(answer: str, user_name: str) -> str:
+        return answer.replace(NAME_PLACEHOLDER, user_name or "")
+
+    # ---------------------------------------------
+    # 관리 / 통계
+    # ---------------------------------------------
+    def invalidate_user(self, user_id: int):
+        """ 사용자 개인 범위 항목 삭제 (일정 변경 시) """
+        scope = f"u:{user_id}"
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == scope]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.semantic_hits) / total, 4) if total else 0.0,
+            "saved_latency_ms": round(self.saved_ms, 1),
+            "embeddings": self.embeddings,
+        }
+
+
+_response_cache = ChatResponseCache()
+
+
+def get_response_cache() -> ChatResponseCache:
+    return _response_cache
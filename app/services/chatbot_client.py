@@ -0,0 +1,150 @@
+# app/services/chatbot_client.py
+
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import google.generativeai as genai
+
+from app.config import settings
+
+logger = logging.getLogger("chatbot")
+
+# 우선순위 목록 (앞에 있을수록 우선)
+MODEL_PREFERENCES = ['models/gemini-1.5-flash', 'gemini-1.5-flash', 'models/gemini-pro', 'gemini-pro']
+DEFAULT_MODEL = 'gemini-pro'
+
+# 모델 목록 재조회 주기 (초)
+DISCOVERY_TTL_SECONDS = 6 * 60 * 60
+
+
+def select_model(available: List[str]) -> Optional[str]:
+    """ generateContent 지원 모델 목록에서 선호 모델 선택 (없으면 None) """
+    for pref in MODEL_PREFERENCES:
+        for name in available:
+            # 정확히 일치하거나 name에 포함된 경우 (예: models/gemini-1.5-flash-001)
+            if pref == name or name.endswith(pref):
+                return name
+
+    # 선호 모델을 찾지 못한 경우 gemini가 포함된 아무 모델이나 선택
+    for name in available:
+        if "gemini" in name.lower():
+            return name
+    return None
+
+
+class ChatbotClientManager:
+    """
+    Gemini 클라이언트 관리자 (프로세스당 1개)
+    - genai.configure 는 시작 시 1회만 호출
+    - GenerativeModel 핸들을 만들어 두고 모든 요청이 공유
+    - list_models 기반 모델 탐색은 백그라운드 스레드에서 TTL 주기로 수행
+      (탐색 전/실패 시에는 DEFAULT_MODEL 로 바로 응답)
+    """
+
+    def __init__(self, ttl_seconds: int = DISCOVERY_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.api_key: Optional[str] = None
+        self.model_name: Optional[str] = None
+        self.model_source = "none"          # none / default / discovered
+        self.available_models: List[str] = []
+        self.discovered_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._model = None
+        self._lock = threading.Lock()
+        self._started = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------------------------------------------
+    # 시작 / 종료
+    # ---------------------------------------------
+    def start(self, background: bool = True):
+        """ API 키 설정 + 기본 모델 핸들 생성 + 모델 탐색 스레드 시작 (중복 호출 무시) """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+            self.api_key = settings.GEMINI_API_KEY or os.getenv("GEMINI_API_KEY")
+            if not self.api_key:
+                logger.warning("[CHATBOT] GEMINI_API_KEY is not set; chatbot engine disabled")
+                return
+
+            genai.configure(api_key=self.api_key)
+            self._set_model(os.getenv("GEMINI_MODEL") or DEFAULT_MODEL, "default")
+
+        if background:
+            self._thread = threading.Thread(target=self._discovery_loop, name="gemini-model-discovery", daemon=True)
+            self._thread.start()
+        else:
+            self.refresh()
+
+    def stop(self):
+        self._stop.set()
+
+    def _discovery_loop(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.ttl_seconds)
+
+    # ---------------------------------------------
+    # 모델 탐색
+    # ---------------------------------------------
+    def refresh(self):
+        """ list_models 로 사용 가능한 모델을 조회하고 선택 결과가 바뀌면 핸들 교체 """
+        try:
+            available = [
+                m.name for m in genai.list_models()
+                if 'generateContent' in m.supported_generation_methods
+            ]
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"[CHATBOT] Failed to list models (Check API Key): {e}")
+            return
+
+        chosen = select_model(available)
+        with self._lock:
+            self.available_models = available
+            self.discovered_at = time.time()
+            self.last_error = None
+            if chosen and chosen != self.model_name:
+                self._set_model(chosen, "discovered")
+                logger.info(f"[CHATBOT] ✅ Auto-selected model: {chosen}")
+            elif chosen:
+                self.model_source = "discovered"
+
+    def _set_model(self, name: str, source: str):
+        self.model_name = name
+        self.model_source = source
+        self._model = genai.GenerativeModel(name)
+
+    # ---------------------------------------------
+    # 조회
+    # ---------------------------------------------
+    def get_model(self):
+        """ 공유 모델 핸들 (API 키가 없으면 None). 시작 훅 없이 호출되면 그 자리에서 초기화 """
+        if not self._started:
+            self.start()
+        return self._model
+
+    def health(self) -> Dict:
+        return {
+            "configured": bool(self.api_key),
+            "model": self.model_name,
+            "model_source": self.model_source,
+            "available_models": len(self.available_models),
+            "discovered_at": self.discovered_at,
+            "discovery_ttl_seconds": self.ttl_seconds,
+            "last_error": self.last_error,
+        }
+
+
+_client_manager = ChatbotClientManager()
+
+
+def get_chatbot_client() -> ChatbotClientManager:
+    return _client_manager
@@ -1,116 +1,29 @@
 # app/services/chatbot_service.py (Gemini API Integration - Final)
 
-import os
-import google.generativeai as genai
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any, List
 from datetime import date
-from app.config import settings
+from app.services.chatbot_backend import get_chatbot_backend
+from app.services.chatbot_cache import get_response_cache
+from app.services.rag_context import build_chat_context, load_user_summary
+from app.services.chat_writer import get_chat_writer
+from app.services.chat_memory import estimate_tokens, truncate_to_tokens, render_memory
+from app.services.chat_intent import extract_schedule_intent
+from app.services.drug_name_index import get_drug_name_index
 import json
-import re
 import traceback
 
 # =======================================================
-# 1. 보조 함수: 사용자 요약 정보 조회
+# 1~2. 보조 함수: 사용자 요약 정보 / RAG 데이터 검색 (스케줄, 병원, 약물)
 # =======================================================
+# 실제 조회는 rag_context 모듈이 단계별로 동시에 수행합니다.
 def get_user_summary(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
     """ 주사용자와 가족 구성원의 간략한 정보를 조회하고, 특이사항을 포함합니다. """
-    from app.models.user import UserProfile, PatientProfile
+    return load_user_summary(db, user_id)
 
-    user = db.query(UserProfile).filter(UserProfile.id == user_id).first()
-    if not user:
-        return None
-
-    members = db.query(UserProfile).filter(UserProfile.user_id == user_id, UserProfile.id != user_id).all()
-    patient = db.query(PatientProfile).filter(PatientProfile.user_id == user_id, PatientProfile.relation == "Self").first()
-    patient_note = patient.special_note if patient else None
-    
-    return {
-        "name": user.name,
-        "age": user.age,
-        "special_note": patient_note,
-        "family_members": [m.name for m in members]
-    }
-
-# =======================================================
-# 2. 보조 함수: RAG 데이터 검색 (스케줄, 병원, 약물)
-# =======================================================
 def fetch_rag_context(db: Session, user_id: int, query: str) -> str:
     """ 사용자 질문과 관련된 DB 데이터를 조회하여 문자열 컨텍스트로 반환 """
-    from app.models.medication import MedicationSchedule
-    from app.models.map import MasterMedical
-    from app.models.drug_info import ProductLicense
-
-    context_parts = []
-    today = date.today()
-
-    # A. 복약 스케줄 (오늘/내일 일정)
-    if any(k in query for k in ["약", "일정", "스케줄", "먹을", "복용"]):
-        schedules = db.query(MedicationSchedule).filter(
-            MedicationSchedule.user_id == user_id,
-            MedicationSchedule.start_date >= today
-        ).limit(5).all()
-        
-        if schedules:
-            sch_text = "=== 사용자 복약 일정 ===\n"
-            for s in schedules:
-                try:
-                    # timing1 ~ timing5 수집
-                    t_list = []
-                    for i in range(1, 6):
-                        val = getattr(s, f"timing{i}", None)
-                        if val:
-                            t_list.append(str(val))
-                    time_info = ", ".join(t_list)
-                except Exception:
-                    time_info = ""
-                
-                sch_text += f"- {s.pill_name} ({s.dose}): {s.start_date} {time_info}\n"
-            context_parts.append(sch_text)
-        else:
-            context_parts.append("=== 사용자 복약 일정 ===\n(예정된 일정이 없습니다.)")
-
-    # B. 병원/약국 검색
-    medical_keywords = ["병원", "응급", "약국", "내과", "이비인후과", "정형외과", "소아과", "진료"]
-    found_medical = False
-    for k in medical_keywords:
-        if k in query:
-            found_medical = True
-            break
-            
-    if found_medical:
-        search_keyword = "병원"
-        for k in medical_keywords:
-            if k in query:
-                search_keyword = k
-                break
-        
-        places = db.query(MasterMedical).filter(
-            (MasterMedical.name.like(f"%{search_keyword}%")) |
-            (MasterMedical.departments.like(f"%{search_keyword}%"))
-        ).limit(3).all()
-        
-        if places:
-            med_text = f"=== 추천 의료 기관 ({search_keyword} 관련) ===\n"
-            for p in places:
-                med_text += f"- {p.name} (전화: {p.tel}, 주소: {p.address})\n"
-            context_parts.append(med_text)
-
-    # C. 약물 정보 (이름 검색)
-    tokens = query.split()
-    for token in tokens:
-        clean_token = token.replace("은", "").replace("는", "").replace("이", "").replace("가", "").replace("을", "").replace("를", "")
-        if len(clean_token) >= 2:
-            drug = db.query(ProductLicense).filter(ProductLicense.item_name.like(f"%{clean_token}%")).first()
-            if drug:
-                drug_text = f"=== 약물 정보: {drug.item_name} ===\n"
-                if drug.entp_name: drug_text += f"제조사: {drug.entp_name}\n"
-                if drug.ingr_name: drug_text += f"성분: {drug.ingr_name}\n"
-                if drug.induty: drug_text += f"분류: {drug.induty}\n"
-                context_parts.append(drug_text)
-                break 
-    
-    return "\n\n".join(context_parts)
+    return build_chat_context(db, user_id, query)["rag_data"]
 
 # =======================================================
 # 3. 보조 함수: 복약 스케줄 등록 및 Active Medication 동기화
@@ -123,8 +36,16 @@ def create_schedule(db: Session, user_id: int, data: dict, user_name: str) -> st
         # 1. 데이터 파싱
         pill_name = data.get('medication_name') or data.get('pill_name')
         start_date = data.get('start_date')
+        if isinstance(start_date, str):
+            try:
+                start_date = date.fromisoformat(start_date.strip())
+            except ValueError:
+                pass
         notes = data.get('notes') or data.get('timing') 
         dose = data.get('dose', '1회')
+        # 규칙 기반 추출기는 "HH:MM" 목록을 주므로 timing1~5 에 나눠 저장
+        timings = [t for t in (data.get('timings') or []) if t][:5] or [notes]
+        timings += [None] * (5 - len(timings))
         
         print(f"[DEBUG] create_schedule: Pill={pill_name}, Date={start_date}, User={user_name}")
         
@@ -137,13 +58,23 @@ def create_schedule(db: Session, user_id: int, data: dict, user_name: str) -> st
             pill_name=pill_name,
             start_date=start_date,
             end_date=start_date,
-            timing1=notes, # 챗봇 입력 시간은 timing1에 저장
+            timing1=timings[0], # 챗봇 입력 시간은 timing1에 저장
+            timing2=timings[1],
+            timing3=timings[2],
+            timing4=timings[3],
+            timing5=timings[4],
             memo=notes,
             dose=dose,
             notify=True,
             is_taken=False
         )
         db.add(new_schedule)
+        db.flush()
+        from app.services.ical_feed import record_changes
+        record_changes(db, user_id, "schedule", [new_schedule.id])
+        if isinstance(start_date, date):
+            from app.services.adherence import refresh
+            refresh(db, user_id, [pill_name], start_date, start_date)
 
         # 3. ActiveMedication 동기화
         patient = db.query(PatientProfile).filter(
@@ -169,6 +100,8 @@ def create_schedule(db: Session, user_id: int, data: dict, user_name: str) -> st
         
         db.commit()
         db.refresh(new_schedule)
+        # 일정이 바뀌었으므로 개인 범위 응답 캐시 폐기
+        get_response_cache().invalidate_user(user_id)
         
         # 4. 사용자 피드백 생성
         return f"{user_name}님, {start_date} {notes or ''} {pill_name} 일정을 캘린더에 저장했습니다!"
@@ -180,74 +113,37 @@ def create_schedule(db: Session, user_id: int, data: dict, user_name: str) -> st
         return "죄송합니다. 일정 등록 중 오류가 발생했습니다."
 
 # =======================================================
-# 4. 핵심 함수: 챗봇 응답 생성 (Gemini)
+# 4. 핵심 함수: 챗봇 응답 생성
 # =======================================================
-# 전역 변수로 선택된 모델 이름 캐싱
-SELECTED_MODEL_NAME = None
+# LLM 호출은 chatbot_backend (gemini / local) 를 통해서만 수행합니다.
 
-def get_best_model():
-    global SELECTED_MODEL_NAME
-    if SELECTED_MODEL_NAME:
-        return SELECTED_MODEL_NAME
+def _save_chat_message(user_id: int, message: str, sender: str, conversation_id: str):
+    """ ChatHistory 한 건 저장 (write-behind 큐에 적재, 커밋은 백그라운드에서 일괄 처리) """
+    get_chat_writer().enqueue(user_id, message, sender, conversation_id)
 
-    try:
-        print("[DEBUG] Searching for available Gemini models...")
-        # API 호출이 가능한 모델 검색
-        available_models = []
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                available_models.append(m.name)
-        
-        print(f"[DEBUG] Found models: {available_models}")
 
-        # 우선순위 목록
-        preferences = ['models/gemini-1.5-flash', 'gemini-1.5-flash', 'models/gemini-pro', 'gemini-pro']
-        
-        for pref in preferences:
-            for name in available_models:
-                # 정확히 일치하거나 name에 포함된 경우 (예: models/gemini-1.5-flash-001)
-                if pref == name or name.endswith(pref):
-                    SELECTED_MODEL_NAME = name
-                    print(f"[DEBUG] ✅ Auto-selected model: {SELECTED_MODEL_NAME}")
-                    return SELECTED_MODEL_NAME
-        
-        # 선호 모델을 찾지 못한 경우 gemini가 포함된 아무 모델이나 선택
-        for name in available_models:
-            if "gemini" in name.lower():
-                SELECTED_MODEL_NAME = name
-                print(f"[DEBUG] ⚠️ Fallback to generic Gemini model: {SELECTED_MODEL_NAME}")
-                return SELECTED_MODEL_NAME
+def _get_backend():
+    """ 설정된 LLM 백엔드 (gemini / local) """
+    return get_chatbot_backend()
 
-    except Exception as e:
-        print(f"[ERROR] Failed to list models (Check API Key): {e}")
-        
-    # 기본값 (하드코딩)
-    print("[DEBUG] ⚠️ Using default fallback: gemini-pro")
-    return 'gemini-pro'
 
-def generate_chatbot_response(db: Session, user_id: int, question: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
-    from app.models.chat_history import ChatHistory
-    import uuid
+# 프롬프트 토큰 예산 (대략치, chat_memory.estimate_tokens 기준)
+PROMPT_TOKEN_BUDGET = 4000
+RAG_TOKEN_BUDGET = 1500
 
-    if not conversation_id:
-        conversation_id = str(uuid.uuid4())
 
-    # 0. Save User Question to DB
-    user_msg = ChatHistory(user_id=user_id, message=question, sender="user", conversation_id=conversation_id)
-    db.add(user_msg)
-    db.commit()
-    
-    # 1. 사용자 정보
-    user_summary = get_user_summary(db, user_id)
+def prepare_chat_prompt(db: Session, user_id: int, question: str, conversation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """ 사용자 정보 + RAG 컨텍스트 + 대화 메모리로 프롬프트 구성 (사용자가 없으면 None) """
+    # 1~2. 사용자 정보 + RAG Context + 이전 대화 (동시 조회)
+    context = build_chat_context(db, user_id, question, conversation_id)
+    user_summary = context["summary"]
     if not user_summary:
-        return {"response": "사용자 정보를 찾을 수 없습니다. 다시 로그인해 주세요.", "conversation_id": conversation_id}
+        return None
     
     name = user_summary['name']
     age = user_summary['age']
     note = user_summary['special_note'] or "없음"
-    
-    # 2. RAG Context 구성
-    rag_data = fetch_rag_context(db, user_id, question)
+    rag_data = truncate_to_tokens(context["rag_data"], RAG_TOKEN_BUDGET)
     
     system_prompt = f"""
     당신은 친절하고 전문적인 의료 보조 챗봇입니다. 
@@ -277,60 +173,287 @@ def generate_chatbot_response(db: Session, user_id: int, question: str, conversa
     """
 
     user_prompt = f"사용자 질문: {question}"
+
+    # 남은 예산만큼 이전 대화 (최근 턴 우선)
+    memory_budget = PROMPT_TOKEN_BUDGET - estimate_tokens(system_prompt) - estimate_tokens(user_prompt)
+    memory_text = render_memory(context["memory"], memory_budget)
+    prompt_parts = [system_prompt, memory_text, user_prompt] if memory_text else [system_prompt, user_prompt]
+
+    return {
+        "name": name,
+        "rag_data": rag_data,
+        # 응답 캐시 키에 쓰는 컨텍스트 (이전 대화가 있으면 개인 범위)
+        # 🚨 프롬프트에 들어간 나이/특이사항도 포함 (다른 프로필의 답변이 재사용되지 않도록)
+        "cache_context": "\n\n".join(
+            part for part in (f"[프로필] 나이: {age} / 특이사항: {note}", rag_data, memory_text) if part
+        ),
+        "prompt": "\n\n".join(prompt_parts),
+    }
+
+
+def _extract_intent_json(text: str) -> Optional[Dict[str, Any]]:
+    """ 응답 속 첫 번째 JSON 객체 (앞뒤 설명문/코드블록이 붙어 있어도 raw_decode 로 정확히 한 객체만) """
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start >= 0:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    return None
+
+
+def handle_model_text(db: Session, user_id: int, text_response: str, name: str) -> str:
+    """ 모델 응답 후처리: 일정 등록 JSON이면 실제 등록 후 안내 문구 반환 """
+    if "REGISTER_SCHEDULE" in text_response:
+        data = _extract_intent_json(text_response)
+        if data and data.get("intent") == "REGISTER_SCHEDULE":
+            return create_schedule(db, user_id, data, name)
+    return text_response
+
+
+def try_rule_based_schedule(db: Session, user_id: int, question: str) -> Optional[str]:
+    """
+    일정 등록 빠른 경로: 규칙 기반 추출기가 확신하는 경우에만 LLM 없이 바로 등록
+    애매하면 None 을 반환하고 호출 측은 기존 LLM 경로로 진행합니다.
+    """
+    try:
+        index = get_drug_name_index(db)
+        data = extract_schedule_intent(question, index.has_prefix)
+    except Exception:
+        traceback.print_exc()
+        return None
+    if not data:
+        return None
+
+    user_summary = load_user_summary(db, user_id)
+    if not user_summary:
+        return None
+    return create_schedule(db, user_id, data, user_summary['name'])
+
+
+def _cached_answer(user_id: int, question: str, prepared: Dict[str, Any]) -> Optional[str]:
+    return get_response_cache().get(question, prepared["cache_context"], user_id, prepared["name"])
+
+
+def _store_answer(user_id: int, question: str, prepared: Dict[str, Any], text_response: str, final_response: str, latency_ms: float):
+    """ 일반 답변만 캐시 (일정 등록 등 부작용이 있는 응답은 제외) """
+    if final_response != text_response or "REGISTER_SCHEDULE" in text_response:
+        return
+    get_response_cache().put(question, prepared["cache_context"], user_id, final_response, latency_ms, prepared["name"])
+
+
+def generate_chatbot_response(db: Session, user_id: int, question: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    import time
+    import uuid
+
+    if not conversation_id:
+        conversation_id = str(uuid.uuid4())
+
+    # 0. Save User Question to DB
+    _save_chat_message(user_id, question, "user", conversation_id)
+
+    # 0-1. 일정 등록 빠른 경로 (LLM 호출 없음)
+    registered = try_rule_based_schedule(db, user_id, question)
+    if registered is not None:
+        _save_chat_message(user_id, registered, "bot", conversation_id)
+        return {"response": registered, "conversation_id": conversation_id}
     
-    # 4. Gemini 호출
+    # 1~2. 사용자 정보 + RAG Context
+    prepared = prepare_chat_prompt(db, user_id, question, conversation_id)
+    if not prepared:
+        return {"response": "사용자 정보를 찾을 수 없습니다. 다시 로그인해 주세요.", "conversation_id": conversation_id}
+
+    # 3. 응답 캐시
+    cached = _cached_answer(user_id, question, prepared)
+    if cached is not None:
+        _save_chat_message(user_id, cached, "bot", conversation_id)
+        return {"response": cached, "conversation_id": conversation_id}
+    
+    # 4. LLM 호출
     try:
-        api_key = settings.GEMINI_API_KEY
-        if not api_key:
-             api_key = os.getenv("GEMINI_API_KEY")
-        
-        if api_key:
-            genai.configure(api_key=api_key)
-            model_name = get_best_model()
-            model = genai.GenerativeModel(model_name)
-        else:
+        backend = _get_backend()
+        if not backend.available():
             return {"response": "챗봇 엔진 API 키가 설정되지 않았습니다.", "conversation_id": conversation_id}
 
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        response = model.generate_content(full_prompt)
-        
+        started = time.perf_counter()
         try:
-            text_response = response.text.strip()
+            text_response = backend.generate(prepared["prompt"])
         except ValueError:
             text_response = "죄송합니다. 안전 정책에 의해 답변이 차단되었습니다."
-            bot_msg = ChatHistory(user_id=user_id, message=text_response, sender="bot", conversation_id=conversation_id)
-            db.add(bot_msg)
-            db.commit()
+            _save_chat_message(user_id, text_response, "bot", conversation_id)
             return {"response": text_response, "conversation_id": conversation_id}
 
         # JSON 응답 감지 및 처리
-        if "REGISTER_SCHEDULE" in text_response:
-            try:
-                match = re.search(r"\{.*\}", text_response, re.DOTALL)
-                if match:
-                    data = json.loads(match.group())
-                    if data.get("intent") == "REGISTER_SCHEDULE":
-                        final_response = create_schedule(db, user_id, data, name)
-                        bot_msg = ChatHistory(user_id=user_id, message=final_response, sender="bot", conversation_id=conversation_id)
-                        db.add(bot_msg)
-                        db.commit()
-                        return {"response": final_response, "conversation_id": conversation_id}
-            except:
-                pass
+        final_response = handle_model_text(db, user_id, text_response, prepared["name"])
+        _store_answer(user_id, question, prepared, text_response, final_response, (time.perf_counter() - started) * 1000)
+        _save_chat_message(user_id, final_response, "bot", conversation_id)
 
-        bot_msg = ChatHistory(user_id=user_id, message=text_response, sender="bot", conversation_id=conversation_id)
-        db.add(bot_msg)
-        db.commit()
-
-        return {"response": text_response, "conversation_id": conversation_id}
+        return {"response": final_response, "conversation_id": conversation_id}
         
     except Exception as e:
         error_msg = str(e)
         final_error = f"문제 발생: {error_msg[:50]}..."
         try:
-            bot_msg = ChatHistory(user_id=user_id, message=final_error, sender="bot", conversation_id=conversation_id)
-            db.add(bot_msg)
-            db.commit()
+            _save_chat_message(user_id, final_error, "bot", conversation_id)
         except:
             pass
         return {"response": final_error, "conversation_id": conversation_id}
+
+
+# =======================================================
+# 5. 비동기 / 스트리밍 응답
+# =======================================================
+# DB 작업은 동기 Session을 사용하므로 스레드풀에서 실행하고,
+# LLM 호출만 이벤트 루프에서 await 합니다.
+# 🚨 세션은 단계마다 session_factory 로 짧게 열고 닫습니다
+#    (요청 세션을 스트림 끝까지 물고 있으면 LLM 대기 동안 커넥션 풀이 고갈됨)
+
+# 응답 앞부분이 이 문자로 시작하면 일정 등록 JSON일 수 있으므로 첫 JSON 객체가 판별될 때까지만 모아둡니다.
+# (일정 등록 JSON이면 끝까지 보류, 아니면 모은 부분을 토큰으로 내보내고 이어서 스트리밍)
+JSON_PREFIXES = ("{", "```")
+PREFIX_PROBE_CHARS = 8
+JSON_PROBE_MAX_CHARS = 1000
+_PARTIAL_LITERALS = ("true", "false", "null", "-")
+
+
+def _probe_intent_json(head: str) -> Optional[bool]:
+    """
+    JSON_PREFIXES 로 시작하는 응답 앞부분 판별
+    - True : 일정 등록 JSON (스트리밍 보류)
+    - False: 일반 답변 (JSON이 아니거나 다른 JSON)
+    - None : 아직 판단 불가 (더 받아야 함)
+    """
+    body = head
+    if body.startswith("```"):
+        newline = body.find("\n")
+        if newline < 0:
+            return None if len(body) < PREFIX_PROBE_CHARS * 2 else False
+        body = body[newline + 1:].lstrip()
+        if not body:
+            return None
+    if not body.startswith("{"):
+        return False
+    try:
+        data, _ = json.JSONDecoder().raw_decode(body)
+    except json.JSONDecodeError as e:
+        rest = body[e.pos:].strip()
+        if e.pos >= len(body) or e.msg.startswith("Unterminated string") or any(w.startswith(rest) for w in _PARTIAL_LITERALS):
+            return None
+        return False
+    return isinstance(data, dict) and data.get("intent") == "REGISTER_SCHEDULE"
+
+
+def _in_session(session_factory, fn, *args):
+    """ 짧은 세션 하나로 fn(db, *args) 실행 (스레드풀에서 호출) """
+    with session_factory() as db:
+        return fn(db, *args)
+
+
+async def generate_chatbot_response_async(session_factory, user_id: int, question: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    """ generate_chatbot_response 의 비동기 버전 (워커 스레드를 LLM 대기 시간 동안 점유하지 않음) """
+    final_text = None
+    async for event in stream_chatbot_response(session_factory, user_id, question, conversation_id):
+        if event["event"] == "done":
+            final_text = event["response"]
+            conversation_id = event["conversation_id"]
+    return {"response": final_text, "conversation_id": conversation_id}
+
+
+async def stream_chatbot_response(session_factory, user_id: int, question: str, conversation_id: Optional[str] = None):
+    """
+    LLM 스트리밍 응답을 토큰 단위 이벤트로 전달합니다.
+    - {"event": "token", "text": ...}  : 도착한 텍스트 조각
+    - {"event": "done", "response": ..., "conversation_id": ...} : 최종 응답 (DB 저장 후)
+    채팅 기록은 스트림이 끝난 뒤 한 번에 저장합니다.
+    session_factory: 호출할 때마다 새 Session 을 돌려주는 함수 (예: SessionLocal)
+    """
+    from starlette.concurrency import run_in_threadpool
+    import time
+    import uuid
+
+    if not conversation_id:
+        conversation_id = str(uuid.uuid4())
+
+    _save_chat_message(user_id, question, "user", conversation_id)
+
+    # 일정 등록 빠른 경로 (LLM 호출 없음)
+    registered = await run_in_threadpool(_in_session, session_factory, try_rule_based_schedule, user_id, question)
+    if registered is not None:
+        yield {"event": "token", "text": registered}
+        _save_chat_message(user_id, registered, "bot", conversation_id)
+        yield {"event": "done", "response": registered, "conversation_id": conversation_id}
+        return
+
+    prepared = await run_in_threadpool(_in_session, session_factory, prepare_chat_prompt, user_id, question, conversation_id)
+    if not prepared:
+        yield {"event": "done", "response": "사용자 정보를 찾을 수 없습니다. 다시 로그인해 주세요.", "conversation_id": conversation_id}
+        return
+
+    # 캐시 적중 시 전체 답변을 한 번에 전송 (get 도 임베딩 API 를 호출할 수 있으므로 스레드풀에서)
+    cached = await run_in_threadpool(_cached_answer, user_id, question, prepared)
+    if cached is not None:
+        yield {"event": "token", "text": cached}
+        _save_chat_message(user_id, cached, "bot", conversation_id)
+        yield {"event": "done", "response": cached, "conversation_id": conversation_id}
+        return
+
+    chunks: List[str] = []
+    try:
+        backend = _get_backend()
+        if not await run_in_threadpool(backend.available):
+            yield {"event": "done", "response": "챗봇 엔진 API 키가 설정되지 않았습니다.", "conversation_id": conversation_id}
+            return
+
+        started = time.perf_counter()
+
+        streaming = None  # None: 아직 판단 전, True: 토큰 전송, False: 일정 등록 JSON이라 보류
+        async for piece in backend.stream(prepared["prompt"]):
+            chunks.append(piece)
+
+            if streaming is None:
+                head = "".join(chunks).lstrip()
+                if not head.startswith(JSON_PREFIXES):
+                    if len(head) < PREFIX_PROBE_CHARS:
+                        continue
+                    streaming = True
+                else:
+                    # JSON이 완성되거나 깨질 때까지만 보류 (너무 길어지면 일반 답변으로 보고 내보냄)
+                    intent = _probe_intent_json(head)
+                    if intent is None and len(head) < JSON_PROBE_MAX_CHARS:
+                        continue
+                    streaming = not intent
+                if streaming:
+                    yield {"event": "token", "text": "".join(chunks)}
+                continue
+
+            if streaming:
+                yield {"event": "token", "text": piece}
+
+        text_response = "".join(chunks).strip()
+        if not text_response:
+            final_response = "죄송합니다. 안전 정책에 의해 답변이 차단되었습니다."
+        else:
+            if streaming is None:
+                # 프로브 길이보다 짧은 응답
+                yield {"event": "token", "text": text_response}
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            final_response = await run_in_threadpool(
+                _in_session, session_factory, handle_model_text, user_id, text_response, prepared["name"]
+            )
+            # 임베딩 계층이 켜져 있으면 put 이 임베딩 API 를 동기 호출하므로 스레드풀에서
+            await run_in_threadpool(_store_answer, user_id, question, prepared, text_response, final_response, latency_ms)
+
+    except Exception as e:
+        final_response = f"문제 발생: {str(e)[:50]}..."
+
+    try:
+        _save_chat_message(user_id, final_response, "bot", conversation_id)
+    except Exception:
+        traceback.print_exc()
+
+    yield {"event": "done", "response": final_response, "conversation_id": conversation_id}
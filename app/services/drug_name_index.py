@@ -0,0 +1,106 @@
+# app/services/drug_name_index.py
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.services.safety_kb import normalize_drug_name
+
+INDEX_TTL_SECONDS = 6 * 60 * 60  # 품목허가 데이터는 자주 바뀌지 않으므로 6시간
+
+
+class DrugNameIndex:
+    """
+    ProductLicense 품목명 인메모리 인덱스
+    - 정확 일치: 정규화 이름 → 첫 번째 품목
+    - 부분 일치: 정규화 이름 전체를 구분자로 이어붙인 문자열에서 str.find (LIKE '%token%' 대체)
+      찾은 오프셋 → 품목 번호는 시작 오프셋 배열 bisect 로 변환
+    """
+
+    SEPARATOR = "\n"
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self.exact: Dict[str, int] = {}
+        self.starts: List[int] = []
+
+        keys = []
+        offset = 0
+        for i, row in enumerate(rows):
+            key = normalize_drug_name(row.get("item_name"))
+            if key and key not in self.exact:
+                self.exact[key] = i
+            self.starts.append(offset)
+            keys.append(key)
+            offset += len(key) + len(self.SEPARATOR)
+
+        self.haystack = self.SEPARATOR.join(keys)
+        self.built_at = time.time()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, token: str) -> Optional[Dict]:
+        """ 토큰이 이름에 포함된 첫 품목 (정확 일치 우선) """
+        key = normalize_drug_name(token)
+        if len(key) < 2:
+            return None
+
+        i = self.exact.get(key)
+        if i is not None:
+            return self.rows[i]
+
+        pos = self.haystack.find(key)
+        if pos < 0:
+            return None
+        return self.rows[bisect.bisect_right(self.starts, pos) - 1]
+
+    def has_prefix(self, token: str) -> bool:
+        """ 토큰으로 시작하는 품목명이 있는지 (챗봇 일정 등록 시 약 이름 판별용, 부분 일치보다 엄격) """
+        key = normalize_drug_name(token)
+        if len(key) < 2:
+            return False
+        return key in self.exact or self.haystack.startswith(key) or (self.SEPARATOR + key) in self.haystack
+
+
+def build_drug_name_index(db: Session) -> DrugNameIndex:
+    from app.models.drug_info import ProductLicense
+
+    stmt = select(
+        ProductLicense.item_name.label("item_name"),
+        ProductLicense.entp_name.label("entp_name"),
+        ProductLicense.ingr_name.label("ingr_name"),
+        ProductLicense.induty.label("induty"),
+    ).where(ProductLicense.item_name.isnot(None)).order_by(ProductLicense.no)
+
+    rows = [dict(r._mapping) for r in db.execute(stmt)]
+    return DrugNameIndex(rows)
+
+
+# -------------------------------------------------
+# ✅ 프로세스 단위 싱글톤
+# -------------------------------------------------
+_DRUG_NAME_INDEX: Optional[DrugNameIndex] = None
+_DRUG_NAME_INDEX_LOCK = threading.Lock()
+
+
+def get_drug_name_index(db: Session) -> DrugNameIndex:
+    """ 최초 호출 시(또는 TTL 만료 시) 한 번만 구성 """
+    global _DRUG_NAME_INDEX
+    index = _DRUG_NAME_INDEX
+    if index is not None and time.time() - index.built_at < INDEX_TTL_SECONDS:
+        return index
+
+    with _DRUG_NAME_INDEX_LOCK:
+        if _DRUG_NAME_INDEX is None or time.time() - _DRUG_NAME_INDEX.built_at >= INDEX_TTL_SECONDS:
+            _DRUG_NAME_INDEX = build_drug_name_index(db)
+        return _DRUG_NAME_INDEX
+
+
+def invalidate_drug_name_index():
+    global _DRUG_NAME_INDEX
+    _DRUG_NAME_INDEX = None
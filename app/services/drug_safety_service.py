@@ -1,40 +1,99 @@
-
 from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+from app.services.safety_kb import get_safety_kb
+
+SENIOR_AGE = 65
 
 def check_drug_safety_for_user(db: Session, profile_id: int, drug_name: str, user_age: int, is_pregnant: bool) -> str:
     # 🚨 함수 내부에서 필요한 모델을 임포트합니다.
     from app.models.medication import ActiveMedication
-    from app.models.drug_info import DrugInteraction, PregnancyWarning
-    
+
+    # DUR 테이블을 매번 LIKE 조회하지 않고, 컴파일된 지식베이스(dict/set 조회)를 사용합니다.
+    kb = get_safety_kb(db)
+    drug = kb.resolve(name=drug_name)
+
     warnings = []
-    
+
     # 1. 임부 금기 확인 (if is_pregnant):
-    if is_pregnant:
-        # DB에서 임부 금기 약물인지 조회 (product_name 사용)
-        if db.query(PregnancyWarning).filter(PregnancyWarning.product_name.like(f"%{drug_name}%")).first():
-             # drug_name matches partial? Strict match? Using like for robustness
-            warnings.append("🚨 경고: 이 약물은 임산부에게 금기 또는 주의 필요 약물입니다.")
+    if is_pregnant and kb.find_pregnancy(drug):
+        warnings.append("🚨 경고: 이 약물은 임산부에게 금기 또는 주의 필요 약물입니다.")
 
-    # 2. 연령 제한 확인 (생략)
+    # 2. 연령 제한 확인 (연령 금기 + 노인 주의)
+    if user_age is not None:
+        for rule in kb.find_age_limit(drug, user_age * 12):
+            warnings.append(f"❌ 연령 금기: {rule['product_name'] or drug_name}은(는) 연령 금기 약물입니다. (기준: {rule['age']}{rule['age_unit'] or '세'})")
+            break
+        if user_age >= SENIOR_AGE and kb.find_senior(drug, risky_only=True):
+            warnings.append("🚨 노인 주의: 고령자에게 낙상·인지기능 저하 등의 위험이 있어 신중 투여가 필요합니다.")
 
     # 3. 약물 상호작용 확인 (현재 복용약 조합)
-    # ActiveMedication uses 'medication_name'
-    # Profile ID in ActiveMedication is 'patient_id' now (Wait, logic in chatbot might pass user_id as profile_id? 
-    # check_drug_safety_for_user is likely called with patient_profile_id. Assuming correct.)
-    
+    # ActiveMedication uses 'medication_name', patient_id == PatientProfile.id
+    # 새 약을 0번으로 두고 전체 목록을 성분 그래프에서 한 번에 탐색합니다.
     current_meds = db.query(ActiveMedication.medication_name).filter(ActiveMedication.patient_id == profile_id).all()
-    for med in current_meds:
-        current_drug_name = med.medication_name
-        # DrugInteraction 테이블에서 상호작용 조회 (product_name1, product_name2)
-        # Or ingredient? The previous logic used drug1, drug2.
-        # OpenData has `product_name1`, `product_name2`.
-        if db.query(DrugInteraction).filter(
-            (DrugInteraction.product_name1.like(f"%{drug_name}%")) & (DrugInteraction.product_name2.like(f"%{current_drug_name}%"))
-        ).first():
-            warnings.append(f"⚠️ 주의: 이 약물은 복용 중인 {current_drug_name}과 상호작용 가능성이 있습니다.")
+    regimen = [drug] + [kb.resolve(name=m.medication_name) for m in current_meds if m.medication_name]
+    for pair in kb.find_regimen_interactions(regimen):
+        if pair["index_a"] == 0:
+            warnings.append(f"⚠️ 주의: 이 약물은 복용 중인 {pair['drug_b']}과 상호작용 가능성이 있습니다.")
+
+    # 4. 회수 대상(위해) 의약품 확인
+    if kb.find_danger(drug):
+        warnings.append("🚨 경고: 회수 대상 의약품 목록에 포함된 제품입니다. 제조번호를 확인하세요.")
 
     if warnings:
         return " ".join(warnings)
     else:
-        return f"현재 정보로는 {drug_name} 복용에 특별한 안전성 문제가 발견되지 않았습니다."
\ No newline at end of file
+        return f"현재 정보로는 {drug_name} 복용에 특별한 안전성 문제가 발견되지 않았습니다."
+
+
+
+def check_regimen_interactions(db: Session, patient_ids: List[int]) -> Dict[int, List[dict]]:
+    """
+    환자(가족 구성원)별 전체 복용 목록의 병용금기 쌍을 조회합니다.
+    복용 목록은 한 번의 쿼리로 가져오고, 이후는 성분 그래프 해시 조회만 수행합니다.
+    """
+    from app.models.medication import ActiveMedication
+
+    if not patient_ids:
+        return {}
+
+    kb = get_safety_kb(db)
+    rows = db.query(ActiveMedication.patient_id, ActiveMedication.medication_name).filter(
+        ActiveMedication.patient_id.in_(patient_ids)
+    ).all()
+
+    regimens: Dict[int, List[dict]] = {pid: [] for pid in patient_ids}
+    for row in rows:
+        if row.medication_name:
+            regimens[row.patient_id].append(kb.resolve(name=row.medication_name))
+
+    return {pid: kb.find_regimen_interactions(drugs) for pid, drugs in regimens.items()}
+
+
+def check_family_interactions(db: Session, user_id: int) -> Dict[int, List[dict]]:
+    """ 주사용자 계정에 연결된 모든 PatientProfile의 병용금기 점검 """
+    from app.models.user import PatientProfile
+
+    patient_ids = [p.id for p in db.query(PatientProfile.id).filter(PatientProfile.user_id == user_id).all()]
+    return check_regimen_interactions(db, patient_ids)
+
+
+
+def check_efficacy_duplication_for_names(db: Session, drug_names: List[str]) -> List[dict]:
+    """ 약 이름 목록(OCR 결과 등)의 효능군 중복 그룹 """
+    kb = get_safety_kb(db)
+    drugs = [kb.resolve(name=n) for n in dict.fromkeys(n for n in drug_names if n)]
+    return kb.find_efficacy_duplicates(drugs)
+
+
+def check_efficacy_duplication_for_ocr(db: Session, normalized_medications: List[dict]) -> List[dict]:
+    """ normalize_medications 결과 리스트 기준 효능군 중복 """
+    return check_efficacy_duplication_for_names(db, [m.get("name") for m in normalized_medications])
+
+
+def check_active_efficacy_duplication(db: Session, patient_id: int) -> List[dict]:
+    """ 환자의 현재 복용약(ActiveMedication) 기준 효능군 중복 """
+    from app.models.medication import ActiveMedication
+
+    rows = db.query(ActiveMedication.medication_name).filter(ActiveMedication.patient_id == patient_id).all()
+    return check_efficacy_duplication_for_names(db, [r.medication_name for r in rows])
@@ -0,0 +1,55 @@
+# app/services/efficacy_index.py
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class EfficacyIndex:
+    """
+    효능군중복(duplicate_efficacy) 사전 매핑
+    제품코드 / 성분코드 → {(효능군, 그룹구분), ...}
+
+    기존 프로토타입은 '|'.join(약 이름) 정규식 하나로 테이블 전체를 훑었기 때문에
+    느리고, 이름에 괄호·+ 같은 정규식 메타문자가 있으면 깨졌습니다.
+    여기서는 약마다 키 몇 개를 조회한 뒤 그룹별로 묶기만 합니다.
+    """
+
+    def __init__(self):
+        self.by_product: Dict[str, Set[Tuple[str, str]]] = {}
+        self.by_ingredient: Dict[str, Set[Tuple[str, str]]] = {}
+
+    def add(self, product_code: str, ingredient_code: str, efficacy_group: str, group_div: str):
+        if not efficacy_group:
+            return
+        key = (efficacy_group, group_div or "")
+        if product_code:
+            self.by_product.setdefault(product_code, set()).add(key)
+        if ingredient_code:
+            self.by_ingredient.setdefault(ingredient_code, set()).add(key)
+
+    def groups_for(self, product_codes: Iterable[str], ingredient_codes: Iterable[str] = ()) -> Set[Tuple[str, str]]:
+        """ 제품코드 매핑이 있으면 그것을, 없으면 성분코드 매핑을 사용 """
+        groups = set()
+        for code in product_codes:
+            groups |= self.by_product.get(code, set())
+        if not groups:
+            for code in ingredient_codes:
+                groups |= self.by_ingredient.get(code, set())
+        return groups
+
+    def find_duplicates(self, drugs: List[dict]) -> List[dict]:
+        """
+        drugs: [{"name", "product_codes", "ingredient_codes"}, ...]
+        같은 (효능군, 그룹구분)에 2개 이상의 서로 다른 약이 속하면 중복으로 보고
+        """
+        members: Dict[Tuple[str, str], List[str]] = {}
+        for drug in drugs:
+            for key in self.groups_for(drug["product_codes"], drug["ingredient_codes"]):
+                names = members.setdefault(key, [])
+                if drug["name"] not in names:
+                    names.append(drug["name"])
+
+        return [
+            {"efficacy_group": group, "group_div": div, "drugs": names}
+            for (group, div), names in members.items()
+            if len(names) > 1
+        ]
@@ -0,0 +1,370 @@
+# app/services/ical_feed.py
+
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+# =======================================================
+# 복약 일정 iCalendar(.ics) 피드
+# =======================================================
+# 휴대폰 캘린더 앱이 구독하는 사용자별 피드입니다.
+# - 피드 버전 = schedule_change 의 마지막 id (sync token) + 날짜 (최근 FEED_PAST_DAYS 범위가 매일 바뀜) → ETag
+#     변경이 없으면 304 (DB 는 인덱스로 MAX(id) 1번만 조회)
+# - 만든 피드는 (user_id, 버전) 으로 메모리 캐시, 변경 기록 시 해당 사용자 항목 삭제
+# - 증분 동기화: sync token 이후 바뀐 객체(일정 행 / 반복 일정)만 객체 단위로 전달
+#     UID 는 "s{id}-..." (일정 행), "r{id}-..." (반복 일정) 이므로
+#     클라이언트는 같은 접두사의 이벤트를 통째로 교체/삭제하면 됨
+# - 반복 일정은 펼치지 않고 RRULE 그대로 (+ 건너뛴 날 EXDATE, 시각만 바뀐 날은 단일 이벤트)
+#
+# - 구독 URL 인증은 API 액세스 토큰(60분 만료)이 아닌 피드 전용 구독 키 (calendar_feed_token)
+#     캘린더 서버에 넘어가도 피드 조회만 가능, 재발급/폐기로 무효화
+#
+# record_changes / issue_feed_key / revoke_feed_key 는 커밋하지 않습니다 (호출 측에서 커밋)
+
+PRODID = "-//Medipin//Medication Schedule//KO"
+FEED_PAST_DAYS = 90          # 일정 행은 최근 90일 + 앞으로의 일정만 (반복 일정은 전체)
+FEED_CACHE_SIZE = 1000
+MAX_SYNC_CHANGES = 1000      # 이보다 많이 밀렸으면 전체 피드를 다시 받도록
+
+
+# -------------------------------------------------
+# ✅ 변경 기록 / sync token
+# -------------------------------------------------
+def record_changes(db: Session, user_id: int, kind: str, object_ids: Iterable[int], action: str = "upsert"):
+    from app.models.medication import ScheduleChange
+
+    rows = [{"user_id": user_id, "kind": kind, "object_id": oid, "action": action} for oid in object_ids if oid]
+    if not rows:
+        return
+    db.execute(insert(ScheduleChange), rows)
+    get_feed_cache().invalidate(user_id)
+
+
+def current_token(db: Session, user_id: int) -> int:
+    from app.models.medication import ScheduleChange
+
+    return db.scalar(select(func.max(ScheduleChange.id)).where(ScheduleChange.user_id == user_id)) or 0
+
+
+# -------------------------------------------------
+# ✅ 구독 키
+# -------------------------------------------------
+def _hash_feed_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def issue_feed_key(db: Session, user_id: int) -> str:
+    """ 새 구독 키 발급 (기존 키는 폐기) - 원문은 여기서만 반환 """
+    from app.models.medication import CalendarFeedToken
+
+    key = secrets.token_urlsafe(32)
+    revoke_feed_key(db, user_id)
+    db.add(CalendarFeedToken(user_id=user_id, token_hash=_hash_feed_key(key)))
+    return key
+
+
+def revoke_feed_key(db: Session, user_id: int) -> bool:
+    from app.models.medication import CalendarFeedToken
+
+    result = db.execute(delete(CalendarFeedToken).where(CalendarFeedToken.user_id == user_id))
+    return result.rowcount > 0
+
+
+def user_for_feed_key(db: Session, key: str) -> Optional[int]:
+    """ 구독 키 → user_id (없거나 폐기된 키면 None) """
+    from app.models.medication import CalendarFeedToken
+
+    if not key:
+        return None
+    return db.scalar(select(CalendarFeedToken.user_id).where(CalendarFeedToken.token_hash == _hash_feed_key(key)))
+
+
+# -------------------------------------------------
+# ✅ iCalendar 직렬화
+# -------------------------------------------------
+def _escape(text) -> str:
+    return (str(text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """ RFC 5545: 한 줄 75 octet 제한 (이어지는 줄은 공백으로 시작) """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, current, size = [], "", 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += ch
+        size += n
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _dt(value: datetime) -> str:
+    # 서버 시각(naive)을 그대로 floating time 으로 (기기 시간대 기준으로 표시)
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _event(uid: str, start: datetime, summary: str, description: str, notify: bool, stamp: str,
+           rrule: Optional[str] = None, exdates: List[datetime] = ()) -> List[str]:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@medipin",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_dt(start)}",
+        "DURATION:PT10M",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    if exdates:
+        lines.append("EXDATE:" + ",".join(_dt(d) for d in exdates))
+    if notify:
+        lines += ["BEGIN:VALARM", "ACTION:DISPLAY", f"DESCRIPTION:{_escape(summary)}", "TRIGGER:PT0M", "END:VALARM"]
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _summary(row: Dict) -> str:
+    return f"💊 {row.get('pill_name') or '약 복용'}" + (f" {row['dose']}" if row.get("dose") else "")
+
+
+def _description(row: Dict) -> str:
+    return " / ".join(str(v) for v in (row.get("meal_relation"), row.get("memo")) if v)
+
+
+def _schedule_events(row: Dict, stamp: str) -> List[str]:
+    """ medication_schedule 1행 (하루) → 복용 시각별 VEVENT """
+    from app.services.regimen import _parse_hhmm
+
+    lines = []
+    for i in range(1, 6):
+        t = _parse_hhmm(row.get(f"timing{i}")) if row.get(f"timing{i}") else None
+        if t is None or row.get("start_date") is None:
+            continue
+        lines += _event(f"s{row['id']}-t{i}", datetime.combine(row["start_date"], t), _summary(row),
+                        _description(row), bool(row.get("notify")), stamp)
+    return lines
+
+
+def _ical_rrule(reg: Dict) -> Tuple[Optional[date], str]:
+    """ 저장된 rrule → (실제 첫 날짜, iCalendar RRULE) - 종료는 end_date/UNTIL/COUNT 중 가장 이른 날로 UNTIL 통일 """
+    from app.services.regimen import WEEKDAY_CODES, effective_end, occurrence_dates, parse_rrule
+
+    rule = parse_rrule(reg["rrule"])
+    first = occurrence_dates(reg["rrule"], reg["start_date"], reg["end_date"],
+                             reg["start_date"], reg["start_date"] + timedelta(weeks=rule["interval"] + 1))
+    parts = [f"FREQ={rule['freq']}"]
+    if rule["interval"] > 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule["byday"]:
+        parts.append("BYDAY=" + ",".join(WEEKDAY_CODES[d] for d in rule["byday"]))
+    last = effective_end(rule, reg["start_date"], reg["end_date"])
+    if last is not None:
+        parts.append(f"UNTIL={last.strftime('%Y%m%d')}T235959")
+    return (first[0] if first else None), ";".join(parts)
+
+
+def _regimen_events(reg: Dict, overrides: List[Dict], stamp: str) -> List[str]:
+    """ 반복 일정 → 복용 시각별 RRULE VEVENT + 날짜별 예외 """
+    from app.services.regimen import _parse_hhmm, regimen_timings
+
+    first, rrule = _ical_rrule(reg)
+    if first is None:
+        return []
+
+    skipped = [o["occurrence_date"] for o in overrides if o.get("skipped") or o.get("override_timings")]
+    lines = []
+    for i, timing in enumerate(regimen_timings(reg), start=1):
+        t = _parse_hhmm(timing)
+        if t is None:
+            continue
+        lines += _event(f"r{reg['id']}-t{i}", datetime.combine(first, t), _summary(reg), _description(reg),
+                        bool(reg.get("notify")), stamp, rrule=rrule,
+                        exdates=[datetime.combine(d, t) for d in skipped])
+
+    # 그날만 시각이 바뀐 날짜는 단일 이벤트로
+    for o in overrides:
+        if o.get("skipped") or not o.get("override_timings"):
+            continue
+        day = o["occurrence_date"]
+        row = dict(reg, dose=o.get("override_dose") or reg["dose"], memo=o.get("memo") or reg["memo"])
+        for i, timing in enumerate(o["override_timings"].split(","), start=1):
+            t = _parse_hhmm(timing.strip())
+            if t is not None:
+                lines += _event(f"r{reg['id']}-{day.strftime('%Y%m%d')}-t{i}", datetime.combine(day, t),
+                                _summary(row), _description(row), bool(reg.get("notify")), stamp)
+    return lines
+
+
+def _calendar(lines: List[str]) -> str:
+    body = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+            "X-WR-CALNAME:Medipin 복약 일정"] + lines + ["END:VCALENDAR"]
+    return "\r\n".join(_fold(line) for line in body) + "\r\n"
+
+
+# -------------------------------------------------
+# ✅ 조회
+# -------------------------------------------------
+def _load_objects(db: Session, user_id: int, schedule_ids: Optional[List[int]] = None,
+                  regimen_ids: Optional[List[int]] = None) -> Tuple[List[Dict], List[Dict], Dict[int, List[Dict]]]:
+    """ (일정 행, 반복 일정, 반복 일정별 예외) - id 목록을 주면 그것만, 아니면 피드 전체 범위 """
+    from app.models.medication import MedicationRegimen, MedicationSchedule, RegimenOccurrence
+
+    schedules, regimens = [], []
+    if schedule_ids is None or schedule_ids:
+        stmt = select(MedicationSchedule.__table__).where(MedicationSchedule.user_id == user_id)
+        if schedule_ids is None:
+            stmt = stmt.where(MedicationSchedule.end_date >= date.today() - timedelta(days=FEED_PAST_DAYS))
+        else:
+            stmt = stmt.where(MedicationSchedule.id.in_(schedule_ids))
+        schedules = [dict(r._mapping) for r in db.execute(stmt.order_by(MedicationSchedule.start_date, MedicationSchedule.id))]
+
+    if regimen_ids is None or regimen_ids:
+        stmt = select(MedicationRegimen.__table__).where(MedicationRegimen.user_id == user_id)
+        if regimen_ids is not None:
+            stmt = stmt.where(MedicationRegimen.id.in_(regimen_ids))
+        regimens = [dict(r._mapping) for r in db.execute(stmt.order_by(MedicationRegimen.id))]
+
+    overrides: Dict[int, List[Dict]] = {}
+    if regimens:
+        stmt = select(RegimenOccurrence.__table__).where(
+            RegimenOccurrence.regimen_id.in_([r["id"] for r in regimens]),
+            (RegimenOccurrence.skipped == True) | RegimenOccurrence.override_timings.isnot(None),
+        ).order_by(RegimenOccurrence.occurrence_date)
+        for r in db.execute(stmt):
+            overrides.setdefault(r.regimen_id, []).append(dict(r._mapping))
+    return schedules, regimens, overrides
+
+
+def _stamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def feed_version(db: Session, user_id: int) -> Tuple[int, str]:
+    """ (sync token, 피드 버전 = ETag 값) """
+    token = current_token(db, user_id)
+    return token, f"{user_id}-{token}-{date.today().strftime('%Y%m%d')}"
+
+
+def build_feed(db: Session, user_id: int, version: str) -> str:
+    """ .ics 본문 - 같은 버전이면 캐시된 본문 """
+    cache = get_feed_cache()
+    cached = cache.get(user_id, version)
+    if cached is not None:
+        return cached
+
+    stamp = _stamp()
+    schedules, regimens, overrides = _load_objects(db, user_id)
+    lines = []
+    for row in schedules:
+        lines += _schedule_events(row, stamp)
+    for reg in regimens:
+        lines += _regimen_events(reg, overrides.get(reg["id"], []), stamp)
+    body = _calendar(lines)
+    cache.put(user_id, version, body)
+    return body
+
+
+def changes_since(db: Session, user_id: int, since: int) -> Optional[Dict]:
+    """
+    sync token 이후 바뀐 객체 (객체별 마지막 동작만)
+    반환: {"sync_token", "changes": [{"kind", "id", "uid_prefix", "action", "ics"}]}
+    token 이 잘못되었거나 너무 많이 밀렸으면 None (전체 피드를 다시 받아야 함)
+    """
+    from app.models.medication import ScheduleChange
+
+    token = current_token(db, user_id)
+    if since < 0 or since > token:
+        return None
+    if since == token:
+        return {"sync_token": token, "changes": []}
+
+    rows = db.execute(
+        select(ScheduleChange.id, ScheduleChange.kind, ScheduleChange.object_id, ScheduleChange.action)
+        .where(ScheduleChange.user_id == user_id, ScheduleChange.id > since)
+        .order_by(ScheduleChange.id)
+        .limit(MAX_SYNC_CHANGES + 1)
+    ).all()
+    if len(rows) > MAX_SYNC_CHANGES:
+        return None
+
+    latest: Dict[Tuple[str, int], str] = {}
+    for r in rows:
+        latest[(r.kind, r.object_id)] = r.action
+
+    schedules, regimens, overrides = _load_objects(
+        db, user_id,
+        schedule_ids=[oid for (kind, oid), action in latest.items() if kind == "schedule" and action != "delete"],
+        regimen_ids=[oid for (kind, oid), action in latest.items() if kind == "regimen" and action != "delete"],
+    )
+    stamp = _stamp()
+    rendered = {("schedule", row["id"]): _schedule_events(row, stamp) for row in schedules}
+    rendered.update({("regimen", reg["id"]): _regimen_events(reg, overrides.get(reg["id"], []), stamp) for reg in regimens})
+
+    changes = []
+    for (kind, oid), action in latest.items():
+        lines = rendered.get((kind, oid))
+        # 변경 후 삭제되었으면 (기록보다 먼저 지워진 경우 포함) delete 로 전달
+        if action == "delete" or lines is None:
+            changes.append({"kind": kind, "id": oid, "uid_prefix": f"{kind[0]}{oid}-", "action": "delete", "ics": None})
+        else:
+            changes.append({"kind": kind, "id": oid, "uid_prefix": f"{kind[0]}{oid}-", "action": "upsert", "ics": _calendar(lines)})
+    return {"sync_token": rows[-1].id if rows else token, "changes": changes}
+
+
+# -------------------------------------------------
+# ✅ 피드 캐시 (사용자별 최신 버전 1개, LRU)
+# -------------------------------------------------
+class FeedCache:
+
+    def __init__(self, max_entries: int = FEED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, version: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, version: str, body: str):
+        with self._lock:
+            self._entries[user_id] = (version, body)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_feed_cache = FeedCache()
+
+
+def get_feed_cache() -> FeedCache:
+    return _feed_cache
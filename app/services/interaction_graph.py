@@ -0,0 +1,82 @@
+# app/services/interaction_graph.py
+
+from typing import Dict, List, Iterable
+
+
+class InteractionGraph:
+    """
+    병용금기(drug_interaction)를 성분코드 단위 인접 리스트로 보관하는 그래프
+    - 간선은 항상 양방향으로 저장되므로 (A, B) / (B, A) 어느 쪽으로 조회해도 동일
+    - 한 환자의 전체 복용 목록을 한 번 순회하며 모든 금기 쌍을 찾습니다.
+    """
+
+    def __init__(self):
+        self.adjacency: Dict[str, Dict[str, dict]] = {}
+
+    def add(self, ingredient_a: str, ingredient_b: str, rule: dict):
+        if not ingredient_a or not ingredient_b or ingredient_a == ingredient_b:
+            return
+        self.adjacency.setdefault(ingredient_a, {})[ingredient_b] = rule
+        self.adjacency.setdefault(ingredient_b, {})[ingredient_a] = rule
+
+    def edge_count(self) -> int:
+        return sum(len(v) for v in self.adjacency.values()) // 2
+
+    def between(self, ingredients_a: Iterable[str], ingredients_b: Iterable[str]) -> List[dict]:
+        """ 두 성분 집합 사이의 금기 규칙 """
+        found = []
+        ingredients_b = set(ingredients_b)
+        for a in ingredients_a:
+            neighbors = self.adjacency.get(a)
+            if not neighbors:
+                continue
+            for b in ingredients_b:
+                rule = neighbors.get(b)
+                if rule is not None and rule not in found:
+                    found.append(rule)
+        return found
+
+    def find_pairs(self, regimen: List[dict]) -> List[dict]:
+        """
+        복용 목록 전체에서 금기 쌍을 찾습니다.
+        regimen: [{"name": ..., "ingredient_codes": {...}}, ...]
+
+        약을 하나씩 추가하면서 "지금까지 본 성분 → 약 인덱스" 해시와
+        새 약 성분의 인접 리스트 중 작은 쪽을 순회하므로 모든 비교가 해시 조회입니다.
+        """
+        seen: Dict[str, List[int]] = {}
+        pairs: Dict[tuple, dict] = {}
+
+        for idx, med in enumerate(regimen):
+            ingredients = med.get("ingredient_codes") or ()
+
+            for ingredient in ingredients:
+                neighbors = self.adjacency.get(ingredient)
+                if not neighbors:
+                    continue
+
+                if len(neighbors) < len(seen):
+                    hits = ((other, rule) for other, rule in neighbors.items() if other in seen)
+                else:
+                    hits = ((other, neighbors[other]) for other in seen if other in neighbors)
+
+                for other, rule in hits:
+                    for prev_idx in seen[other]:
+                        if prev_idx == idx:
+                            continue
+                        key = (prev_idx, idx)
+                        if key not in pairs:
+                            pairs[key] = {
+                                "drug_a": regimen[prev_idx].get("name"),
+                                "drug_b": med.get("name"),
+                                "index_a": prev_idx,
+                                "index_b": idx,
+                                "rules": [],
+                            }
+                        if rule not in pairs[key]["rules"]:
+                            pairs[key]["rules"].append(rule)
+
+            for ingredient in ingredients:
+                seen.setdefault(ingredient, []).append(idx)
+
+        return list(pairs.values())
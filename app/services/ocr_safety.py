@@ -0,0 +1,138 @@
+# app/services/ocr_safety.py
+
+import logging
+import time
+from typing import List, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.services.safety_kb import get_safety_kb
+from app.services.safety_engine import build_patient_info, run_comprehensive_safety_check
+
+logger = logging.getLogger("ocr")
+
+# OCR 파이프라인에 추가되는 시간 예산 (초과 시 경고 로그만 남김)
+SAFETY_BUDGET_MS = 10.0
+
+# 점검 결과 status → alert 레벨
+STATUS_TO_LEVEL = {
+    "Critical": "WARNING",
+    "Warning": "CAUTION",
+}
+
+
+def _dose_info(normalized: List[Dict]) -> List[Dict]:
+    """ normalize_medications 결과 → 용량/기간 점검 입력 """
+    info = []
+    for med in normalized:
+        try:
+            dose_per_time = float(str(med.get("dose", "1정")).replace("정", ""))
+        except ValueError:
+            dose_per_time = 1.0
+        info.append({
+            "drug_name": med.get("name"),
+            "dose_per_time": dose_per_time,
+            "times_per_day": med.get("frequency_per_day") or len(med.get("timing") or []) or 1,
+            "duration_days": med.get("days"),
+        })
+    return info
+
+
+def _load_profile(db: Session, user) -> tuple:
+    """ 본인 PatientProfile 특이사항 + 현재 복용약 이름 (쿼리 1회) """
+    from app.models.medication import ActiveMedication
+    from app.models.user import PatientProfile
+
+    rows = db.query(PatientProfile.special_note, ActiveMedication.medication_name).outerjoin(
+        ActiveMedication, ActiveMedication.patient_id == PatientProfile.id
+    ).filter(
+        PatientProfile.user_id == user.id,
+        PatientProfile.relation == "Self"
+    ).all()
+
+    note = rows[0].special_note if rows else None
+    active = [r.medication_name for r in rows if r.medication_name]
+    return note, active
+
+
+def screen_ocr_medications(db: Session, user, normalized: List[Dict]) -> Optional[Dict]:
+    """
+    OCR로 인식한 약 목록을 로그인 사용자 기준으로 DUR 점검합니다.
+    - 약 이름 → 제품코드 해석 (지식베이스 이름 인덱스)
+    - 환자 정보(나이/특이사항) 기반 금기 + 현재 복용약과의 병용금기/효능군 중복
+    반환: {"level", "reason", "findings", "resolved", "elapsed_ms"} (약이 없으면 None)
+    """
+    names = [m.get("name") for m in normalized if m.get("name")]
+    if not names:
+        return None
+
+    # 지식베이스 최초 컴파일은 앱 시작 시 미리 수행되므로 예산에서 제외
+    kb = get_safety_kb(db)
+    start = time.perf_counter()
+
+    resolved = []
+    for n in names:
+        drug = kb.resolve(name=n)
+        resolved.append({"name": n, "product_codes": sorted(drug["product_codes"])[:5]})
+
+    findings = []
+    if user is not None:
+        note, active = _load_profile(db, user)
+        patient_info = build_patient_info(user, special_note=note)
+    else:
+        active = []
+        patient_info = {}
+
+    patient_info["dose_info"] = _dose_info(normalized)
+    findings.extend(
+        f for f in run_comprehensive_safety_check(kb, names, patient_info)
+        if f["status"] not in ("Safe", "Info")
+    )
+
+    # 현재 복용약과의 교차 점검 (OCR 약 ↔ 복용약 쌍만 보고)
+    if active:
+        ocr_drugs = [dict(kb.resolve(name=n), name=n) for n in names]
+        active_drugs = [dict(kb.resolve(name=n), name=n) for n in active]
+        regimen = ocr_drugs + active_drugs
+
+        for pair in kb.find_regimen_interactions(regimen):
+            if (pair["index_a"] < len(names)) != (pair["index_b"] < len(names)):
+                for r in pair["rules"]:
+                    findings.append({
+                        "type": "병용금기",
+                        "status": "Critical",
+                        "message": f"❌ 병용 금기: '{pair['drug_a']}'과 복용 중인 '{pair['drug_b']}'은(는) 함께 복용 시 금기입니다. 사유: {r['reason']}",
+                        "details": "즉시 의사/약사와 상담이 필요합니다.",
+                    })
+
+        ocr_names = set(names)
+        for group in kb.find_efficacy_duplicates(regimen):
+            if ocr_names & set(group["drugs"]) and set(group["drugs"]) - ocr_names:
+                findings.append({
+                    "type": "효능군중복",
+                    "status": "Warning",
+                    "message": f"🚨 효능군 중복 주의: '{', '.join(group['drugs'])}'은(는) 복용 중인 약과 동일 효능군 '{group['efficacy_group']}'에 속합니다.",
+                    "details": "의사/약사와 상담하여 투여 약물을 조정해야 합니다.",
+                })
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms > SAFETY_BUDGET_MS:
+        logger.warning(f"[OCR SAFETY] budget exceeded: {elapsed_ms:.1f}ms (budget={SAFETY_BUDGET_MS}ms)")
+
+    level = "NORMAL"
+    reason = None
+    for f in findings:
+        candidate = STATUS_TO_LEVEL.get(f["status"])
+        if candidate == "WARNING" or (candidate == "CAUTION" and level == "NORMAL"):
+            level = candidate
+            reason = f["message"]
+            if level == "WARNING":
+                break
+
+    return {
+        "level": level,
+        "reason": reason,
+        "findings": findings,
+        "resolved": resolved,
+        "elapsed_ms": round(elapsed_ms, 2),
+    }
@@ -0,0 +1,369 @@
+# app/services/pill_index.py
+
+import re
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# -------------------------------------------------
+# ✅ 설정값
+# -------------------------------------------------
+INDEX_TTL_SECONDS = 6 * 60 * 60  # 6시간마다 재구성
+NGRAM_SIZE = 2
+
+# 자유 입력(q)에서 인식할 색상 / 모양 동의어 → DB 표기값
+COLOR_SYNONYMS = {
+    "하양": "하양", "흰색": "하양", "흰": "하양", "하얀": "하양", "white": "하양",
+    "노랑": "노랑", "노란": "노랑", "yellow": "노랑",
+    "주황": "주황", "orange": "주황",
+    "분홍": "분홍", "핑크": "분홍", "pink": "분홍",
+    "빨강": "빨강", "빨간": "빨강", "red": "빨강",
+    "갈색": "갈색", "brown": "갈색",
+    "연두": "연두",
+    "초록": "초록", "녹색": "초록", "green": "초록",
+    "청록": "청록",
+    "파랑": "파랑", "파란": "파랑", "blue": "파랑",
+    "남색": "남색", "navy": "남색",
+    "자주": "자주",
+    "보라": "보라", "purple": "보라",
+    "회색": "회색", "gray": "회색", "grey": "회색",
+    "검정": "검정", "검은": "검정", "black": "검정",
+    "투명": "투명", "clear": "투명",
+}
+
+SHAPE_SYNONYMS = {
+    "원형": "원형", "동그란": "원형", "round": "원형", "circle": "원형",
+    "타원형": "타원형", "oval": "타원형",
+    "장방형": "장방형", "oblong": "장방형", "capsule": "장방형",
+    "반원형": "반원형",
+    "삼각형": "삼각형", "triangle": "삼각형",
+    "사각형": "사각형", "square": "사각형",
+    "마름모형": "마름모형", "diamond": "마름모형",
+    "오각형": "오각형", "pentagon": "오각형",
+    "육각형": "육각형", "hexagon": "육각형",
+    "팔각형": "팔각형", "octagon": "팔각형",
+}
+
+# 각인 앞에 오는 표현 ("printed 'TY'", "각인 TY")
+IMPRINT_MARKERS = ("printed", "print", "imprint", "각인", "표시", "문자")
+
+# 랭킹 가중치
+SCORE_SHAPE = 2.0
+SCORE_COLOR = 2.0
+SCORE_IMPRINT = 5.0
+SCORE_IMPRINT_EXACT = 3.0
+SCORE_LINE = 0.5
+SCORE_SIZE = 1.0
+
+
+def normalize_imprint(text: Optional[str]) -> str:
+    """ 각인 문자열 정규화 (대문자, 공백/기호 제거) """
+    if not text:
+        return ""
+    return re.sub(r"[^0-9A-Z가-힣]", "", str(text).upper())
+
+
+def make_ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """ 정규화된 각인의 n-gram 집합 (n보다 짧으면 문자열 자체) """
+    if not text:
+        return set()
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def bit_positions(mask: int, size: int) -> np.ndarray:
+    """
+    비트셋에서 켜진 비트 위치(행 번호) 배열
+    - 비트를 하나씩 지우면 큰 int 를 매번 새로 만들어 O(k·n) → 바이트로 한 번 풀어서 O(n)
+    """
+    if not mask:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_pill_query(text: str) -> Dict[str, Optional[str]]:
+    """
+    자유 입력 검색어를 모양 / 색상 / 각인으로 분해
+    예) "white round tablet printed 'TY'" → {"shape": "원형", "color": "하양", "imprint": "TY"}
+    """
+    result = {"shape": None, "color": None, "imprint": None}
+    if not text:
+        return result
+
+    # 1) 따옴표로 감싼 부분은 각인으로 간주
+    quoted = re.search(r"['\"‘’“”](.+?)['\"‘’“”]", text)
+    if quoted:
+        result["imprint"] = quoted.group(1)
+        text = text.replace(quoted.group(0), " ")
+
+    tokens = text.split()
+    expect_imprint = False
+    leftovers = []
+
+    for token in tokens:
+        word = token.lower().strip(",.")
+        if word in IMPRINT_MARKERS:
+            expect_imprint = True
+            continue
+        if expect_imprint and not result["imprint"]:
+            result["imprint"] = token
+            expect_imprint = False
+            continue
+        if word in SHAPE_SYNONYMS and not result["shape"]:
+            result["shape"] = SHAPE_SYNONYMS[word]
+            continue
+        if word in COLOR_SYNONYMS and not result["color"]:
+            result["color"] = COLOR_SYNONYMS[word]
+            continue
+        leftovers.append(token)
+
+    # 2) 영문/숫자만으로 된 남은 토큰은 각인 후보
+    if not result["imprint"]:
+        for token in leftovers:
+            if re.fullmatch(r"[0-9A-Za-z\-]{1,10}", token) and token.lower() not in ("tablet", "pill", "capsule", "정", "알"):
+                result["imprint"] = token
+                break
+
+    return result
+
+
+class PillIndex:
+    """
+    PillIdentifier 전체를 메모리에 올린 다중 속성 인덱스
+    - 모양 / 색상: 값별 비트셋(int)
+    - 각인(앞/뒤): n-gram → 비트셋, (앞, 뒤) 조합별 n-gram 집합은 구성 시 한 번만 계산
+      (같은 각인 조합이 많으므로 유사도는 후보 중 서로 다른 조합마다 한 번만 계산)
+      n-gram 보다 짧은 검색어("T")용으로 글자(unigram) → 비트셋도 보관
+    - 분할선 / 크기 점수용 값은 NumPy 배열 (후보 전체를 한 번에 계산)
+    """
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.shape_bits: Dict[str, int] = {}
+        self.color_bits: Dict[str, int] = {}
+        self.ngram_bits: Dict[str, int] = {}
+        self.char_bits: Dict[str, int] = {}
+        # 각인 조합 번호 → ((각인, n-gram 집합), ...) - 앞/뒤 중 비어있지 않은 것만
+        self.imprint_grams: List[Tuple[Tuple[str, FrozenSet[str]], ...]] = []
+        self.imprint_ids = np.zeros(len(rows), dtype=np.int64)
+        imprint_id_of: Dict[Tuple[str, str], int] = {}
+        self.has_line = np.zeros(len(rows), dtype=bool)
+        self.lengths = np.full(len(rows), np.nan)
+        self.all_bits = (1 << len(rows)) - 1
+        self.built_at = time.time()
+
+        for i, row in enumerate(rows):
+            bit = 1 << i
+
+            if row["drug_shape"]:
+                self.shape_bits[row["drug_shape"]] = self.shape_bits.get(row["drug_shape"], 0) | bit
+
+            for color in (row["color_class1"], row["color_class2"]):
+                if color:
+                    for c in re.split(r"[,|/]", color):
+                        c = c.strip()
+                        if c:
+                            self.color_bits[c] = self.color_bits.get(c, 0) | bit
+
+            if row["line_front"] or row["line_back"]:
+                self.has_line[i] = True
+
+            length = _to_float(row["leng_long"])
+            if length is not None:
+                self.lengths[i] = length
+
+            key = (normalize_imprint(row["print_front"]), normalize_imprint(row["print_back"]))
+            imprint_id = imprint_id_of.get(key)
+            if imprint_id is None:
+                imprint_id = imprint_id_of[key] = len(self.imprint_grams)
+                self.imprint_grams.append(tuple((part, frozenset(make_ngrams(part))) for part in key if part))
+            self.imprint_ids[i] = imprint_id
+            for part, grams in self.imprint_grams[imprint_id]:
+                for gram in grams:
+                    self.ngram_bits[gram] = self.ngram_bits.get(gram, 0) | bit
+                for char in set(part):
+                    self.char_bits[char] = self.char_bits.get(char, 0) | bit
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(
+        self,
+        shape: Optional[str] = None,
+        color: Optional[str] = None,
+        imprint: Optional[str] = None,
+        has_line: Optional[bool] = None,
+        size: Optional[float] = None,
+        limit: int = 20,
+    ) -> List[Dict]:
+        """
+        비트셋 교집합으로 후보를 좁힌 뒤 점수순으로 정렬
+        - 모양/색상이 있으면 각인은 후보를 거르지 않고 점수에만 반영 (각인 오독/누락이어도 모양·색상 후보 유지)
+        - 각인만 있으면 각인이 일치하는 행이 후보
+        """
+        shape = SHAPE_SYNONYMS.get((shape or "").lower(), shape)
+        color = COLOR_SYNONYMS.get((color or "").lower(), color)
+
+        mask = self.all_bits
+        if shape:
+            mask &= self.shape_bits.get(shape, 0)
+        if color:
+            mask &= self.color_bits.get(color, 0)
+
+        query_imprint = normalize_imprint(imprint)
+        query_grams = make_ngrams(query_imprint)
+        imprint_mask = 0
+        if query_grams:
+            # 하나라도 일치하는 n-gram(짧은 검색어는 글자)이 있는 행
+            bits = self.ngram_bits if len(query_imprint) >= NGRAM_SIZE else self.char_bits
+            for gram in query_grams:
+                imprint_mask |= bits.get(gram, 0)
+            if not (shape or color):
+                mask &= imprint_mask
+
+        if not mask or not (shape or color or query_grams):
+            return []
+
+        candidates = bit_positions(mask, len(self.rows))
+        scores = np.full(len(candidates), (SCORE_SHAPE if shape else 0.0) + (SCORE_COLOR if color else 0.0))
+
+        if query_grams:
+            # 각인 점수는 일치하는 행만 계산 (나머지 후보는 0점)
+            hits = bit_positions(mask & imprint_mask, len(self.rows))
+            ids, inverse = np.unique(self.imprint_ids[hits], return_inverse=True)
+            similarity = np.fromiter(
+                (self._imprint_similarity(k, query_imprint, query_grams) for k in ids.tolist()),
+                dtype=float, count=len(ids),
+            )
+            scores[np.searchsorted(candidates, hits)] += SCORE_IMPRINT * similarity[inverse]
+
+        if has_line is not None:
+            scores += SCORE_LINE * (self.has_line[candidates] == has_line)
+
+        if size is not None:
+            lengths = self.lengths[candidates]
+            known = ~np.isnan(lengths)
+            scores[known] += SCORE_SIZE / (1.0 + np.abs(lengths[known] - size))
+
+        # 점수 내림차순, 같으면 행 번호순
+        order = np.lexsort((candidates, -scores))[:limit]
+        scored = [(float(scores[k]), int(candidates[k])) for k in order]
+
+        results = []
+        for score, i in scored:
+            row = self.rows[i]
+            results.append({
+                "id": row["item_seq"],
+                "drug_name": row["item_name"],
+                "manufacturer": row["company_name"],
+                "drug_shape": row["drug_shape"],
+                "color_class1": row["color_class1"],
+                "color_class2": row["color_class2"],
+                "print_front": row["print_front"],
+                "print_back": row["print_back"],
+                "item_image": row["item_image"],
+                "score": round(score, 3),
+            })
+        return results
+
+    def _imprint_similarity(self, imprint_id: int, query_imprint: str, query_grams: set) -> float:
+        """
+        앞/뒤 각인 중 더 비슷한 쪽의 n-gram Jaccard (+ 완전 일치 가산)
+        n-gram 보다 짧은 검색어는 각인에서 차지하는 글자 비율
+        """
+        best = 0.0
+        short = len(query_imprint) < NGRAM_SIZE
+        for part, grams in self.imprint_grams[imprint_id]:
+            if short:
+                overlap = len(query_imprint) / len(part) if query_imprint in part else 0.0
+            else:
+                overlap = len(query_grams & grams) / len(query_grams | grams)
+            if part == query_imprint:
+                overlap += SCORE_IMPRINT_EXACT / SCORE_IMPRINT
+            best = max(best, overlap)
+        return best
+
+
+# -------------------------------------------------
+# ✅ 프로세스 단위 싱글톤
+# -------------------------------------------------
+_PILL_INDEX: Optional[PillIndex] = None
+_PILL_INDEX_LOCK = threading.Lock()
+
+
+def build_pill_index(db: Session) -> PillIndex:
+    """ 식별에 필요한 컬럼만 projection 조회하여 인덱스 생성 """
+    from app.models.drug_info import PillIdentifier
+
+    stmt = select(
+        PillIdentifier.item_seq,
+        PillIdentifier.item_name,
+        PillIdentifier.company_name,
+        PillIdentifier.drug_shape,
+        PillIdentifier.color_class1,
+        PillIdentifier.color_class2,
+        PillIdentifier.print_front,
+        PillIdentifier.print_back,
+        PillIdentifier.line_front,
+        PillIdentifier.line_back,
+        PillIdentifier.leng_long,
+        PillIdentifier.item_image,
+    )
+    rows = [dict(r._mapping) for r in db.execute(stmt)]
+    return PillIndex(rows)
+
+
+def get_pill_index(db: Session) -> PillIndex:
+    """ 최초 호출 시(또는 TTL 만료 시) 한 번만 인덱스를 구성 """
+    global _PILL_INDEX
+    index = _PILL_INDEX
+    if index is not None and time.time() - index.built_at < INDEX_TTL_SECONDS:
+        return index
+
+    with _PILL_INDEX_LOCK:
+        if _PILL_INDEX is None or time.time() - _PILL_INDEX.built_at >= INDEX_TTL_SECONDS:
+            _PILL_INDEX = build_pill_index(db)
+        return _PILL_INDEX
+
+
+def invalidate_pill_index():
+    global _PILL_INDEX
+    _PILL_INDEX = None
+
+
+def identify_pills(
+    db: Session,
+    q: Optional[str] = None,
+    shape: Optional[str] = None,
+    color: Optional[str] = None,
+    imprint: Optional[str] = None,
+    has_line: Optional[bool] = None,
+    size: Optional[float] = None,
+    limit: int = 20,
+) -> List[Dict]:
+    """
+    모양 / 색상 / 각인 기반 낱알 식별 검색
+    명시적 파라미터가 자유 입력(q)보다 우선합니다.
+    """
+    parsed = parse_pill_query(q) if q else {}
+    return get_pill_index(db).search(
+        shape=shape or parsed.get("shape"),
+        color=color or parsed.get("color"),
+        imprint=imprint or parsed.get("imprint"),
+        has_line=has_line,
+        size=size,
+        limit=limit,
+    )
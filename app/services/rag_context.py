@@ -0,0 +1,227 @@
+# app/services/rag_context.py
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, or_, and_
+from sqlalchemy.orm import Session
+
+from app.services.drug_name_index import get_drug_name_index
+from app.services.rag_index import peek_rag_index
+from app.services.chat_memory import load_conversation_memory
+
+logger = logging.getLogger("chatbot")
+
+# =======================================================
+# 챗봇 RAG 컨텍스트 조립
+# =======================================================
+# 사용자 요약 / 복약 일정 / 의료기관 / 약물 정보를 단계(stage)별로 나눠 동시에 실행합니다.
+# - 각 단계는 자기 Session 으로 쿼리 1회
+#   (약물 정보는 BM25 검색 인덱스 상위 k개 패시지, 인덱스가 아직 준비되지 않았으면 인메모리 이름 인덱스)
+# - 나머지 단계는 예산(ms)을 넘기면 결과 없이 건너뜀 (아직 시작 못 한 단계는 취소해서 워커를 비움)
+# - 사용자 요약은 프롬프트에 반드시 필요하므로 예산을 넘기면 요청 스레드에서 직접 조회
+#   (동시 채팅이 많아 워커가 밀려 있어도 무한정 기다리지 않음)
+
+STAGE_BUDGET_MS = {
+    "summary": 500,
+    "memory": 300,
+    "schedule": 300,
+    "medical": 500,
+    "drug": 200,
+}
+
+SCHEDULE_KEYWORDS = ["약", "일정", "스케줄", "먹을", "복용"]
+MEDICAL_KEYWORDS = ["병원", "응급", "약국", "내과", "이비인후과", "정형외과", "소아과", "진료"]
+PARTICLES = ["은", "는", "이", "가", "을", "를"]
+RAG_TOP_K = 3
+
+# 요청 1건당 최대 5단계가 동시에 제출되므로 동시 채팅 수 x 5 정도로 (단계마다 DB 커넥션 1개 사용 → 엔진 풀 크기도 함께 조정)
+RAG_STAGE_WORKERS = int(os.getenv("RAG_STAGE_WORKERS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=RAG_STAGE_WORKERS, thread_name_prefix="rag-stage")
+
+
+# -------------------------------------------------
+# ✅ 단계별 조회 함수 (db → 결과)
+# -------------------------------------------------
+def load_user_summary(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+    """ 주사용자 + 가족 구성원 + 본인 특이사항 (쿼리 1회) """
+    from app.models.user import UserProfile, PatientProfile
+
+    stmt = select(
+        UserProfile.id, UserProfile.name, UserProfile.age, PatientProfile.special_note
+    ).outerjoin(
+        PatientProfile,
+        and_(
+            UserProfile.id == user_id,
+            PatientProfile.user_id == user_id,
+            PatientProfile.relation == "Self",
+        )
+    ).where(
+        or_(UserProfile.id == user_id, UserProfile.user_id == user_id)
+    )
+
+    user = None
+    members = []
+    for r in db.execute(stmt):
+        if r.id == user_id:
+            if user is None or (r.special_note and not user["special_note"]):
+                user = {"name": r.name, "age": r.age, "special_note": r.special_note}
+        else:
+            members.append(r.name)
+
+    if not user:
+        return None
+    user["family_members"] = members
+    return user
+
+
+def load_schedule_text(db: Session, user_id: int) -> str:
+    from app.models.medication import MedicationSchedule
+
+    stmt = select(
+        MedicationSchedule.pill_name, MedicationSchedule.dose, MedicationSchedule.start_date,
+        MedicationSchedule.timing1, MedicationSchedule.timing2, MedicationSchedule.timing3,
+        MedicationSchedule.timing4, MedicationSchedule.timing5,
+    ).where(
+        MedicationSchedule.user_id == user_id,
+        MedicationSchedule.start_date >= date.today()
+    ).limit(5)
+
+    rows = db.execute(stmt).all()
+    if not rows:
+        return "=== 사용자 복약 일정 ===\n(예정된 일정이 없습니다.)"
+
+    sch_text = "=== 사용자 복약 일정 ===\n"
+    for s in rows:
+        time_info = ", ".join(str(t) for t in (s.timing1, s.timing2, s.timing3, s.timing4, s.timing5) if t)
+        sch_text += f"- {s.pill_name} ({s.dose}): {s.start_date} {time_info}\n"
+    return sch_text
+
+
+def load_medical_text(db: Session, keyword: str) -> str:
+    from app.models.map import MasterMedical
+
+    stmt = select(MasterMedical.name, MasterMedical.tel, MasterMedical.address).where(
+        (MasterMedical.name.like(f"%{keyword}%")) |
+        (MasterMedical.departments.like(f"%{keyword}%"))
+    ).limit(3)
+
+    places = db.execute(stmt).all()
+    if not places:
+        return ""
+
+    med_text = f"=== 추천 의료 기관 ({keyword} 관련) ===\n"
+    for p in places:
+        med_text += f"- {p.name} (전화: {p.tel}, 주소: {p.address})\n"
+    return med_text
+
+
+def load_drug_text(db: Session, query: str) -> str:
+    """ 질문 토큰 중 품목명에 포함되는 첫 약물 (인메모리 인덱스, 쿼리 없음) """
+    index = get_drug_name_index(db)
+
+    for token in query.split():
+        # 조사는 어미에서만 제거 (단어 중간의 '이' 등을 지우면 '타이레놀' → '타레놀'이 됨)
+        clean_token = token.rstrip("?!.,")
+        if clean_token.endswith(tuple(PARTICLES)) and len(clean_token) > 2:
+            clean_token = clean_token[:-1]
+        if len(clean_token) < 2:
+            continue
+
+        drug = index.lookup(clean_token)
+        if drug:
+            drug_text = f"=== 약물 정보: {drug['item_name']} ===\n"
+            if drug["entp_name"]: drug_text += f"제조사: {drug['entp_name']}\n"
+            if drug["ingr_name"]: drug_text += f"성분: {drug['ingr_name']}\n"
+            if drug["induty"]: drug_text += f"분류: {drug['induty']}\n"
+            return drug_text
+    return ""
+
+
+def load_passage_text(db: Session, query: str) -> str:
+    """ BM25 검색 인덱스 상위 k개 패시지 (쿼리 없음) """
+    hits = peek_rag_index().search(query, k=RAG_TOP_K)
+    if not hits:
+        return ""
+    return "=== 관련 의약품 정보 ===\n" + "".join(f"- {h['text']}\n" for h in hits)
+
+
+# -------------------------------------------------
+# ✅ 조립
+# -------------------------------------------------
+def _run_stage(bind, name: str, fn, *args):
+    """ 단계 전용 Session 으로 실행하고 소요 시간 기록 """
+    start = time.perf_counter()
+    session = Session(bind=bind)
+    try:
+        return fn(session, *args)
+    finally:
+        session.close()
+        logger.info(f"[RAG] stage={name} {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+def _medical_keyword(query: str) -> Optional[str]:
+    for k in MEDICAL_KEYWORDS:
+        if k in query:
+            return k
+    return None
+
+
+def build_chat_context(db: Session, user_id: int, query: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    반환: {"summary": get_user_summary 결과 또는 None, "rag_data": 컨텍스트 문자열,
+           "memory": 대화 메모리 {"summary", "turns"}, "timings": {stage: ms}}
+    컨텍스트 섹션 순서는 기존과 동일 (일정 → 의료기관 → 약물)
+    """
+    bind = db.get_bind()
+    started = time.perf_counter()
+
+    futures = {"summary": _executor.submit(_run_stage, bind, "summary", load_user_summary, user_id)}
+    if any(k in query for k in SCHEDULE_KEYWORDS):
+        futures["schedule"] = _executor.submit(_run_stage, bind, "schedule", load_schedule_text, user_id)
+    keyword = _medical_keyword(query)
+    if keyword:
+        futures["medical"] = _executor.submit(_run_stage, bind, "medical", load_medical_text, keyword)
+    if peek_rag_index() is not None:
+        futures["drug"] = _executor.submit(_run_stage, bind, "drug", load_passage_text, query)
+    else:
+        futures["drug"] = _executor.submit(_run_stage, bind, "drug", load_drug_text, query)
+    if conversation_id:
+        futures["memory"] = _executor.submit(
+            _run_stage, bind, "memory", load_conversation_memory, user_id, conversation_id, query
+        )
+
+    parts = {}
+    timings = {}
+    for name in ("schedule", "medical", "drug", "memory"):
+        future = futures.get(name)
+        if future is None:
+            continue
+        # 단계 예산은 조립 시작 시점 기준 (동시에 실행되므로)
+        deadline = started + STAGE_BUDGET_MS[name] / 1000
+        try:
+            parts[name] = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+        except FutureTimeout:
+            future.cancel()
+            logger.warning(f"[RAG] stage={name} exceeded budget {STAGE_BUDGET_MS[name]}ms; skipped")
+        except Exception as e:
+            logger.error(f"[RAG] stage={name} failed: {e}")
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    deadline = started + STAGE_BUDGET_MS["summary"] / 1000
+    try:
+        summary = futures["summary"].result(timeout=max(0.0, deadline - time.perf_counter()))
+    except FutureTimeout:
+        futures["summary"].cancel()
+        logger.warning(f"[RAG] stage=summary exceeded budget {STAGE_BUDGET_MS['summary']}ms; loading inline")
+        summary = load_user_summary(db, user_id)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+
+    rag_data = "\n\n".join(parts[n] for n in ("schedule", "medical", "drug") if parts.get(n))
+    memory = parts.get("memory") or {"summary": "", "turns": []}
+    return {"summary": summary, "rag_data": rag_data, "memory": memory, "timings": timings}
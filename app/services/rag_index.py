@@ -0,0 +1,352 @@
+# app/services/rag_index.py
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import BASE_DIR
+from app.services.safety_kb import normalize_product_code
+
+logger = logging.getLogger("chatbot")
+
+# =======================================================
+# 챗봇 근거(grounding)용 BM25 검색 인덱스
+# =======================================================
+# 패시지(passage) 단위:
+#   - 품목 1건 = 허가정보 + 낱알 외형(PillIdentifier) + DUR 주의사항 요약
+#   - DUR 에만 있는 제품 = DUR 요약 패시지
+#   - 병용금기 = 성분 쌍 1건
+# 용어(term) = 단어 토큰 + 한글 음절 bigram (띄어쓰기 없는 제품명/조사 붙은 질문 대응)
+#
+# 디스크 형식 (RAG_INDEX_DIR):
+#   postings.npy / tfs.npy / term_offsets.npy  : 용어별 CSR 역색인
+#   doc_len.npy / text_bytes.npy / text_offsets.npy : 문서 길이, 패시지 본문(UTF-8)
+#   vocab.json / meta.json
+# 로드 시 np.load(mmap_mode="r") 로 페이지 캐시를 공유하므로 워커가 여러 개여도 메모리를 중복 사용하지 않습니다.
+
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(BASE_DIR, "rag_index"))
+INDEX_MAX_AGE_SECONDS = 24 * 60 * 60   # 디스크 인덱스 재생성 주기
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_SCORE = 2.0                # 이 점수 미만 패시지는 근거로 쓰지 않음
+RELATIVE_CUTOFF = 0.5          # 1위 점수 대비 비율
+MAX_NOTE_CHARS = 80
+
+ARRAY_FILES = ("postings", "tfs", "term_offsets", "doc_len", "text_bytes", "text_offsets")
+
+_TOKEN_RE = re.compile(r"[a-z]+|[0-9]+(?:\.[0-9]+)?|[가-힣]+")
+
+
+# -------------------------------------------------
+# ✅ 토큰화
+# -------------------------------------------------
+def tokenize(text: Optional[str]) -> List[str]:
+    """ 단어 토큰 + 한글 토큰의 음절 bigram """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    terms = []
+    for tok in _TOKEN_RE.findall(text):
+        terms.append(tok)
+        if "가" <= tok[0] <= "힣" and len(tok) > 2:
+            terms.extend(tok[i:i + 2] for i in range(len(tok) - 1))
+    return terms
+
+
+def _short(text, limit: int = MAX_NOTE_CHARS) -> str:
+    text = re.sub(r"\s+", " ", str(text or "")).strip()
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+# -------------------------------------------------
+# ✅ 검색 인덱스
+# -------------------------------------------------
+class RagIndex:
+
+    def __init__(self, arrays: Dict[str, np.ndarray], vocab: Dict[str, int], meta: Dict):
+        self.postings = arrays["postings"]
+        self.tfs = arrays["tfs"]
+        self.term_offsets = arrays["term_offsets"]
+        self.doc_len = arrays["doc_len"]
+        self.text_bytes = arrays["text_bytes"]
+        self.text_offsets = arrays["text_offsets"]
+        self.vocab = vocab
+        self.meta = meta
+
+        self.n_docs = len(self.doc_len)
+        self.avgdl = float(meta.get("avgdl") or 1.0)
+        df = np.diff(np.asarray(self.term_offsets)).astype(np.float32)
+        self.idf = np.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # BM25 문서 길이 정규화 항은 질의와 무관하므로 미리 계산
+        self.len_norm = (BM25_K1 * (1 - BM25_B + BM25_B * np.asarray(self.doc_len) / self.avgdl)).astype(np.float32)
+
+    def __len__(self):
+        return self.n_docs
+
+    def passage(self, doc_id: int) -> str:
+        start, end = int(self.text_offsets[doc_id]), int(self.text_offsets[doc_id + 1])
+        return bytes(self.text_bytes[start:end]).decode("utf-8")
+
+    def search(self, query: str, k: int = 3) -> List[Dict]:
+        """ BM25 상위 k개 패시지 [{"score", "text"}] """
+        term_ids = [self.vocab[t] for t in set(tokenize(query)) if t in self.vocab]
+        if not term_ids or not self.n_docs:
+            return []
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for t in term_ids:
+            start, end = int(self.term_offsets[t]), int(self.term_offsets[t + 1])
+            docs = self.postings[start:end]
+            tf = self.tfs[start:end]
+            # 한 용어의 postings 안에서 문서는 중복되지 않으므로 fancy-index 누적 가능
+            scores[docs] += self.idf[t] * tf * (BM25_K1 + 1) / (tf + self.len_norm[docs])
+
+        k = min(k, self.n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        best = float(scores[top[0]])
+        if best < MIN_SCORE:
+            return []
+        return [
+            {"score": round(float(scores[d]), 3), "text": self.passage(int(d))}
+            for d in top
+            if scores[d] >= best * RELATIVE_CUTOFF
+        ]
+
+
+def compile_rag_index(passages: List[str]) -> RagIndex:
+    """ 패시지 목록 → CSR 역색인 배열 """
+    vocab: Dict[str, int] = {}
+    term_col, doc_col, tf_col = array("i"), array("i"), array("H")
+    doc_len = np.zeros(len(passages), dtype=np.float32)
+
+    for doc_id, text in enumerate(passages):
+        counts = Counter(tokenize(text))
+        doc_len[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            term_col.append(vocab.setdefault(term, len(vocab)))
+            doc_col.append(doc_id)
+            tf_col.append(min(tf, 65535))
+
+    terms = np.frombuffer(term_col, dtype=np.int32)
+    order = np.argsort(terms, kind="stable")
+    term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(terms, minlength=len(vocab)), out=term_offsets[1:])
+
+    encoded = [p.encode("utf-8") for p in passages]
+    text_offsets = np.zeros(len(passages) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=text_offsets[1:])
+
+    arrays = {
+        "postings": np.frombuffer(doc_col, dtype=np.int32)[order],
+        "tfs": np.frombuffer(tf_col, dtype=np.uint16)[order].astype(np.float32),
+        "term_offsets": term_offsets,
+        "doc_len": doc_len,
+        "text_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "text_offsets": text_offsets,
+    }
+    meta = {"built_at": time.time(), "n_docs": len(passages), "avgdl": float(doc_len.mean()) if len(passages) else 1.0}
+    return RagIndex(arrays, vocab, meta)
+
+
+# -------------------------------------------------
+# ✅ 저장 / 로드
+# -------------------------------------------------
+def save_rag_index(index: RagIndex, path: str = RAG_INDEX_DIR):
+    """ 임시 디렉터리에 쓴 뒤 교체 (다른 워커가 읽는 도중 파일이 반쯤 바뀌지 않도록) """
+    tmp = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for name in ARRAY_FILES:
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(getattr(index, name)))
+    with open(os.path.join(tmp, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(index.vocab, f, ensure_ascii=False)
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(index.meta, f, ensure_ascii=False)
+
+    if os.path.isdir(path):
+        old = f"{path}.old{os.getpid()}"
+        os.rename(path, old)
+        os.rename(tmp, path)
+        for name in os.listdir(old):
+            os.remove(os.path.join(old, name))
+        os.rmdir(old)
+    else:
+        os.rename(tmp, path)
+
+
+def load_rag_index(path: str = RAG_INDEX_DIR) -> Optional[RagIndex]:
+    """ 디스크 인덱스를 mmap 으로 로드 (없으면 None) """
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAY_FILES}
+    with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+        vocab = json.load(f)
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    return RagIndex(arrays, vocab, meta)
+
+
+# -------------------------------------------------
+# ✅ DB → 패시지
+# -------------------------------------------------
+def _rows(db: Session, *columns):
+    return [dict(r._mapping) for r in db.execute(select(*columns))]
+
+
+def collect_passages(db: Session) -> List[str]:
+    from app.models.drug_info import (
+        AgeLimit, Breastfeeding, DoseLimit, DrugInteraction, DurationWarning,
+        PregnancyWarning, SeniorWarning, ProductLicense, PillIdentifier,
+    )
+
+    # 1. DUR 주의사항: 제품코드 → 요약 문구
+    notes: Dict[str, List[str]] = {}
+    dur_names: Dict[str, str] = {}
+
+    def note(row, text):
+        pc = normalize_product_code(row["product_code"])
+        if not pc:
+            return
+        dur_names.setdefault(pc, f"{row['product_name']} ({row['ingredient_name']})")
+        bucket = notes.setdefault(pc, [])
+        if text not in bucket:
+            bucket.append(text)
+
+    for r in _rows(db, PregnancyWarning.product_code, PregnancyWarning.product_name,
+                   PregnancyWarning.ingredient_name, PregnancyWarning.grade, PregnancyWarning.details):
+        note(r, f"임부금기 {r['grade'] or ''}등급: {_short(r['details'])}")
+    for r in _rows(db, SeniorWarning.product_code, SeniorWarning.product_name,
+                   SeniorWarning.ingredient_name, SeniorWarning.details):
+        note(r, f"노인주의: {_short(r['details'])}")
+    for r in _rows(db, AgeLimit.product_code, AgeLimit.product_name, AgeLimit.ingredient_name,
+                   AgeLimit.specific_age, AgeLimit.specific_age_unit, AgeLimit.details):
+        note(r, f"연령금기 {r['specific_age']}{r['specific_age_unit'] or ''}: {_short(r['details'])}")
+    for r in _rows(db, Breastfeeding.product_code, Breastfeeding.product_name,
+                   Breastfeeding.ingredient_name, Breastfeeding.remarks):
+        note(r, f"수유부주의: {_short(r['remarks'])}")
+    for r in _rows(db, DoseLimit.product_code, DoseLimit.product_name,
+                   DoseLimit.ingredient_name, DoseLimit.max_dose_1day):
+        note(r, f"1일 최대투여량 {r['max_dose_1day']}")
+    for r in _rows(db, DurationWarning.product_code, DurationWarning.product_name,
+                   DurationWarning.ingredient_name, DurationWarning.max_days):
+        note(r, f"최대투여기간 {r['max_days']}일")
+
+    # 2. 낱알 외형: 품목기준코드 → 요약 문구
+    appearance: Dict[str, str] = {}
+    for r in _rows(db, PillIdentifier.item_seq, PillIdentifier.drug_shape, PillIdentifier.color_class1,
+                   PillIdentifier.print_front, PillIdentifier.print_back, PillIdentifier.class_name,
+                   PillIdentifier.etc_otc_name):
+        seq = normalize_product_code(r["item_seq"])
+        if not seq:
+            continue
+        marks = "/".join(m for m in (r["print_front"], r["print_back"]) if m)
+        parts = [f"{r['color_class1'] or ''} {r['drug_shape'] or ''}".strip()]
+        if marks:
+            parts.append(f"각인 {marks}")
+        if r["class_name"]:
+            parts.append(f"분류 {r['class_name']}")
+        if r["etc_otc_name"]:
+            parts.append(r["etc_otc_name"])
+        appearance[seq] = ", ".join(p for p in parts if p)
+
+    # 3. 품목 패시지 (허가정보 + 외형 + DUR)
+    passages = []
+    covered = set()
+    for r in _rows(db, ProductLicense.item_seq, ProductLicense.item_name, ProductLicense.entp_name,
+                   ProductLicense.ingr_name, ProductLicense.induty, ProductLicense.spclty_pblc,
+                   ProductLicense.product_type, ProductLicense.edi_code):
+        if not r["item_name"]:
+            continue
+        fields = [f"[의약품] {r['item_name']}"]
+        if r["entp_name"]: fields.append(f"제조사: {r['entp_name']}")
+        if r["ingr_name"]: fields.append(f"성분: {_short(r['ingr_name'])}")
+        if r["product_type"]: fields.append(f"분류: {r['product_type']}")
+        if r["spclty_pblc"]: fields.append(r["spclty_pblc"])
+        elif r["induty"]: fields.append(r["induty"])
+
+        seq = normalize_product_code(r["item_seq"])
+        if seq in appearance:
+            fields.append(f"외형: {appearance[seq]}")
+
+        dur = []
+        for edi in re.split(r"[,\s]+", r["edi_code"] or ""):
+            pc = normalize_product_code(edi)
+            if pc in notes:
+                covered.add(pc)
+                dur.extend(n for n in notes[pc] if n not in dur)
+        if dur:
+            fields.append("DUR: " + "; ".join(dur))
+        passages.append(" | ".join(fields))
+
+    # 4. 허가정보와 연결되지 않은 DUR 제품
+    for pc, bucket in notes.items():
+        if pc not in covered:
+            passages.append(f"[DUR] {dur_names[pc]} | " + "; ".join(bucket))
+
+    # 5. 병용금기: 성분 쌍 단위 (제품 예시 최대 3개씩)
+    pairs: Dict[tuple, Dict] = {}
+    for r in _rows(db, DrugInteraction.ingredient_name1, DrugInteraction.ingredient_name2,
+                   DrugInteraction.product_name1, DrugInteraction.product_name2, DrugInteraction.prohibit_reason):
+        a, b = r["ingredient_name1"] or "", r["ingredient_name2"] or ""
+        key = (a, b) if a <= b else (b, a)
+        pair = pairs.setdefault(key, {"reason": r["prohibit_reason"], "products": [set(), set()]})
+        first, second = (r["product_name1"], r["product_name2"]) if a <= b else (r["product_name2"], r["product_name1"])
+        for slot, name in ((0, first), (1, second)):
+            if name and len(pair["products"][slot]) < 3:
+                pair["products"][slot].add(name)
+
+    for (a, b), pair in pairs.items():
+        examples = ", ".join(sorted(pair["products"][0] | pair["products"][1]))
+        passages.append(f"[병용금기] {a} + {b}: {_short(pair['reason'])} | 예: {examples}")
+
+    return passages
+
+
+def build_rag_index(db: Session, path: Optional[str] = RAG_INDEX_DIR) -> RagIndex:
+    start = time.perf_counter()
+    index = compile_rag_index(collect_passages(db))
+    if path:
+        save_rag_index(index, path)
+        index = load_rag_index(path)
+    logger.info(f"[RAG INDEX] built {len(index)} passages in {(time.perf_counter() - start):.1f}s")
+    return index
+
+
+# -------------------------------------------------
+# ✅ 프로세스 단위 싱글톤
+# -------------------------------------------------
+# 요청 경로에서는 절대 빌드하지 않습니다. (peek_rag_index 는 준비되지 않았으면 None)
+# 빌드는 앱 시작 시 백그라운드 스레드 또는 build_rag_index.py 스크립트로 수행합니다.
+_RAG_INDEX: Optional[RagIndex] = None
+_RAG_INDEX_LOCK = threading.Lock()
+
+
+def peek_rag_index() -> Optional[RagIndex]:
+    return _RAG_INDEX
+
+
+def ensure_rag_index(db: Session, path: str = RAG_INDEX_DIR) -> Optional[RagIndex]:
+    """ 디스크 인덱스가 있고 최신이면 로드, 아니면 빌드 후 저장 """
+    global _RAG_INDEX
+    with _RAG_INDEX_LOCK:
+        index = load_rag_index(path)
+        if index is None or time.time() - index.meta.get("built_at", 0) >= INDEX_MAX_AGE_SECONDS:
+            index = build_rag_index(db, path)
+        _RAG_INDEX = index
+        return index
+
+
+def invalidate_rag_index():
+    global _RAG_INDEX
+    _RAG_INDEX = None
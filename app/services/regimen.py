@@ -0,0 +1,340 @@
+# app/services/regimen.py
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+# =======================================================
+# 반복 규칙(RRULE) 기반 복약 일정
+# =======================================================
+# medication_regimen 1행 = 기간 전체. 날짜별 일정/알림은 요청된 구간만 계산해서 만들고,
+# 날짜별로 바뀐 상태(복용 여부, 건너뜀, 시각/용량 변경, 알림 확인)만 regimen_occurrence 에 저장합니다.
+# → 저장량/조회량이 치료 기간이 아니라 "조회 구간"과 "상태가 바뀐 날" 수에 비례
+#
+# 지원 규칙 (RFC 5545 RRULE 일부)
+#   FREQ=DAILY|WEEKLY, INTERVAL=n, BYDAY=MO,TU,..., COUNT=n, UNTIL=YYYYMMDD
+
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+SUPPORTED_FREQS = ("DAILY", "WEEKLY")
+MAX_COUNT = 3650
+
+
+def parse_rrule(rule: Optional[str]) -> Dict:
+    """ "FREQ=WEEKLY;BYDAY=MO,WE" → {"freq", "interval", "byday", "count", "until"} (지원하지 않으면 ValueError) """
+    parts = {}
+    for item in (rule or "FREQ=DAILY").upper().replace("RRULE:", "").split(";"):
+        if not item.strip():
+            continue
+        key, _, value = item.partition("=")
+        parts[key.strip()] = value.strip()
+
+    freq = parts.get("FREQ", "DAILY")
+    if freq not in SUPPORTED_FREQS:
+        raise ValueError(f"Unsupported FREQ: {freq}")
+
+    interval = int(parts.get("INTERVAL", 1))
+    if interval < 1:
+        raise ValueError("INTERVAL must be >= 1")
+
+    byday = []
+    if parts.get("BYDAY"):
+        for code in parts["BYDAY"].split(","):
+            if code not in WEEKDAY_CODES:
+                raise ValueError(f"Unsupported BYDAY: {code}")
+            byday.append(WEEKDAY_CODES.index(code))
+
+    count = int(parts["COUNT"]) if parts.get("COUNT") else None
+    if count is not None and not 1 <= count <= MAX_COUNT:
+        raise ValueError(f"COUNT must be between 1 and {MAX_COUNT}")
+
+    until = datetime.strptime(parts["UNTIL"][:8], "%Y%m%d").date() if parts.get("UNTIL") else None
+
+    return {"freq": freq, "interval": interval, "byday": sorted(set(byday)), "count": count, "until": until}
+
+
+# -------------------------------------------------
+# ✅ 전개 (구간 안의 날짜만 산술적으로 계산)
+# -------------------------------------------------
+def _dates_between(rule: Dict, start: date, window_start: date, window_end: date) -> List[date]:
+    """ 시작일 기준 규칙으로 [window_start, window_end] 안의 날짜 (start 이전 제외) """
+    window_start = max(window_start, start)
+    if window_start > window_end:
+        return []
+
+    interval = rule["interval"]
+    if rule["freq"] == "DAILY":
+        offset = (window_start - start).days
+        first = -(-offset // interval) * interval  # offset 이상인 첫 배수
+        last = (window_end - start).days
+        return [start + timedelta(days=d) for d in range(first, last + 1, interval)]
+
+    # WEEKLY: 시작일이 속한 주(월요일 시작)를 0주차로 보고 INTERVAL 주마다 BYDAY 요일
+    weekdays = rule["byday"] or [start.weekday()]
+    week0 = start - timedelta(days=start.weekday())
+    first_week = (window_start - week0).days // 7
+    first_week += (-first_week) % interval
+    result = []
+    week = first_week
+    while True:
+        monday = week0 + timedelta(weeks=week)
+        if monday > window_end:
+            break
+        for wd in weekdays:
+            day = monday + timedelta(days=wd)
+            if window_start <= day <= window_end:
+                result.append(day)
+        week += interval
+    return result
+
+
+def effective_end(rule: Dict, start: date, end: Optional[date]) -> Optional[date]:
+    """ end_date / UNTIL / COUNT 중 가장 이른 마지막 날 (모두 없으면 None = 무기한) """
+    candidates = [d for d in (end, rule["until"]) if d is not None]
+    if rule["count"]:
+        # COUNT 번째 날짜: 규칙상 최대 간격(주 단위 x INTERVAL) 만큼의 구간에서 찾음
+        horizon = start + timedelta(weeks=rule["interval"] * rule["count"] + 1)
+        days = _dates_between(rule, start, start, min(candidates + [horizon]))
+        if days:
+            candidates.append(days[min(rule["count"], len(days)) - 1])
+    return min(candidates) if candidates else None
+
+
+def occurrence_dates(rrule: Optional[str], start: date, end: Optional[date], window_start: date, window_end: date) -> List[date]:
+    rule = parse_rrule(rrule)
+    last = effective_end(rule, start, end)
+    if last is not None:
+        window_end = min(window_end, last)
+    return _dates_between(rule, start, window_start, window_end)
+
+
+def regimen_timings(regimen: Dict) -> List[str]:
+    return [regimen[f"timing{i}"] for i in range(1, 6) if regimen.get(f"timing{i}")]
+
+
+def _parse_hhmm(value: str) -> Optional[time]:
+    try:
+        hour, minute = value.split(":")[:2]
+        return time(int(hour), int(minute))
+    except (ValueError, AttributeError):
+        return None
+
+
+# -------------------------------------------------
+# ✅ 조회
+# -------------------------------------------------
+def _load_regimens(db: Session, user_ids: Optional[Iterable[int]], window_start: date, window_end: date) -> List[Dict]:
+    from app.models.medication import MedicationRegimen
+
+    stmt = select(MedicationRegimen.__table__).where(
+        MedicationRegimen.start_date <= window_end,
+        or_(MedicationRegimen.end_date.is_(None), MedicationRegimen.end_date >= window_start),
+    )
+    if user_ids is not None:
+        stmt = stmt.where(MedicationRegimen.user_id.in_(list(user_ids)))
+    return [dict(r._mapping) for r in db.execute(stmt)]
+
+
+def _load_overrides(db: Session, regimen_ids: List[int], window_start: date, window_end: date) -> Dict[tuple, Dict]:
+    from app.models.medication import RegimenOccurrence
+
+    if not regimen_ids:
+        return {}
+    stmt = select(RegimenOccurrence.__table__).where(
+        RegimenOccurrence.regimen_id.in_(regimen_ids),
+        RegimenOccurrence.occurrence_date >= window_start,
+        RegimenOccurrence.occurrence_date <= window_end,
+    )
+    return {(r.regimen_id, r.occurrence_date): dict(r._mapping) for r in db.execute(stmt)}
+
+
+def expand_schedules(db: Session, user_ids: Optional[Iterable[int]], window_start: date, window_end: date) -> List[Dict]:
+    """
+    구간 안의 반복 일정을 medication_schedule 행과 같은 모양의 dict 로 전개 (쿼리 2번)
+    - id 는 None, 대신 regimen_id + occurrence_date 로 식별
+    - 건너뜀(skipped) 처리된 날짜는 제외
+    """
+    regimens = _load_regimens(db, user_ids, window_start, window_end)
+    overrides = _load_overrides(db, [r["id"] for r in regimens], window_start, window_end)
+
+    result = []
+    for reg in regimens:
+        base_timings = regimen_timings(reg)
+        for day in occurrence_dates(reg["rrule"], reg["start_date"], reg["end_date"], window_start, window_end):
+            occ = overrides.get((reg["id"], day)) or {}
+            if occ.get("skipped"):
+                continue
+            timings = occ["override_timings"].split(",") if occ.get("override_timings") else base_timings
+            item = {
+                "id": None,
+                "regimen_id": reg["id"],
+                "occurrence_date": day,
+                "user_id": reg["user_id"],
+                "pill_name": reg["pill_name"],
+                "dose": occ.get("override_dose") or reg["dose"],
+                "start_date": day,
+                "end_date": day,
+                "meal_relation": reg["meal_relation"],
+                "memo": occ.get("memo") or reg["memo"],
+                "notify": reg["notify"],
+                "is_taken": bool(occ.get("is_taken")),
+                "created_at": reg["created_at"],
+                "rrule": reg["rrule"],
+                "acknowledged_until": occ.get("acknowledged_until"),
+            }
+            for i in range(5):
+                item[f"timing{i+1}"] = timings[i].strip() if i < len(timings) else None
+            result.append(item)
+    return result
+
+
+def expand_alarms(db: Session, user_id: Optional[int], window_start: datetime, window_end: datetime) -> List[Dict]:
+    """
+    구간 안의 반복 일정 알림 (alarms 행 + pill_name/is_taken 과 같은 모양, 오래된 순)
+    user_id 가 None 이면 전체 사용자 (알림 디스패처용)
+    """
+    alarms = []
+    user_ids = [user_id] if user_id is not None else None
+    for occ in expand_schedules(db, user_ids, window_start.date(), window_end.date()):
+        if not occ["notify"]:
+            continue
+        acked = occ["acknowledged_until"]
+        for i in range(1, 6):
+            t = _parse_hhmm(occ[f"timing{i}"]) if occ[f"timing{i}"] else None
+            if t is None:
+                continue
+            alarm_time = datetime.combine(occ["occurrence_date"], t)
+            if not window_start <= alarm_time <= window_end:
+                continue
+            alarms.append({
+                "id": None,
+                "user_id": occ["user_id"],
+                "schedule_id": None,
+                "regimen_id": occ["regimen_id"],
+                "occurrence_date": occ["occurrence_date"],
+                "alarm_time": alarm_time,
+                "message": f"{occ['pill_name']} 복약 시간입니다.",
+                "is_read": acked is not None and alarm_time <= acked,
+                "pill_name": occ["pill_name"],
+                "is_taken": occ["is_taken"],
+            })
+    alarms.sort(key=lambda a: a["alarm_time"])
+    return alarms
+
+
+# -------------------------------------------------
+# ✅ 생성 / 날짜별 상태 변경
+# -------------------------------------------------
+def create_regimen(db: Session, user_id: int, pill_name: str, start_date: date, end_date: Optional[date],
+                   timings: List[str], rrule: str = "FREQ=DAILY", **fields):
+    from app.models.medication import MedicationRegimen
+
+    parse_rrule(rrule)  # 형식 검증 (ValueError)
+    timings_map = {f"timing{i+1}": t for i, t in enumerate(timings[:5])}
+    regimen = MedicationRegimen(
+        user_id=user_id,
+        pill_name=pill_name,
+        rrule=rrule.upper().replace("RRULE:", ""),
+        start_date=start_date,
+        end_date=end_date,
+        **timings_map,
+        **fields,
+    )
+    db.add(regimen)
+    db.flush()
+    _record_feed_change(db, regimen)
+    db.commit()
+    db.refresh(regimen)
+    _reload_dispatcher()
+    return regimen
+
+
+def _record_feed_change(db: Session, regimen):
+    """ 캘린더 피드(.ics) 에 보이는 값(시각/건너뜀)이 바뀌었음을 기록 """
+    from app.services.ical_feed import record_changes
+    record_changes(db, regimen.user_id, "regimen", [regimen.id])
+
+
+def _reload_dispatcher():
+    """ 알림 시각이 바뀌었을 수 있으므로 디스패처가 다시 읽도록 """
+    from app.services.alarm_dispatcher import get_alarm_dispatcher
+    get_alarm_dispatcher().reload()
+
+
+def is_occurrence(regimen, day: date) -> bool:
+    return bool(occurrence_dates(regimen.rrule, regimen.start_date, regimen.end_date, day, day))
+
+
+def upsert_occurrence(db: Session, regimen, day: date, **fields):
+    """ 특정 날짜 상태 저장 (없으면 생성) - 규칙상 존재하지 않는 날짜면 ValueError """
+    from app.models.medication import RegimenOccurrence
+
+    if not is_occurrence(regimen, day):
+        raise ValueError(f"{day} is not an occurrence of regimen {regimen.id}")
+
+    occ = db.query(RegimenOccurrence).filter(
+        RegimenOccurrence.regimen_id == regimen.id,
+        RegimenOccurrence.occurrence_date == day,
+    ).first()
+    if occ is None:
+        occ = RegimenOccurrence(regimen_id=regimen.id, occurrence_date=day, is_taken=False, skipped=False)
+        db.add(occ)
+
+    for key, value in fields.items():
+        setattr(occ, key, value)
+    schedule_changed = any(k in fields for k in ("override_timings", "skipped", "override_dose", "memo"))
+    if schedule_changed:
+        _record_feed_change(db, regimen)
+    db.commit()
+    db.refresh(occ)
+    if "override_timings" in fields or "skipped" in fields:
+        _reload_dispatcher()
+    return occ
+
+
+def acknowledge_alarm(db: Session, regimen, alarm_time: datetime):
+    """ 반복 일정 알림 확인 = 해당 날짜 복용 완료 + alarm_time 까지 읽음 (기존 /alarms/{id}/read 와 같은 동작) """
+    from app.models.medication import RegimenOccurrence
+
+    existing = db.query(RegimenOccurrence.acknowledged_until).filter(
+        RegimenOccurrence.regimen_id == regimen.id,
+        RegimenOccurrence.occurrence_date == alarm_time.date(),
+    ).scalar()
+    until = max(existing, alarm_time) if existing else alarm_time
+    return upsert_occurrence(db, regimen, alarm_time.date(), is_taken=True, acknowledged_until=until)
+
+
+def acknowledge_alarms_before(db: Session, user_id: int, window_start: datetime, before: datetime) -> int:
+    """
+    before 까지 울린 반복 일정 알림 일괄 확인 (날짜마다 acknowledge_alarm 과 같은 결과)
+    상태 행은 한 번에 읽고 없는 것만 추가, 커밋은 호출 측 (같은 트랜잭션에서 일반 알림과 함께 처리)
+    """
+    from app.models.medication import RegimenOccurrence
+
+    latest: Dict[tuple, datetime] = {}
+    for a in expand_alarms(db, user_id, window_start, before):
+        if a["is_read"]:
+            continue
+        key = (a["regimen_id"], a["occurrence_date"])
+        latest[key] = max(latest.get(key, a["alarm_time"]), a["alarm_time"])
+    if not latest:
+        return 0
+
+    existing = {
+        (o.regimen_id, o.occurrence_date): o
+        for o in db.query(RegimenOccurrence).filter(
+            RegimenOccurrence.regimen_id.in_({k[0] for k in latest}),
+            RegimenOccurrence.occurrence_date.in_({k[1] for k in latest}),
+        )
+    }
+    for (regimen_id, day), alarm_time in latest.items():
+        occ = existing.get((regimen_id, day))
+        if occ is None:
+            db.add(RegimenOccurrence(regimen_id=regimen_id, occurrence_date=day, is_taken=True,
+                                     skipped=False, acknowledged_until=alarm_time))
+            continue
+        occ.is_taken = True
+        if occ.acknowledged_until is None or occ.acknowledged_until < alarm_time:
+            occ.acknowledged_until = alarm_time
+    return len(latest)
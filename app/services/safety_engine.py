@@ -0,0 +1,323 @@
+# app/services/safety_engine.py
+
+# 키정보/drug_safety_analyzer.py 의 run_comprehensive_safety_check 를 서비스용으로 이식한 엔진
+# - CSV 즉시 로드 + iterrows + str.contains 대신, 컴파일된 SafetyKnowledgeBase 조회 사용
+# - 약 이름은 배치 전체에서 한 번만 해석하고, 환자별 비교(연령/용량/기간)는 NumPy 배열 연산으로 처리
+
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.services.safety_kb import SafetyKnowledgeBase
+
+SENIOR_AGE = 65
+
+
+# -------------------------------------------------
+# ✅ 환자 정보 정규화
+# -------------------------------------------------
+def normalize_age_unit(unit: Optional[str]) -> str:
+    """ 연령 단위 표준화 (년/개월) """
+    if unit and "개월" in unit:
+        return "개월"
+    return "년"
+
+
+def patient_age_months(patient_info: Dict[str, Any]) -> Optional[float]:
+    """ child_age(+age_unit) 또는 age → 개월 단위 나이 """
+    child_age = patient_info.get("child_age") or 0
+    if child_age > 0:
+        if normalize_age_unit(patient_info.get("age_unit")) == "개월":
+            return float(child_age)
+        return float(child_age) * 12
+    age = patient_info.get("age")
+    if age is not None:
+        return float(age) * 12
+    return None
+
+
+def build_patient_info(profile, special_note: Optional[str] = None) -> Dict[str, Any]:
+    """
+    UserProfile / PatientProfile → run_comprehensive_safety_check 용 patient_info
+    임신/수유 여부는 특이사항 텍스트에서 추정합니다.
+    """
+    age = getattr(profile, "age", None)
+    birth_date = getattr(profile, "birth_date", None)
+    if age is None and birth_date:
+        today = date.today()
+        age = today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+    note = special_note or getattr(profile, "special_note", None) or ""
+
+    return {
+        "age": age,
+        "is_elderly": age is not None and age >= SENIOR_AGE,
+        "is_pregnant": "임신" in note or "임부" in note,
+        "is_lactating": "수유" in note,
+        "child_age": age if age is not None and age < 19 else 0,
+        "age_unit": "년",
+        "dose_info": [],
+    }
+
+
+# -------------------------------------------------
+# ✅ 약 단위 사실(fact) 사전 계산
+# -------------------------------------------------
+def compile_drug_facts(kb: SafetyKnowledgeBase, drug_name: str) -> Dict[str, Any]:
+    """
+    환자와 무관한 조회 결과를 한 번에 모아 둡니다.
+    배치 호출에서는 같은 약에 대해 한 번만 계산됩니다.
+    """
+    drug = kb.resolve(name=drug_name)
+
+    age_rules = [r for r in kb.age_limit.lookup(drug["product_codes"], drug["ingredient_codes"]) if r["age_months"] is not None]
+    dose_rules = [r for r in kb.find_dose_limit(drug) if r["max_dose"] and r["unit_strength"]]
+    duration_rules = [r for r in kb.find_duration(drug) if r["max_days"] is not None]
+
+    return {
+        "drug": drug,
+        "senior": kb.find_senior(drug, risky_only=True),
+        "pregnancy": kb.find_pregnancy(drug),
+        "breastfeeding": kb.find_breastfeeding(drug),
+        "age_rules": age_rules,
+        "age_thresholds": np.array([r["age_months"] for r in age_rules], dtype=float),
+        "dose_rules": dose_rules,
+        "dose_max": np.array([r["max_dose"] for r in dose_rules], dtype=float),
+        "dose_strength": np.array([r["unit_strength"] for r in dose_rules], dtype=float),
+        "duration_rules": duration_rules,
+        "duration_max": np.array([r["max_days"] for r in duration_rules], dtype=float),
+    }
+
+
+# -------------------------------------------------
+# ✅ 개별 검사 (결과 형식은 프로토타입과 동일)
+# -------------------------------------------------
+def _elderly(name: str, facts: dict) -> List[dict]:
+    if not facts["senior"]:
+        return [{"type": "노인주의", "status": "Safe", "message": f"✅ '{name}'은(는) 주요 노인 위험 키워드에 해당하지 않습니다."}]
+    return [{
+        "type": "노인주의",
+        "status": "Warning",
+        "message": f"🚨 노인 위험: '{r['product_name']}'은(는) {r['details']} 등의 위험으로 고령자 신중 투여가 필요합니다.",
+        "details": f"성분명: {r['ingredient_name']}",
+    } for r in facts["senior"]]
+
+
+def _pregnancy(name: str, facts: dict) -> List[dict]:
+    if not facts["pregnancy"]:
+        return [{"type": "임부금기", "status": "Safe", "message": f"✅ '{name}'은(는) 임부 금기 목록에서 확인되지 않습니다."}]
+    results = []
+    for r in facts["pregnancy"]:
+        grade = str(r["grade"])
+        status = "Critical" if grade in ["1", "2"] else "Warning" if grade == "3" else "Info"
+        results.append({
+            "type": "임부금기",
+            "status": status,
+            "message": f"🚨 임부 주의/금기 ({grade}등급): '{r['product_name']}' 투여 시 위험. 상세: {r['details']}",
+            "details": f"성분명: {r['ingredient_name']}",
+        })
+    return results
+
+
+def _lactating(name: str, facts: dict) -> List[dict]:
+    if not facts["breastfeeding"]:
+        return [{"type": "수유부주의", "status": "Safe", "message": f"✅ '{name}'은(는) 수유부 주의 목록에서 확인되지 않습니다."}]
+    return [{
+        "type": "수유부주의",
+        "status": "Warning",
+        "message": f"🚨 수유부 주의: '{r['product_name']}'은(는) 수유 중 투여 시 신중해야 합니다. 사유: {r['remarks']}",
+        "details": f"성분명: {r['ingredient_name']}",
+    } for r in facts["breastfeeding"]]
+
+
+def _child_age(name: str, facts: dict, age_label: str, restricted_mask: np.ndarray) -> List[dict]:
+    hits = [r for r, hit in zip(facts["age_rules"], restricted_mask) if hit]
+    if not hits:
+        return [{"type": "연령금기", "status": "Safe", "message": f"✅ '{name}'은(는) {age_label} 아동에 대한 연령 금기 기준에 해당하지 않습니다."}]
+    return [{
+        "type": "연령금기",
+        "status": "Critical",
+        "message": f"❌ 연령 금기: '{r['product_name']}'은(는) {r['age']}{r['age_unit']} 기준 금기 약물입니다. {age_label} 아동에게는 투여 금지되거나 신중해야 합니다. 상세: {r['details']}",
+        "details": f"금기 연령: {r['age']} {r['age_unit']}",
+    } for r in hits]
+
+
+def _daily_max_dose(name: str, facts: dict, dose_per_time: float, times_per_day: int) -> List[dict]:
+    if not facts["dose_rules"]:
+        return [{"type": "용량주의", "status": "Info", "message": f"ℹ️ 용량 정보 없음: '{name}'에 대한 일일 최대 용량 정보가 데이터셋에 없습니다."}]
+
+    # 첫 번째 매칭된 성분 함량 기준 (프로토타입과 동일)
+    daily_intake = dose_per_time * times_per_day * facts["dose_strength"][0]
+    exceeded = daily_intake > facts["dose_max"]
+
+    results = []
+    for r, over in zip(facts["dose_rules"], exceeded):
+        if over:
+            results.append({
+                "type": "용량주의",
+                "status": "Critical",
+                "message": f"❌ 용량 초과: '{r['product_name']}' 복용 시 일일 최대 투여량({r['max_dose']}mg)을 초과({daily_intake}mg)합니다.",
+                "details": f"1회 {dose_per_time}정, 1일 {times_per_day}회, 1정당 {r['unit_strength']}mg. 투여량 조정이 필요합니다.",
+            })
+        else:
+            results.append({
+                "type": "용량주의",
+                "status": "Safe",
+                "message": f"✅ 용량 안전: '{r['product_name']}'의 일일 총 복용량({daily_intake}mg)은 최대 투여량({r['max_dose']}mg) 이내입니다.",
+            })
+    return results
+
+
+def _duration(name: str, facts: dict, duration_days: int) -> List[dict]:
+    if not facts["duration_rules"]:
+        return [{"type": "기간주의", "status": "Info", "message": f"ℹ️ 기간 정보 없음: '{name}'에 대한 최대 투여 기간 정보가 데이터셋에 없습니다."}]
+
+    exceeded = duration_days > facts["duration_max"]
+    results = []
+    for r, over in zip(facts["duration_rules"], exceeded):
+        if over:
+            results.append({
+                "type": "기간주의",
+                "status": "Warning",
+                "message": f"🚨 기간 초과: '{r['product_name']}'은(는) 최대 {r['max_days']}일 투여 권고 약물입니다. 현재 처방 기간({duration_days}일) 초과 시 의존성 등 위험이 증가할 수 있습니다.",
+                "details": f"성분명: {r['ingredient_name']}",
+            })
+        else:
+            results.append({
+                "type": "기간주의",
+                "status": "Safe",
+                "message": f"✅ 기간 안전: '{name}'의 처방 기간({duration_days}일)은 최대 권고 기간({r['max_days']}일) 이내입니다.",
+            })
+    return results
+
+
+def _concurrent(kb: SafetyKnowledgeBase, names: List[str], facts_by_name: Dict[str, dict]) -> List[dict]:
+    regimen = [dict(facts_by_name[n]["drug"], name=n) for n in names]
+    pairs = kb.find_regimen_interactions(regimen)
+    if not pairs:
+        return [{"type": "병용금기", "status": "Safe", "message": "✅ 처방된 약품들 간의 주요 병용 금기 사항은 확인되지 않습니다."}]
+
+    results = []
+    for pair in pairs:
+        for r in pair["rules"]:
+            results.append({
+                "type": "병용금기",
+                "status": "Critical",
+                "message": f"❌ 병용 금기: '{r['product_name1']}'과 '{r['product_name2']}'은(는) 함께 복용 시 금기입니다. 사유: {r['reason']}",
+                "details": "즉시 의사/약사와 상담이 필요합니다.",
+            })
+    return results
+
+
+def _efficacy_duplication(kb: SafetyKnowledgeBase, names: List[str], facts_by_name: Dict[str, dict]) -> List[dict]:
+    duplicates = kb.find_efficacy_duplicates([dict(facts_by_name[n]["drug"], name=n) for n in names])
+
+    results = [{
+        "type": "효능군중복",
+        "status": "Warning",
+        "message": f"🚨 효능군 중복 주의: '{', '.join(d['drugs'])}'은(는) 동일 효능군 '{d['efficacy_group']} ({d['group_div']})'에 속하여 약효 중복 또는 과도한 효과를 유발할 수 있습니다.",
+        "details": "의사/약사와 상담하여 투여 약물을 조정해야 합니다.",
+    } for d in duplicates]
+
+    if not results:
+        results.append({"type": "효능군중복", "status": "Safe", "message": "✅ 처방된 약품들 간의 주요 효능군 중복 위험은 확인되지 않습니다."})
+    return results
+
+
+# -------------------------------------------------
+# ✅ 통합 검사
+# -------------------------------------------------
+def _check_one(
+    kb: SafetyKnowledgeBase,
+    drugs: List[str],
+    patient_info: Dict[str, Any],
+    facts_by_name: Dict[str, dict],
+    restricted: Dict[str, np.ndarray],
+) -> List[dict]:
+    results = []
+
+    if patient_info.get("is_elderly", False):
+        for d in drugs:
+            results.extend(_elderly(d, facts_by_name[d]))
+
+    if patient_info.get("is_pregnant", False):
+        for d in drugs:
+            results.extend(_pregnancy(d, facts_by_name[d]))
+
+    if patient_info.get("is_lactating", False):
+        for d in drugs:
+            results.extend(_lactating(d, facts_by_name[d]))
+
+    child_age = patient_info.get("child_age", 0) or 0
+    if child_age > 0:
+        age_label = f"{child_age}{normalize_age_unit(patient_info.get('age_unit'))}"
+        for d in drugs:
+            results.extend(_child_age(d, facts_by_name[d], age_label, restricted[d]))
+
+    if len(drugs) >= 2:
+        results.extend(_concurrent(kb, drugs, facts_by_name))
+
+    for info in patient_info.get("dose_info", []) or []:
+        name = info.get("drug_name")
+        if not name or name not in facts_by_name:
+            continue
+        if info.get("dose_per_time") and info.get("times_per_day"):
+            results.extend(_daily_max_dose(name, facts_by_name[name], info["dose_per_time"], info["times_per_day"]))
+        if info.get("duration_days"):
+            results.extend(_duration(name, facts_by_name[name], info["duration_days"]))
+
+    results.extend(_efficacy_duplication(kb, drugs, facts_by_name))
+    return results
+
+
+def run_batch_safety_check(kb: SafetyKnowledgeBase, requests: List[Dict[str, Any]]) -> List[List[dict]]:
+    """
+    여러 (약 목록, 환자 정보) 요청을 한 번에 검사합니다.
+    requests: [{"drugs": [...], "patient_info": {...}}, ...]
+
+    1) 배치 전체의 약 이름(dose_info 포함)을 중복 없이 한 번만 해석
+    2) 연령 금기는 약별로 (환자 수 × 규칙 수) 불리언 행렬을 한 번에 계산
+    """
+    names = []
+    seen = set()
+    for req in requests:
+        for n in list(req.get("drugs") or []) + [i.get("drug_name") for i in req.get("patient_info", {}).get("dose_info", []) or []]:
+            if n and n not in seen:
+                seen.add(n)
+                names.append(n)
+
+    facts_by_name = {n: compile_drug_facts(kb, n) for n in names}
+
+    ages = np.array([
+        patient_age_months(req.get("patient_info") or {}) if (req.get("patient_info") or {}).get("child_age") else np.nan
+        for req in requests
+    ], dtype=float)
+
+    # 약별 연령 금기 행렬: restricted_by_name[n][i, j] = i번째 환자가 j번째 규칙에 해당
+    restricted_by_name = {
+        n: ages[:, None] <= f["age_thresholds"][None, :]
+        for n, f in facts_by_name.items()
+    }
+
+    results = []
+    for i, req in enumerate(requests):
+        drugs = [d for d in (req.get("drugs") or []) if d]
+        restricted = {n: restricted_by_name[n][i] for n in drugs}
+        results.append(_check_one(kb, drugs, req.get("patient_info") or {}, facts_by_name, restricted))
+    return results
+
+
+def run_comprehensive_safety_check(
+    kb: SafetyKnowledgeBase,
+    prescription_drugs: List[str],
+    patient_info: Dict[str, Any],
+) -> List[dict]:
+    """
+    모든 약물 안전성 검사를 통합 실행하고 결과를 반환합니다.
+    patient_info 형식은 프로토타입과 동일합니다.
+        - is_elderly / is_pregnant / is_lactating: bool
+        - child_age: int (성인은 0), age_unit: '년' 또는 '개월'
+        - dose_info: [{"drug_name", "dose_per_time", "times_per_day", "duration_days"}]
+    """
+    return run_batch_safety_check(kb, [{"drugs": prescription_drugs, "patient_info": patient_info}])[0]
@@ -0,0 +1,485 @@
+# app/services/safety_kb.py
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.services.interaction_graph import InteractionGraph
+from app.services.efficacy_index import EfficacyIndex
+
+# -------------------------------------------------
+# ✅ 설정값
+# -------------------------------------------------
+KB_TTL_SECONDS = 6 * 60 * 60  # DUR 공공데이터는 자주 바뀌지 않으므로 6시간
+NAME_CACHE_SIZE = 4096
+
+# 노인 주의 약물 중 고령자에게 특히 위험한 부작용 키워드
+SENIOR_RISK_KEYWORDS = ["낙상", "골절", "치매", "인지기능", "뇌혈관질환", "저혈압", "섬망"]
+
+
+# -------------------------------------------------
+# ✅ 키 정규화
+# -------------------------------------------------
+def normalize_product_code(code) -> Optional[str]:
+    """ 제품코드(BigInteger/Text 혼재) → 앞자리 0 없는 숫자 문자열 """
+    if code is None:
+        return None
+    text = str(code).strip()
+    if text.endswith(".0"):
+        text = text[:-2]
+    digits = re.sub(r"\D", "", text)
+    if not digits:
+        return None
+    return digits.lstrip("0") or "0"
+
+
+def normalize_ingredient_code(code) -> Optional[str]:
+    """ 성분코드 → 대문자, 공백 제거 """
+    if code is None:
+        return None
+    text = re.sub(r"\s", "", str(code)).upper()
+    return text or None
+
+
+def normalize_drug_name(name) -> str:
+    """ 약품명 → 괄호 내용/공백/기호 제거, 소문자 """
+    if not name:
+        return ""
+    text = re.sub(r"\(.*?\)|\[.*?\]", "", str(name))
+    return re.sub(r"[^0-9a-z가-힣]", "", text.lower())
+
+
+# 기본명 = 정규화 이름에서 함량(첫 숫자) 이후와 제형 접미사를 뗀 부분 (예: 타이레놀정500밀리그램 → 타이레놀)
+DOSAGE_FORM_SUFFIXES = ("연질캡슐", "현탁액", "주사액", "캡슐", "시럽", "정제", "과립", "정", "액")
+
+
+def drug_base_name(name) -> str:
+    key = re.split(r"\d", normalize_drug_name(name), 1)[0]
+    for suffix in DOSAGE_FORM_SUFFIXES:
+        if key.endswith(suffix) and len(key) - len(suffix) >= 2:
+            return key[:-len(suffix)]
+    return key
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None:
+        return None
+    match = re.search(r"\d+(\.\d+)?", str(value))
+    return float(match.group()) if match else None
+
+
+class RuleTable:
+    """ DUR 테이블 한 개: 제품코드 / 성분코드 양쪽으로 조회 가능한 규칙 묶음 """
+
+    def __init__(self):
+        self.by_product: Dict[str, list] = {}
+        self.by_ingredient: Dict[str, list] = {}
+        self.size = 0
+
+    def add(self, rule: dict):
+        self.size += 1
+        if rule.get("product_code"):
+            self.by_product.setdefault(rule["product_code"], []).append(rule)
+        if rule.get("ingredient_code"):
+            self.by_ingredient.setdefault(rule["ingredient_code"], []).append(rule)
+
+    def lookup(self, product_codes: Iterable[str], ingredient_codes: Iterable[str] = ()) -> List[dict]:
+        """
+        제품코드 일치 규칙을 우선 반환하고, 성분코드 규칙은 성분당 대표 1건만 추가
+        (같은 성분의 다른 제품 수백 건이 중복 보고되는 것을 방지)
+        """
+        found = []
+        seen_ids = set()
+        covered_ingredients = set()
+
+        for code in product_codes:
+            for rule in self.by_product.get(code, ()):
+                if id(rule) not in seen_ids:
+                    seen_ids.add(id(rule))
+                    found.append(rule)
+                    covered_ingredients.add(rule.get("ingredient_code"))
+
+        for code in ingredient_codes:
+            if code in covered_ingredients:
+                continue
+            rules = self.by_ingredient.get(code)
+            if rules and id(rules[0]) not in seen_ids:
+                seen_ids.add(id(rules[0]))
+                found.append(rules[0])
+
+        return found
+
+
+class SafetyKnowledgeBase:
+    """
+    DUR 공공데이터 9종을 한 번에 컴파일한 메모리 지식베이스
+    모든 안전성 점검은 dict / set 조회만으로 수행됩니다.
+    """
+
+    def __init__(self):
+        self.age_limit = RuleTable()
+        self.breastfeeding = RuleTable()
+        self.dose_limit = RuleTable()
+        self.duplicate_efficacy = RuleTable()
+        self.efficacy_index = EfficacyIndex()
+        self.duration = RuleTable()
+        self.pregnancy = RuleTable()
+        self.senior = RuleTable()
+
+        # 병용금기: 성분코드 단위 양방향 그래프
+        self.interaction_graph = InteractionGraph()
+
+        # 위해 의약품 (회수): 품목기준코드 / 정규화된 제품명
+        self.danger_by_item_seq: Dict[str, list] = {}
+        self.danger_by_name: Dict[str, list] = {}
+
+        # 이름 → 코드 해석용 인덱스
+        self.product_ingredients: Dict[str, set] = {}
+        self.product_names: Dict[str, str] = {}
+        self.name_to_products: Dict[str, set] = {}
+        self.base_name_to_products: Dict[str, set] = {}
+        self.ingredient_name_to_codes: Dict[str, set] = {}
+        self.product_item_seq: Dict[str, str] = {}
+
+        self._name_cache: "OrderedDict[str, dict]" = OrderedDict()
+        self._name_cache_lock = threading.Lock()
+        self.built_at = time.time()
+
+    # -------------------------------------------------
+    # 구성
+    # -------------------------------------------------
+    def register_product(self, product_code, product_name, ingredient_code=None, ingredient_name=None):
+        """ 코드/이름 매핑을 누적 (모든 DUR 테이블에서 공통 호출) """
+        pc = normalize_product_code(product_code)
+        ic = normalize_ingredient_code(ingredient_code)
+
+        if pc:
+            if ic:
+                self.product_ingredients.setdefault(pc, set()).add(ic)
+            if product_name:
+                self.product_names.setdefault(pc, product_name)
+                key = normalize_drug_name(product_name)
+                if key:
+                    self.name_to_products.setdefault(key, set()).add(pc)
+                base = drug_base_name(product_name)
+                if len(base) >= 2:
+                    self.base_name_to_products.setdefault(base, set()).add(pc)
+
+        if ic and ingredient_name:
+            key = normalize_drug_name(ingredient_name)
+            if key:
+                self.ingredient_name_to_codes.setdefault(key, set()).add(ic)
+
+        return pc, ic
+
+    def add_rule(self, table: RuleTable, row: dict, **extra):
+        pc, ic = self.register_product(
+            row.get("product_code"), row.get("product_name"),
+            row.get("ingredient_code"), row.get("ingredient_name"),
+        )
+        rule = {
+            "product_code": pc,
+            "product_name": row.get("product_name"),
+            "ingredient_code": ic,
+            "ingredient_name": row.get("ingredient_name"),
+        }
+        rule.update(extra)
+        table.add(rule)
+        return rule
+
+    def add_efficacy(self, row: dict):
+        """ 효능군중복 규칙 + (제품/성분코드 → 효능군) 매핑 """
+        rule = self.add_rule(
+            self.duplicate_efficacy, row,
+            efficacy_group=row.get("efficacy_group"), group_div=row.get("group_div"),
+        )
+        self.efficacy_index.add(rule["product_code"], rule["ingredient_code"], rule["efficacy_group"], rule["group_div"])
+
+    def add_interaction(self, row: dict):
+        _, ic1 = self.register_product(row["product_code1"], row["product_name1"], row["ingredient_code1"], row["ingredient_name1"])
+        _, ic2 = self.register_product(row["product_code2"], row["product_name2"], row["ingredient_code2"], row["ingredient_name2"])
+        if not ic1 or not ic2:
+            return
+
+        # 같은 성분 조합의 제품별 중복 행은 첫 규칙 하나로 대표
+        if ic2 in self.interaction_graph.adjacency.get(ic1, ()):
+            return
+
+        rule = {
+            "product_name1": row["product_name1"],
+            "product_name2": row["product_name2"],
+            "ingredient_name1": row["ingredient_name1"],
+            "ingredient_name2": row["ingredient_name2"],
+            "reason": row["prohibit_reason"],
+        }
+        self.interaction_graph.add(ic1, ic2, rule)
+
+    def add_danger(self, row: dict):
+        rule = {
+            "product_name": row["product_name"],
+            "make_no": row["make_no"],
+            "recall_reason": row["recall_reason"],
+            "risk_grade": row["risk_grade"],
+        }
+        item_seq = normalize_product_code(row["item_seq"])
+        if item_seq:
+            self.danger_by_item_seq.setdefault(item_seq, []).append(rule)
+        key = normalize_drug_name(row["product_name"])
+        if key:
+            self.danger_by_name.setdefault(key, []).append(rule)
+
+    # -------------------------------------------------
+    # 이름 해석
+    # -------------------------------------------------
+    def resolve(self, name: Optional[str] = None, product_code=None) -> dict:
+        """
+        약 이름 또는 제품코드 → {"name", "product_codes", "ingredient_codes"}
+        이름은 정확 일치 → 기본명 일치 순으로 해석하며 결과는 LRU 캐시에 보관됩니다.
+        🚨 둘 다 없으면 빈 코드(미해석)를 돌려줍니다 (짧은 이름 부분 일치는 엉뚱한 제품의 DUR 경고를 만들어 추측하지 않음)
+        """
+        products = set()
+        pc = normalize_product_code(product_code)
+        if pc:
+            products.add(pc)
+
+        ingredients = set()
+        if name:
+            resolved = self._resolve_name(name)
+            products |= resolved["product_codes"]
+            ingredients |= resolved["ingredient_codes"]
+
+        for code in products:
+            ingredients |= self.product_ingredients.get(code, set())
+
+        return {
+            "name": name or self.product_names.get(pc),
+            "product_codes": frozenset(products),
+            "ingredient_codes": frozenset(ingredients),
+        }
+
+    def _resolve_name(self, name: str) -> dict:
+        key = normalize_drug_name(name)
+        with self._name_cache_lock:
+            cached = self._name_cache.get(key)
+            if cached is not None:
+                self._name_cache.move_to_end(key)
+                return cached
+
+        products = set(self.name_to_products.get(key, ()))
+        ingredients = set(self.ingredient_name_to_codes.get(key, ()))
+
+        # 정확 일치가 없으면 함량/제형만 다른 같은 제품군 (타이레놀 ↔ 타이레놀정500밀리그램)
+        # 기본명이 같아도 성분 구성이 다른 제품이 섞여 있으면 미해석
+        if not products and not ingredients:
+            base = drug_base_name(name)
+            codes = self.base_name_to_products.get(base, ()) if len(base) >= 2 else ()
+            if len({frozenset(self.product_ingredients.get(c, ())) for c in codes}) == 1:
+                products = set(codes)
+
+        result = {"product_codes": frozenset(products), "ingredient_codes": frozenset(ingredients)}
+        with self._name_cache_lock:
+            self._name_cache[key] = result
+            if len(self._name_cache) > NAME_CACHE_SIZE:
+                self._name_cache.popitem(last=False)
+        return result
+
+    # -------------------------------------------------
+    # 조회
+    # -------------------------------------------------
+    def find_pregnancy(self, drug: dict) -> List[dict]:
+        return self.pregnancy.lookup(drug["product_codes"], drug["ingredient_codes"])
+
+    def find_breastfeeding(self, drug: dict) -> List[dict]:
+        return self.breastfeeding.lookup(drug["product_codes"], drug["ingredient_codes"])
+
+    def find_senior(self, drug: dict, risky_only: bool = False) -> List[dict]:
+        rules = self.senior.lookup(drug["product_codes"], drug["ingredient_codes"])
+        if risky_only:
+            rules = [r for r in rules if r["risk_keywords"]]
+        return rules
+
+    def find_age_limit(self, drug: dict, age_months: Optional[float]) -> List[dict]:
+        """ 환자 나이(개월)가 금기 연령 이하인 규칙만 반환 """
+        if age_months is None:
+            return []
+        return [
+            r for r in self.age_limit.lookup(drug["product_codes"], drug["ingredient_codes"])
+            if r["age_months"] is not None and age_months <= r["age_months"]
+        ]
+
+    def find_dose_limit(self, drug: dict) -> List[dict]:
+        return self.dose_limit.lookup(drug["product_codes"], drug["ingredient_codes"])
+
+    def find_duration(self, drug: dict) -> List[dict]:
+        return self.duration.lookup(drug["product_codes"], drug["ingredient_codes"])
+
+    def find_efficacy(self, drug: dict) -> List[dict]:
+        return self.duplicate_efficacy.lookup(drug["product_codes"], drug["ingredient_codes"])
+
+    def find_efficacy_duplicates(self, drugs: List[dict]) -> List[dict]:
+        """ 해석된 약 목록을 (효능군, 그룹구분)으로 묶어 2개 이상인 그룹 반환 """
+        return self.efficacy_index.find_duplicates(drugs)
+
+    def find_danger(self, drug: dict) -> List[dict]:
+        found = []
+        for code in drug["product_codes"]:
+            item_seq = self.product_item_seq.get(code)
+            if item_seq:
+                found.extend(self.danger_by_item_seq.get(item_seq, ()))
+        if not found and drug.get("name"):
+            found.extend(self.danger_by_name.get(normalize_drug_name(drug["name"]), ()))
+        return found
+
+    def find_interactions(self, drug_a: dict, drug_b: dict) -> List[dict]:
+        """ 두 약 사이의 병용금기 (성분 그래프 양방향 조회) """
+        return self.interaction_graph.between(drug_a["ingredient_codes"], drug_b["ingredient_codes"])
+
+    def find_regimen_interactions(self, drugs: List[dict]) -> List[dict]:
+        """ 해석된 약 목록 전체의 금기 쌍을 한 번에 탐색 """
+        return self.interaction_graph.find_pairs(drugs)
+
+    def stats(self) -> dict:
+        return {
+            "age_limit": self.age_limit.size,
+            "breastfeeding": self.breastfeeding.size,
+            "dose_limit": self.dose_limit.size,
+            "duplicate_efficacy": self.duplicate_efficacy.size,
+            "duration_warning": self.duration.size,
+            "pregnancy_warning": self.pregnancy.size,
+            "senior_warning": self.senior.size,
+            "drug_interaction": self.interaction_graph.edge_count(),
+            "danger_drug": sum(len(v) for v in self.danger_by_item_seq.values()),
+            "products": len(self.product_names),
+            "built_at": self.built_at,
+        }
+
+
+def age_to_months(age, unit: Optional[str]) -> Optional[float]:
+    """ 특정연령 + 단위("세", "개월", "년") → 개월 """
+    if age is None:
+        return None
+    try:
+        age = float(age)
+    except (TypeError, ValueError):
+        return None
+    if unit and "개월" in unit:
+        return age
+    return age * 12
+
+
+# -------------------------------------------------
+# ✅ DB → 지식베이스 컴파일
+# -------------------------------------------------
+def _rows(db: Session, *columns):
+    return [dict(r._mapping) for r in db.execute(select(*columns))]
+
+
+def build_safety_kb(db: Session) -> SafetyKnowledgeBase:
+    """ DUR 테이블별로 필요한 컬럼만 한 번씩 조회하여 지식베이스를 구성 """
+    from app.models.drug_info import (
+        AgeLimit, Breastfeeding, DoseLimit, DrugInteraction, DuplicateEfficacy,
+        DurationWarning, PregnancyWarning, SeniorWarning, DangerDrug, ProductLicense,
+    )
+
+    kb = SafetyKnowledgeBase()
+
+    for row in _rows(db, AgeLimit.product_code, AgeLimit.product_name, AgeLimit.ingredient_code,
+                     AgeLimit.ingredient_name, AgeLimit.specific_age, AgeLimit.specific_age_unit,
+                     AgeLimit.details):
+        kb.add_rule(
+            kb.age_limit, row,
+            age=row["specific_age"],
+            age_unit=row["specific_age_unit"],
+            age_months=age_to_months(row["specific_age"], row["specific_age_unit"]),
+            details=row["details"],
+        )
+
+    for row in _rows(db, Breastfeeding.product_code, Breastfeeding.product_name, Breastfeeding.ingredient_code,
+                     Breastfeeding.ingredient_name, Breastfeeding.remarks):
+        kb.add_rule(kb.breastfeeding, row, remarks=row["remarks"])
+
+    for row in _rows(db, DoseLimit.product_code, DoseLimit.product_name, DoseLimit.ingredient_code,
+                     DoseLimit.ingredient_name, DoseLimit.max_dose_1day, DoseLimit.max_dose_criteria,
+                     DoseLimit.check_criteria):
+        kb.add_rule(
+            kb.dose_limit, row,
+            max_dose_text=row["max_dose_1day"],
+            max_dose=row["max_dose_criteria"] if row["max_dose_criteria"] is not None else _to_float(row["max_dose_1day"]),
+            unit_strength=row["check_criteria"],
+        )
+
+    for row in _rows(db, DuplicateEfficacy.product_code, DuplicateEfficacy.product_name,
+                     DuplicateEfficacy.ingredient_code, DuplicateEfficacy.ingredient_name,
+                     DuplicateEfficacy.efficacy_group, DuplicateEfficacy.group_div):
+        kb.add_efficacy(row)
+
+    for row in _rows(db, DurationWarning.product_code, DurationWarning.product_name,
+                     DurationWarning.ingredient_code, DurationWarning.ingredient_name, DurationWarning.max_days):
+        kb.add_rule(kb.duration, row, max_days=row["max_days"])
+
+    for row in _rows(db, PregnancyWarning.product_code, PregnancyWarning.product_name,
+                     PregnancyWarning.ingredient_code, PregnancyWarning.ingredient_name,
+                     PregnancyWarning.grade, PregnancyWarning.details):
+        kb.add_rule(kb.pregnancy, row, grade=row["grade"], details=row["details"])
+
+    for row in _rows(db, SeniorWarning.product_code, SeniorWarning.product_name, SeniorWarning.ingredient_code,
+                     SeniorWarning.ingredient_name, SeniorWarning.details):
+        details = row["details"] or ""
+        kb.add_rule(
+            kb.senior, row,
+            details=row["details"],
+            risk_keywords=[k for k in SENIOR_RISK_KEYWORDS if k in details],
+        )
+
+    for row in _rows(db, DrugInteraction.product_code1, DrugInteraction.product_name1,
+                     DrugInteraction.ingredient_code1, DrugInteraction.ingredient_name1,
+                     DrugInteraction.product_code2, DrugInteraction.product_name2,
+                     DrugInteraction.ingredient_code2, DrugInteraction.ingredient_name2,
+                     DrugInteraction.prohibit_reason):
+        kb.add_interaction(row)
+
+    for row in _rows(db, DangerDrug.product_name, DangerDrug.item_seq, DangerDrug.make_no,
+                     DangerDrug.recall_reason, DangerDrug.risk_grade):
+        kb.add_danger(row)
+
+    # 허가정보: 보험코드(제품코드) ↔ 품목기준코드, 이름 인덱스 보강
+    for row in _rows(db, ProductLicense.item_seq, ProductLicense.item_name, ProductLicense.edi_code):
+        for edi in re.split(r"[,\s]+", row["edi_code"] or ""):
+            pc = normalize_product_code(edi)
+            if not pc:
+                continue
+            kb.register_product(pc, row["item_name"])
+            if row["item_seq"] is not None:
+                kb.product_item_seq[pc] = normalize_product_code(row["item_seq"])
+
+    return kb
+
+
+# -------------------------------------------------
+# ✅ 프로세스 단위 싱글톤
+# -------------------------------------------------
+_SAFETY_KB: Optional[SafetyKnowledgeBase] = None
+_SAFETY_KB_LOCK = threading.Lock()
+
+
+def get_safety_kb(db: Session) -> SafetyKnowledgeBase:
+    """ 최초 호출 시(또는 TTL 만료 시) 한 번만 컴파일 """
+    global _SAFETY_KB
+    kb = _SAFETY_KB
+    if kb is not None and time.time() - kb.built_at < KB_TTL_SECONDS:
+        return kb
+
+    with _SAFETY_KB_LOCK:
+        if _SAFETY_KB is None or time.time() - _SAFETY_KB.built_at >= KB_TTL_SECONDS:
+            _SAFETY_KB = build_safety_kb(db)
+        return _SAFETY_KB
+
+
+def invalidate_safety_kb():
+    global _SAFETY_KB
+    _SAFETY_KB = None
@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from app.services.calendar_builder import CHUNK_DAYS, iter_offset_chunks
 
 BASE_TIMES = {
     "아침": "09:00",
@@ -9,11 +13,43 @@ BASE_TIMES = {
 }
 
 
+def _timing_offsets(timings: List[str], meal_relation) -> Tuple[List[str], np.ndarray]:
+    """ 복용 시간대 → (유효한 시간대, 자정 기준 분 오프셋) - 약마다 한 번만 계산 """
+    valid, offsets = [], []
+    for timing in timings:
+        if timing not in BASE_TIMES:
+            continue
+        hour, minute = map(int, BASE_TIMES[timing].split(":"))
+        hour, minute = adjust_meal_time(hour, minute, meal_relation)
+        valid.append(timing)
+        offsets.append(hour * 60 + minute)
+    return valid, np.array(offsets, dtype=np.int64)
+
+
+def iter_occurrences(med: Dict, start_date: datetime, chunk_days: int = CHUNK_DAYS) -> Iterator[Dict]:
+    """ 한 약의 복용 시점 (날짜 순 → 시간대 순), 긴 기간은 chunk_days 씩 생성 """
+    timings, offsets = _timing_offsets(med["timing"], med["meal_relation"])
+    if not timings or med["days"] <= 0:
+        return
+    for _, when in iter_offset_chunks(start_date.date(), med["days"], offsets, chunk_days):
+        for row in np.datetime_as_string(when, unit="m").tolist():
+            for timing, dt_str in zip(timings, row):
+                yield {
+                    "datetime": dt_str,
+                    "timing": timing,
+                    "notify": True
+                }
+
+
 def build_schedule_from_normalized_data(
     medicines: List[Dict],
-    start_date: datetime | None = None
+    start_date: datetime | None = None,
+    lazy: bool = False
 ) -> List[Dict]:
-
+    """
+    약별 복용 일정 (occurrences: 날짜 x 시간대)
+    lazy=True 면 occurrences 를 리스트 대신 제너레이터로 반환 (긴 기간 스트리밍)
+    """
     if start_date is None:
         start_date = datetime.now().replace(hour=0, minute=0, second=0)
 
@@ -21,33 +57,14 @@ def build_schedule_from_normalized_data(
 
     for med in medicines:
         end_date = start_date + timedelta(days=med["days"] - 1)
-        occurrences = []
-
-        for day_offset in range(med["days"]):
-            target_date = start_date + timedelta(days=day_offset)
-
-            for timing in med["timing"]:
-                if timing not in BASE_TIMES:
-                    continue
-
-                hour, minute = map(int, BASE_TIMES[timing].split(":"))
-                hour, minute = adjust_meal_time(hour, minute, med["meal_relation"])
-
-                occurrences.append({
-                    "datetime": (
-                        target_date.replace(hour=hour, minute=minute)
-                        .isoformat(timespec="minutes")
-                    ),
-                    "timing": timing,
-                    "notify": True
-                })
+        occurrences = iter_occurrences(med, start_date)
 
         results.append({
             "drug_name": med["name"],
             "dose": med["dose"],
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d"),
-            "occurrences": occurrences
+            "occurrences": occurrences if lazy else list(occurrences)
         })
 
     return results
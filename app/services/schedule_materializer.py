@@ -0,0 +1,144 @@
+# app/services/schedule_materializer.py
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+# =======================================================
+# 복약 일정 일괄 생성 (하루 1행 + 복용 시각별 알림)
+# =======================================================
+# 기존: 날짜마다 중복 SELECT → INSERT + flush → 알림 INSERT, 커밋 후 행마다 refresh
+#       (90일 x 3회 복용이면 수백 번 왕복)
+# 변경: 쿼리 5번 (+ 순응도 집계 / 캘린더 피드 변경 기록) + 커밋 1번
+#   0) 사용자 행 잠금 (SELECT ... FOR UPDATE) - 같은 사용자의 일괄 생성은 트랜잭션 단위로 직렬화
+#   1) 기간 내 이미 있는 날짜 한 번에 조회
+#   2) 일정 executemany
+#   3) 새로 생긴 일정 id 한 번에 조회 (MySQL 은 INSERT ... RETURNING 미지원)
+#      🚨 이번에 넣은 날짜(new_days)만 - 동시에 들어온 다른 요청의 행을 가져가지 않도록
+#   4) 알림 executemany
+
+
+def parse_timings(timings: List[str]) -> List[time]:
+    """ "HH:MM" 목록 → time 목록 (형식이 틀린 항목은 건너뜀) """
+    parsed = []
+    for t_str in timings:
+        if not t_str:
+            continue
+        try:
+            hm = t_str.split(":")
+            if len(hm) >= 2:
+                parsed.append(time(int(hm[0]), int(hm[1])))
+        except Exception as e:
+            print(f"Error creating alarm for {t_str}: {e}")
+    return parsed
+
+
+def materialize_schedule(
+    db: Session,
+    user_id: int,
+    pill_name: str,
+    start_date: date,
+    end_date: date,
+    timings: List[str],
+    dose: Optional[str] = None,
+    meal_relation: Optional[str] = None,
+    memo: Optional[str] = None,
+    notify: bool = True,
+) -> Dict:
+    """
+    start_date ~ end_date 매일 일정 1행씩 생성 (같은 사용자/약/날짜가 이미 있으면 건너뜀)
+    반환: {"created": 생성 수, "skipped": 중복 수, "first": 첫 생성 일정 dict 또는 None}
+    """
+    from app.models.medication import MedicationSchedule
+    from app.models.alarm import Alarm
+    from app.models.user import UserProfile
+
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    same_pill = (
+        MedicationSchedule.user_id == user_id,
+        MedicationSchedule.pill_name == pill_name,
+        MedicationSchedule.start_date >= start_date,
+        MedicationSchedule.start_date <= end_date,
+    )
+
+    # 0. 같은 사용자/약을 동시에 등록하는 요청끼리 중복 확인 ~ 커밋 구간이 겹치지 않도록
+    #    (SQLite 등 FOR UPDATE 미지원 DB 에서는 무시됨)
+    db.execute(select(UserProfile.id).where(UserProfile.id == user_id).with_for_update())
+
+    # 1. 중복 날짜 (한 번에)
+    existing = set(db.execute(select(MedicationSchedule.start_date).where(*same_pill)).scalars())
+    new_days = [d for d in days if d not in existing]
+    if not new_days:
+        db.commit()  # 잠금 해제
+        return {"created": 0, "skipped": len(days), "first": None}
+
+    # 타이밍 매핑 준비 (최대 5개)
+    timings_map = {f"timing{i+1}": t for i, t in enumerate(timings[:5])}
+    for i in range(len(timings_map), 5):
+        timings_map[f"timing{i+1}"] = None
+
+    try:
+        # 2. 일정 일괄 INSERT
+        db.execute(insert(MedicationSchedule), [
+            {
+                "user_id": user_id,
+                "pill_name": pill_name,
+                "dose": dose,
+                "start_date": d,
+                "end_date": d,  # 각 레코드는 하루 단위
+                **timings_map,
+                "meal_relation": meal_relation,
+                "memo": memo,
+                "notify": notify,
+                "is_taken": False,
+            }
+            for d in new_days
+        ])
+
+        # 3. 새 일정 id (이번에 넣은 날짜만) - 응답용 첫 행도 여기서 얻음
+        created = [
+            dict(r._mapping)
+            for r in db.execute(
+                select(MedicationSchedule.__table__)
+                .where(*same_pill, MedicationSchedule.start_date.in_(new_days))
+                .order_by(MedicationSchedule.start_date, MedicationSchedule.id)
+            )
+        ]
+
+        # 4. 알림 일괄 INSERT
+        alarm_times = parse_timings(timings) if notify else []
+        if alarm_times:
+            message = f"{pill_name} 복약 시간입니다."
+            db.execute(insert(Alarm), [
+                {
+                    "user_id": user_id,
+                    "schedule_id": row["id"],
+                    "alarm_time": datetime.combine(row["start_date"], t),
+                    "message": message,
+                    "is_read": False,
+                }
+                for row in created
+                for t in alarm_times
+            ])
+
+        # 5. 순응도 집계 (새 날짜 칸의 scheduled)
+        from app.services.adherence import refresh
+        refresh(db, user_id, [pill_name], new_days[0], new_days[-1])
+
+        # 6. 캘린더 피드 변경 기록
+        from app.services.ical_feed import record_changes
+        record_changes(db, user_id, "schedule", [row["id"] for row in created])
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if alarm_times:
+        # 곧 울릴 알림이 새로 생겼을 수 있으므로 디스패처가 다시 읽도록
+        from app.services.alarm_dispatcher import get_alarm_dispatcher
+        get_alarm_dispatcher().reload()
+
+    return {"created": len(created), "skipped": len(existing), "first": created[0] if created else None}
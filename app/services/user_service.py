@@ -22,6 +22,12 @@ def get_family_members(db: Session, owner_id: int):
     return db.query(UserProfile).filter(UserProfile.user_id == owner_id, UserProfile.id != owner_id).all()
 
 
+def get_accessible_user_ids(db: Session, owner_id: int) -> list:
+    """ 본인 + 본인이 등록한 가족 구성원 id (일정/캘린더 조회 범위) """
+    family_ids = db.query(UserProfile.id).filter(UserProfile.user_id == owner_id, UserProfile.id != owner_id).all()
+    return [owner_id] + [row.id for row in family_ids]
+
+
 # =======================================================
 # 3. 프로필 상세 정보 수정 (마이페이지 핵심)
 # =======================================================
@@ -0,0 +1,38 @@
+# adherence_daily 백필
+# medication_schedule 원본에서 사용자 x 약 x 날짜 집계를 INSERT ... SELECT 한 번으로 다시 만듭니다.
+# 테이블 생성 직후 1회, 또는 집계가 어긋났다고 의심될 때 구간을 지정해 실행합니다.
+#
+# 실행: python backfill_adherence.py [시작일 YYYY-MM-DD] [종료일 YYYY-MM-DD]
+
+import os
+import sys
+from datetime import date
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.db import SessionLocal
+import app.models.user
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+from app.services.adherence import rebuild_all
+
+
+def backfill(start=None, end=None):
+    db = SessionLocal()
+    try:
+        count = rebuild_all(db, start, end)
+        db.commit()
+        print(f"adherence_daily: {count} rows rebuilt ({start or 'begin'} ~ {end or 'end'})")
+    except Exception as e:
+        db.rollback()
+        print(f"Error: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    start = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    end = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+    backfill(start, end)
@@ -0,0 +1,122 @@
+# 알림 디스패처 처리량 벤치마크
+# 1) 분 단위 버킷 인덱스(DueIndex) vs 단순 min-heap : 적재 / 시각 순서대로 꺼내기
+# 2) 임시 SQLite 에 알림 N행(하루치, 여러 사용자)을 넣고 가상 시계로 하루를 1분씩 진행하며
+#    poll(증분 로드) + tick(발송) 을 돌려 초당 발송 수(alarms dispatched/sec) 를 측정합니다.
+#    발송은 FakeNotifier(메모리) 로만 하므로 outbox/SSE 비용은 제외된 값입니다.
+#
+# 실행: python bench_alarm_dispatcher.py [알림 수]
+
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+import app.models.user
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+from app.models.medication import MedicationSchedule
+from app.models.alarm import Alarm
+from app.services.alarm_dispatcher import AlarmDispatcher, DueIndex
+from app.services.alarm_notifiers import FakeNotifier
+
+N_ALARMS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+N_USERS = 5_000
+DAY = datetime(2026, 1, 1)
+
+
+def random_times(n):
+    rnd = random.Random(42)
+    return [DAY + timedelta(seconds=rnd.randrange(86400)) for _ in range(n)]
+
+
+def bench_index(times):
+    print(f"\n[1] due index, {len(times):,} alarms over one day, popped minute by minute")
+
+    t0 = time.perf_counter()
+    heap = []
+    for i, t in enumerate(times):
+        heapq.heappush(heap, (t, i))
+    t1 = time.perf_counter()
+    popped = 0
+    now = DAY
+    while heap:
+        now += timedelta(minutes=1)
+        while heap and heap[0][0] <= now:
+            heapq.heappop(heap)
+            popped += 1
+    t2 = time.perf_counter()
+    print(f"  min-heap : add {len(times) / (t1 - t0):>12,.0f}/s   pop {popped / (t2 - t1):>12,.0f}/s")
+
+    t0 = time.perf_counter()
+    index = DueIndex()
+    for i, t in enumerate(times):
+        index.add(t, ("a", i), None)
+    t1 = time.perf_counter()
+    popped = 0
+    now = DAY
+    while len(index):
+        now += timedelta(minutes=1)
+        popped += len(index.pop_due(now))
+    t2 = time.perf_counter()
+    print(f"  DueIndex : add {len(times) / (t1 - t0):>12,.0f}/s   pop {popped / (t2 - t1):>12,.0f}/s")
+
+
+def bench_dispatcher(times):
+    print(f"\n[2] dispatcher on SQLite, {len(times):,} alarms / {N_USERS:,} users, simulated clock (1 min steps)")
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_alarm.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    db.execute(insert(MedicationSchedule), [
+        {"user_id": u, "pill_name": f"약{u}", "start_date": DAY.date(), "end_date": DAY.date(), "notify": True, "is_taken": False}
+        for u in range(1, N_USERS + 1)
+    ])
+    db.execute(insert(Alarm), [
+        {"user_id": (i % N_USERS) + 1, "schedule_id": (i % N_USERS) + 1, "alarm_time": t, "message": "복약 시간입니다.", "is_read": False}
+        for i, t in enumerate(times)
+    ])
+    db.commit()
+    db.close()
+
+    fake = FakeNotifier(keep=False)
+    now = DAY
+    dispatcher = AlarmDispatcher(session_factory=Session, notifiers=[fake], clock=lambda: now)
+
+    poll_s = tick_s = 0.0
+    end = DAY + timedelta(days=1, minutes=1)
+    while now < end:
+        t0 = time.perf_counter()
+        dispatcher.poll(now)
+        t1 = time.perf_counter()
+        dispatcher.tick(now)
+        t2 = time.perf_counter()
+        poll_s += t1 - t0
+        tick_s += t2 - t1
+        now += timedelta(minutes=1)
+
+    stats = dispatcher.stats()
+    print(f"  loaded {stats['loaded']:,}  fired {fake.count:,} in {fake.batches:,} batches")
+    print(f"  incremental load : {poll_s:6.2f}s  ({stats['loaded'] / poll_s:>10,.0f} rows/s)")
+    print(f"  dispatch         : {tick_s:6.2f}s  ({fake.count / tick_s:>10,.0f} alarms/s, incl. is_read revalidation)")
+    print(f"  end to end       : {fake.count / (poll_s + tick_s):>10,.0f} alarms/s")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    times = random_times(N_ALARMS)
+    bench_index(times)
+    bench_dispatcher(times)
@@ -0,0 +1,69 @@
+# 복용 일정 확장 벤치마크
+# 기존 이중 루프(날짜 x 시각마다 "HH:MM" 파싱 + datetime 생성) vs calendar_builder 의 NumPy datetime64 확장
+# OCR 요청 기본값(3일)부터 장기 처방(90 / 365 / 1095일)까지 이벤트 생성 시간을 비교하고,
+# 제너레이터 모드(iter_calendar_events)로 첫 이벤트까지 걸리는 시간도 함께 봅니다.
+#
+# 실행: python bench_calendar_builder.py [반복 횟수]
+
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.services.calendar_builder import build_calendar_events, iter_calendar_events
+
+REPEAT = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+HORIZONS = [3, 90, 365, 1095]
+SCHEDULES = [
+    {"drug_name": f"약{i}", "label": f"약{i} ({t})", "time": hhmm, "notify": True}
+    for i in range(4)
+    for t, hhmm in (("아침", "09:00"), ("점심", "13:00"), ("저녁", "19:00"))
+]
+ALERT = {"level": "NORMAL", "reason": None}
+
+
+def legacy_build(schedules, start_date, days, alert_level):
+    """ 변경 전 build_calendar_events (비교용) """
+    events = []
+    for day_offset in range(days):
+        current_date = start_date + timedelta(days=day_offset)
+        for s in schedules:
+            raw_time = s.get("time") or "09:00"
+            hour, minute = map(int, raw_time.split(":"))
+            event_datetime = datetime(current_date.year, current_date.month, current_date.day, hour, minute)
+            events.append({
+                "datetime": event_datetime.isoformat(),
+                "date": current_date.isoformat(),
+                "time": raw_time,
+                "title": s.get("label") or s.get("drug_name") or "약 복용",
+                "notify": s.get("notify", True),
+                "alert_level": alert_level["level"],
+                "alert_reason": alert_level.get("reason"),
+            })
+    return events
+
+
+def best_of(fn):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    start = date(2026, 1, 1)
+    print(f"{len(SCHEDULES)} timings/day, best of {REPEAT}")
+    print(f"{'days':>6} {'events':>8} {'legacy ms':>10} {'numpy ms':>10} {'speedup':>8} {'first event ms':>15}")
+    for days in HORIZONS:
+        assert legacy_build(SCHEDULES, start, days, ALERT) == build_calendar_events(SCHEDULES, start, days, ALERT)
+        legacy = best_of(lambda: legacy_build(SCHEDULES, start, days, ALERT))
+        vector = best_of(lambda: build_calendar_events(SCHEDULES, start, days, ALERT))
+        first = best_of(lambda: next(iter_calendar_events(SCHEDULES, start, days, ALERT)))
+        print(f"{days:>6} {days * len(SCHEDULES):>8} {legacy * 1000:>10.2f} {vector * 1000:>10.2f} "
+              f"{legacy / vector:>7.1f}x {first * 1000:>15.3f}")
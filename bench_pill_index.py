@@ -0,0 +1,64 @@
+# 낱알 식별 인덱스 검색 벤치마크
+# 합성 PillIdentifier 행(기본 25,000개)으로 PillIndex 를 만들고 대표 검색의 응답 시간을 잽니다.
+# - 한 글자 각인("Y") 처럼 후보가 많은 검색, 모양만 준 검색(후보 = 해당 모양 전체)도 포함
+# - 각인 알파벳을 좁히면(예: XYZ) 같은 각인 조합이 많은 경우를 흉내낼 수 있습니다.
+#
+# 실행: python bench_pill_index.py [행 수] [각인 문자 집합]
+
+import os
+import random
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.services.pill_index import PillIndex
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 25_000
+ALPHABET = sys.argv[2] if len(sys.argv) > 2 else "ABCDEFGHJKLMNPRSTUVWXY0123456789"
+REPEAT = 5
+SHAPES = ["원형", "타원형", "장방형", "삼각형"]
+COLORS = ["하양", "노랑", "분홍", "주황", "갈색"]
+QUERIES = [
+    {"imprint": "Y"},
+    {"shape": "원형"},
+    {"shape": "원형", "color": "하양", "has_line": True, "size": 8},
+    {"imprint": "TY", "size": 10},
+    {"color": "노랑", "imprint": "A"},
+]
+
+
+def synthetic_rows(n):
+    rnd = random.Random(1)
+
+    def imprint():
+        return "".join(rnd.choice(ALPHABET) for _ in range(rnd.choice([0, 1, 1, 2, 2, 3, 4, 5, 6])))
+
+    return [
+        {
+            "item_seq": i, "item_name": f"약{i}", "company_name": "제약사",
+            "drug_shape": rnd.choice(SHAPES), "color_class1": rnd.choice(COLORS), "color_class2": None,
+            "print_front": imprint(), "print_back": imprint(),
+            "line_front": rnd.choice([None, "-"]), "line_back": None,
+            "leng_long": f"{rnd.uniform(5, 20):.1f}" if rnd.random() < 0.9 else None,
+            "item_image": None,
+        }
+        for i in range(n)
+    ]
+
+
+if __name__ == "__main__":
+    rows = synthetic_rows(N_ROWS)
+    t0 = time.perf_counter()
+    index = PillIndex(rows)
+    print(f"{N_ROWS:,} rows, index built in {(time.perf_counter() - t0) * 1000:.0f} ms, best of {REPEAT}")
+
+    for query in QUERIES:
+        best = None
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            index.search(**query)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        print(f"  {str(query):<70} {best * 1000:>8.2f} ms")
@@ -0,0 +1,140 @@
+
+# 안전성 점검 엔진 마이크로 벤치마크
+# 키정보/drug_safety_analyzer.py (pandas 프로토타입) vs app/services/safety_engine.py
+# 두 구현에 동일한 합성 DUR 데이터를 넣고 run_comprehensive_safety_check 소요 시간을 비교합니다.
+#
+# 실행: python bench_safety_engine.py [제품 수]
+
+import importlib.util
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.services.safety_kb import SafetyKnowledgeBase
+from app.services.safety_engine import run_comprehensive_safety_check, run_batch_safety_check
+
+N_PRODUCTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+REPEAT = 20
+random.seed(42)
+
+
+def load_prototype():
+    path = os.path.join(current_dir, "키정보", "drug_safety_analyzer.py")
+    spec = importlib.util.spec_from_file_location("drug_safety_analyzer", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # CSV가 없으면 DF_DATA 값은 None
+    return module
+
+
+def make_dataset():
+    products = [(f"{100000 + i}", f"테스트약{i}정", f"ING{i % 800:04d}", f"성분{i % 800}") for i in range(N_PRODUCTS)]
+    tables = {k: [] for k in ["노인주의", "병용금기", "임부금기", "수유부주의", "연령금기", "용량주의", "기간주의", "효능군중복"]}
+
+    for code, name, icode, iname in products:
+        base = {"제품코드": code, "제품명": name, "성분코드": icode, "성분명": iname}
+        r = random.random()
+        if r < 0.2:
+            tables["노인주의"].append(dict(base, 약품상세정보=random.choice(["낙상 위험", "섬망", "위장장애"])))
+        if r < 0.3:
+            tables["임부금기"].append(dict(base, 금기등급=random.choice(["1", "2", "3"]), 상세정보="태아 위험"))
+        if r < 0.15:
+            tables["수유부주의"].append(dict(base, 비고="모유 이행"))
+        if r < 0.1:
+            tables["연령금기"].append(dict(base, 특정연령=random.choice([2, 12, 18]), 특정연령단위="세 미만", 상세정보="소아"))
+        if r < 0.2:
+            tables["용량주의"].append(dict(base, **{"1일최대투여량": "4000mg", "점검기준 성분함량": "500mg"}))
+        if r < 0.1:
+            tables["기간주의"].append(dict(base, 최대투여기간일수=28))
+        if r < 0.4:
+            tables["효능군중복"].append(dict(base, 효능군=f"효능군{i_group(icode)}", 그룹구분="Group 1"))
+
+    for _ in range(N_PRODUCTS):
+        a, b = random.sample(products, 2)
+        tables["병용금기"].append({
+            "제품코드1": a[0], "제품명1": a[1], "성분코드1": a[2], "성분명1": a[3],
+            "제품코드2": b[0], "제품명2": b[1], "성분코드2": b[2], "성분명2": b[3],
+            "금기사유": "상호작용",
+        })
+    return products, {k: pd.DataFrame(v).fillna("정보 없음") for k, v in tables.items()}
+
+
+def i_group(icode):
+    return int(icode[3:]) % 50
+
+
+def build_kb(frames):
+    kb = SafetyKnowledgeBase()
+
+    def rows(key):
+        return frames[key].to_dict("records")
+
+    def base(r):
+        return {"product_code": r["제품코드"], "product_name": r["제품명"], "ingredient_code": r["성분코드"], "ingredient_name": r["성분명"]}
+
+    for r in rows("노인주의"):
+        kb.add_rule(kb.senior, base(r), details=r["약품상세정보"],
+                    risk_keywords=[k for k in ["낙상", "섬망"] if k in r["약품상세정보"]])
+    for r in rows("임부금기"):
+        kb.add_rule(kb.pregnancy, base(r), grade=r["금기등급"], details=r["상세정보"])
+    for r in rows("수유부주의"):
+        kb.add_rule(kb.breastfeeding, base(r), remarks=r["비고"])
+    for r in rows("연령금기"):
+        kb.add_rule(kb.age_limit, base(r), age=r["특정연령"], age_unit=r["특정연령단위"],
+                    age_months=r["특정연령"] * 12, details=r["상세정보"])
+    for r in rows("용량주의"):
+        kb.add_rule(kb.dose_limit, base(r), max_dose_text=r["1일최대투여량"], max_dose=4000.0, unit_strength=500.0)
+    for r in rows("기간주의"):
+        kb.add_rule(kb.duration, base(r), max_days=r["최대투여기간일수"])
+    for r in rows("효능군중복"):
+        kb.add_efficacy(dict(base(r), efficacy_group=r["효능군"], group_div=r["그룹구분"]))
+    for r in rows("병용금기"):
+        kb.add_interaction({
+            "product_code1": r["제품코드1"], "product_name1": r["제품명1"], "ingredient_code1": r["성분코드1"], "ingredient_name1": r["성분명1"],
+            "product_code2": r["제품코드2"], "product_name2": r["제품명2"], "ingredient_code2": r["성분코드2"], "ingredient_name2": r["성분명2"],
+            "prohibit_reason": r["금기사유"],
+        })
+    return kb
+
+
+def timed(fn, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    products, frames = make_dataset()
+    drugs = [p[1] for p in random.sample(products, 5)]
+    patient = {
+        "is_elderly": True, "is_pregnant": True, "is_lactating": True,
+        "child_age": 10, "age_unit": "년",
+        "dose_info": [{"drug_name": drugs[0], "dose_per_time": 2, "times_per_day": 5, "duration_days": 30}],
+    }
+
+    print(f"제품 수: {N_PRODUCTS}, 약 목록: {drugs}")
+
+    t0 = time.perf_counter()
+    kb = build_kb(frames)
+    print(f"[engine] 지식베이스 컴파일: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    proto = load_prototype()
+    proto.DF_DATA = frames
+    proto_ms = timed(lambda: proto.run_comprehensive_safety_check(drugs, patient), repeat=3)
+    print(f"[prototype] 단건 점검: {proto_ms:.2f} ms")
+
+    # 이름 캐시가 채워진 뒤의 정상 상태를 측정
+    run_comprehensive_safety_check(kb, drugs, patient)
+    engine_ms = timed(lambda: run_comprehensive_safety_check(kb, drugs, patient))
+    print(f"[engine]    단건 점검: {engine_ms:.3f} ms  (x{proto_ms / engine_ms:.0f})")
+
+    batch = [{"drugs": [p[1] for p in random.sample(products, 5)], "patient_info": patient} for _ in range(200)]
+    run_batch_safety_check(kb, batch)
+    batch_ms = timed(lambda: run_batch_safety_check(kb, batch), repeat=5)
+    print(f"[engine]    배치 200건: {batch_ms:.2f} ms ({batch_ms / len(batch):.3f} ms/건)")
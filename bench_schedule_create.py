@@ -0,0 +1,106 @@
+
+# 복약 일정 일괄 생성 벤치마크
+# 기존 날짜별 루프(중복 SELECT + INSERT/flush + 알림 INSERT + refresh) vs schedule_materializer.materialize_schedule
+# 임시 SQLite 파일에서 30 / 90 / 365일, 하루 3회 복용 일정을 만들고 소요 시간과 실행된 SQL 문 수를 비교합니다.
+# SQLite 는 왕복 비용이 거의 없으므로, 실제 MySQL 에서는 SQL 문 수 x 네트워크 RTT 만큼 차이가 더 벌어집니다.
+#
+# 실행: python bench_schedule_create.py [반복 횟수]
+
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+import app.models.user
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+from app.models.medication import MedicationSchedule
+from app.models.alarm import Alarm
+from app.services.schedule_materializer import materialize_schedule
+
+REPEAT = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+REGIMEN_DAYS = [30, 90, 365]
+TIMINGS = ["08:00", "13:00", "19:00"]
+START = date(2026, 1, 1)
+
+
+def legacy_create(db, user_id, pill_name, start_date, end_date, timings):
+    """ 변경 전 POST /medication/schedule 루프 (비교용) """
+    current_date = start_date
+    created = []
+    timings_map = {f"timing{i+1}": t for i, t in enumerate(timings[:5])}
+    while current_date <= end_date:
+        existing = db.query(MedicationSchedule).filter(
+            MedicationSchedule.user_id == user_id,
+            MedicationSchedule.pill_name == pill_name,
+            MedicationSchedule.start_date == current_date
+        ).first()
+        if not existing:
+            row = MedicationSchedule(user_id=user_id, pill_name=pill_name, dose="1정",
+                                     start_date=current_date, end_date=current_date, **timings_map,
+                                     notify=True, is_taken=False)
+            db.add(row)
+            db.flush()
+            created.append(row)
+            for t_str in timings:
+                hour, minute = map(int, t_str.split(":"))
+                db.add(Alarm(user_id=user_id, schedule_id=row.id,
+                             alarm_time=datetime.combine(current_date, datetime.min.time()).replace(hour=hour, minute=minute),
+                             message=f"{pill_name} 복약 시간입니다."))
+        current_date += timedelta(days=1)
+    db.commit()
+    for row in created:
+        db.refresh(row)
+    return len(created)
+
+
+def bulk_create(db, user_id, pill_name, start_date, end_date, timings):
+    return materialize_schedule(db, user_id, pill_name, start_date, end_date, timings, dose="1정")["created"]
+
+
+def run(engine, Session, fn, days):
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    elapsed = []
+    try:
+        for i in range(REPEAT):
+            db = Session()
+            start = time.perf_counter()
+            fn(db, 1, f"{fn.__name__}-{days}-{i}", START, START + timedelta(days=days - 1), TIMINGS)
+            elapsed.append((time.perf_counter() - start) * 1000)
+            db.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return min(elapsed), statements[0] // REPEAT
+
+
+if __name__ == "__main__":
+    path = os.path.join(tempfile.mkdtemp(), "bench_schedule.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    print(f"하루 {len(TIMINGS)}회 복용, 반복 {REPEAT}회 중 최솟값")
+    for days in REGIMEN_DAYS:
+        legacy_ms, legacy_sql = run(engine, Session, legacy_create, days)
+        bulk_ms, bulk_sql = run(engine, Session, bulk_create, days)
+        print(f"[{days:>3}일] 기존 {legacy_ms:8.1f}ms / SQL {legacy_sql:>5}회   "
+              f"일괄 {bulk_ms:7.1f}ms / SQL {bulk_sql:>3}회   ({legacy_ms / bulk_ms:.1f}x)")
+
+    # 중복 요청: 모든 날짜가 이미 있으면 조회 1번으로 끝나야 함
+    db = Session()
+    print("중복 재요청:", materialize_schedule(db, 1, "bulk_create-90-0", START, START + timedelta(days=89), TIMINGS))
+    db.close()
@@ -0,0 +1,32 @@
+
+# 챗봇 근거(grounding)용 BM25 검색 인덱스 생성
+# ProductLicense / PillIdentifier / DUR 테이블 → rag_index/*.npy (서버는 mmap 으로 로드)
+#
+# 실행: python build_rag_index.py ["검색 질의"]
+
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from app.db import SessionLocal
+from app.services.rag_index import RAG_INDEX_DIR, build_rag_index
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        index = build_rag_index(db)
+    finally:
+        db.close()
+
+    print(f"✅ 패시지 {len(index)}건, 용어 {len(index.vocab)}개 → {RAG_INDEX_DIR}")
+
+    if len(sys.argv) > 1:
+        query = sys.argv[1]
+        start = time.perf_counter()
+        hits = index.search(query, k=3)
+        print(f"🔎 '{query}' ({(time.perf_counter() - start) * 1000:.2f} ms)")
+        for h in hits:
+            print(f"  [{h['score']}] {h['text']}")
@@ -113,7 +113,10 @@ const AddScheduleModal = ({ isOpen, onClose, defaultPillName }) => {
         try {
             const res = await fetch(`${API_BASE_URL}/medication/schedule`, {
                 method: "POST",
-                headers: { "Content-Type": "application/json" },
+                headers: {
+                    "Content-Type": "application/json",
+                    "Authorization": `Bearer ${localStorage.getItem("authToken")}`
+                },
                 body: JSON.stringify(payload)
             });
 
@@ -3,7 +3,7 @@ import { useAlarm } from '../context/AlarmContext';
 import { useNavigate } from 'react-router-dom';
 
 const GlobalAlarmModal = () => {
-    const { activeAlarm, markAlarmAsRead } = useAlarm();
+    const { activeAlarm, markAlarmAsRead, pendingAlarms, markAllAlarmsAsRead } = useAlarm();
     const navigate = useNavigate();
 
     if (!activeAlarm) return null;
@@ -13,12 +13,17 @@ const GlobalAlarmModal = () => {
         const alarmDate = activeAlarm.alarm_time.split('T')[0];
 
         // 읽음 처리 후 이동
-        await markAlarmAsRead(activeAlarm.id);
+        await markAlarmAsRead(activeAlarm);
 
         // 쿼리 파라미터로 날짜 전달
         navigate(`/calendar?date=${alarmDate}`);
     };
 
+    const handleConfirmAll = async (e) => {
+        e.stopPropagation();
+        await markAllAlarmsAsRead();
+    };
+
     return (
         <div style={styles.overlay}>
             <div style={{ ...styles.modal, cursor: 'pointer' }} onClick={handleConfirm}>
@@ -30,6 +35,11 @@ const GlobalAlarmModal = () => {
                 <p style={{ fontSize: '12px', color: '#999', marginTop: '10px' }}>
                     (화면을 터치하면 이동합니다)
                 </p>
+                {pendingAlarms.length > 1 && (
+                    <button style={{ ...styles.button, marginTop: '10px' }} onClick={handleConfirmAll}>
+                        밀린 알림 {pendingAlarms.length}개 모두 확인
+                    </button>
+                )}
             </div>
             <style>{`
                 @keyframes popIn {
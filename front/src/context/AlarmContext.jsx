@@ -12,6 +12,8 @@ export const AlarmProvider = ({ children }) => {
 
     // 🔔 실시간 알림 상태
     const [activeAlarm, setActiveAlarm] = useState(null);
+    // 접속 전에 밀린 미확인 알림 (여러 개면 한 번에 확인)
+    const [pendingAlarms, setPendingAlarms] = useState([]);
 
     const toggleOverlay = () => setIsOverlayOpen(prev => !prev);
     const closeOverlay = () => setIsOverlayOpen(false);
@@ -23,6 +25,26 @@ export const AlarmProvider = ({ children }) => {
         }
     }, []);
 
+    // 알림 팝업 + 웹 푸시 (SSE 수신 / 접속 시 미확인 알림 공통)
+    const showAlarm = useCallback((alarm) => {
+        setActiveAlarm(alarm);
+
+        // 웹 푸시 알림
+        if ("Notification" in window && Notification.permission === "granted") {
+            try {
+                const notif = new Notification("Medipin 알림", {
+                    body: alarm.message,
+                    icon: "/icon-192.png", // 아이콘 경로 확인 필요 (public/icon-192.png 가정)
+                    tag: `alarm-${alarm.id ?? `${alarm.regimen_id}-${alarm.alarm_time}`}` // 중복 알림 방지
+                });
+                notif.onclick = () => {
+                    window.focus();
+                    notif.close();
+                };
+            } catch (e) { console.error("Notification Error:", e); }
+        }
+    }, []);
+
     // 서버에서 읽지 않은 알림 확인
     const checkPendingAlarms = useCallback(async () => {
         const storedUserId = localStorage.getItem("userId");
@@ -40,24 +62,9 @@ export const AlarmProvider = ({ children }) => {
             });
             if (res.ok) {
                 const alarms = await res.json();
+                setPendingAlarms(alarms);
                 if (alarms.length > 0) {
-                    const latestAlarm = alarms[0]; // 가장 먼저 온 알림
-                    setActiveAlarm(latestAlarm);
-
-                    // 웹 푸시 알림
-                    if ("Notification" in window && Notification.permission === "granted") {
-                        try {
-                            const notif = new Notification("Medipin 알림", {
-                                body: latestAlarm.message,
-                                icon: "/icon-192.png", // 아이콘 경로 확인 필요 (public/icon-192.png 가정)
-                                tag: `alarm-${latestAlarm.id}` // 중복 알림 방지
-                            });
-                            notif.onclick = () => {
-                                window.focus();
-                                notif.close();
-                            };
-                        } catch (e) { console.error("Notification Error:", e); }
-                    }
+                    showAlarm(alarms[0]); // 가장 먼저 온 알림
                 }
             } else if (res.status === 401) {
                 // 토큰 만료 등 처리 필요 시 추가
@@ -66,20 +73,47 @@ export const AlarmProvider = ({ children }) => {
         } catch (error) {
             console.error("Error checking pending alarms:", error);
         }
-    }, []);
+    }, [showAlarm]);
 
-    const markAlarmAsRead = async (alarmId) => {
+    const markAlarmAsRead = async (alarm) => {
         try {
-            await fetch(`${API_BASE_URL}/alarms/${alarmId}/read`, {
-                method: "POST"
+            // 반복 일정 알림은 id 가 없으므로 regimen_id + 알림 시각으로 읽음 처리
+            const url = alarm.regimen_id
+                ? `${API_BASE_URL}/alarms/regimen/${alarm.regimen_id}/read?alarm_time=${encodeURIComponent(alarm.alarm_time)}`
+                : `${API_BASE_URL}/alarms/${alarm.id}/read`;
+            const token = localStorage.getItem("authToken");
+            await fetch(url, {
+                method: "POST",
+                headers: token ? { "Authorization": `Bearer ${token}` } : {}
             });
             setActiveAlarm(null); // 팝업 닫기
+            setPendingAlarms(prev => prev.filter(a => a.alarm_time !== alarm.alarm_time || a.id !== alarm.id || a.regimen_id !== alarm.regimen_id));
             // 필요하다면 리스트 갱신
         } catch (error) {
             console.error("Error marking alarm as read:", error);
         }
     };
 
+    // 밀린 알림 일괄 확인 (가장 늦은 알림 시각까지 한 번의 요청으로)
+    const markAllAlarmsAsRead = async () => {
+        const token = localStorage.getItem("authToken");
+        if (!token || pendingAlarms.length === 0) return;
+        try {
+            await fetch(`${API_BASE_URL}/alarms/read`, {
+                method: "POST",
+                headers: {
+                    "Content-Type": "application/json",
+                    "Authorization": `Bearer ${token}`
+                },
+                body: JSON.stringify({ before: pendingAlarms[pendingAlarms.length - 1].alarm_time })
+            });
+            setPendingAlarms([]);
+            setActiveAlarm(null);
+        } catch (error) {
+            console.error("Error marking alarms as read:", error);
+        }
+    };
+
     const fetchTodaySchedules = useCallback(async () => {
         const token = localStorage.getItem("authToken");
         const storedUserId = localStorage.getItem("userId");
@@ -90,20 +124,12 @@ export const AlarmProvider = ({ children }) => {
         setLoading(true);
         try {
             const now = new Date();
-            let year = now.getFullYear();
-            let month = now.getMonth() + 1;
             const dayStr = now.toISOString().split('T')[0];
 
-            if (!year || isNaN(year) || !month || isNaN(month)) {
-                console.warn("Invalid date in AlarmContext, resetting to now");
-                const safeNow = new Date();
-                year = safeNow.getFullYear();
-                month = safeNow.getMonth() + 1;
-            }
-
-            const res = await fetch(`${API_BASE_URL}/medication/schedule?user_id=${USER_ID}&year=${year}&month=${month}`, {
+            const res = await fetch(`${API_BASE_URL}/medication/schedule?user_id=${USER_ID}&day=${dayStr}`, {
                 headers: {
-                    "Accept": "application/json"
+                    "Accept": "application/json",
+                    "Authorization": `Bearer ${token}`
                 }
             });
             if (res.ok) {
@@ -123,24 +149,36 @@ export const AlarmProvider = ({ children }) => {
 
     useEffect(() => {
         fetchTodaySchedules();
+        // 접속 전에 이미 지난 알림은 한 번만 조회
         checkPendingAlarms();
 
-        // 1분마다 알림 체크
-        const alarmInterval = setInterval(checkPendingAlarms, 60 * 1000);
+        // 1분 폴링 대신 SSE 구독 (연결이 끊기면 EventSource 가 자동 재연결)
+        const token = localStorage.getItem("authToken");
+        let source = null;
+        if (token && "EventSource" in window) {
+            source = new EventSource(`${API_BASE_URL}/alarms/stream?token=${encodeURIComponent(token)}`);
+            source.addEventListener("alarm", (e) => {
+                try {
+                    showAlarm(JSON.parse(e.data));
+                } catch (err) { console.error("Alarm stream parse error:", err); }
+            });
+        }
+
         // 5분마다 스케줄 갱신
         const scheduleInterval = setInterval(fetchTodaySchedules, 5 * 60 * 1000);
 
         return () => {
-            clearInterval(alarmInterval);
+            if (source) source.close();
             clearInterval(scheduleInterval);
         };
-    }, [fetchTodaySchedules, checkPendingAlarms]);
+    }, [fetchTodaySchedules, checkPendingAlarms, showAlarm]);
 
     return (
         <AlarmContext.Provider value={{
             isOverlayOpen, toggleOverlay, closeOverlay,
             schedules, loading, refreshSchedules: fetchTodaySchedules,
-            activeAlarm, markAlarmAsRead
+            activeAlarm, markAlarmAsRead,
+            pendingAlarms, markAllAlarmsAsRead
         }}>
             {children}
             {/* Context 내부에서 렌더링하지 않고, 데이터를 Provide만 함. 
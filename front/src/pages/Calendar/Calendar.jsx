@@ -36,7 +36,8 @@ const Calendar = () => {
     }, [location.search]);
 
     // 데이터 상태
-    const [schedules, setSchedules] = useState([]);
+    const [schedules, setSchedules] = useState([]); // 선택한 날짜의 일정 행
+    const [calendarDays, setCalendarDays] = useState([]); // 월간 날짜 x 사용자별 집계 (dot 표시용)
     const [loading, setLoading] = useState(false);
 
     // 모드 상태
@@ -97,6 +98,12 @@ const Calendar = () => {
         }
     }, [currentMonth, users]);
 
+    useEffect(() => {
+        if (users.length > 0) {
+            fetchDaySchedules(selectedDate);
+        }
+    }, [selectedDate, users]);
+
     const fetchUsers = async () => {
         const token = localStorage.getItem("authToken");
         if (!token) return;
@@ -137,9 +144,10 @@ const Calendar = () => {
         }
     }, [location?.state]);
 
-    const fetchSchedules = async () => {
-        if (users.length === 0) return;
+    const authHeaders = () => ({ Authorization: `Bearer ${localStorage.getItem("authToken")}` });
 
+    // 월간 화면: 날짜별 집계만 받음 (본인 + 가족, 요청 1번)
+    const fetchCalendarSummary = async () => {
         let year = currentMonth ? currentMonth.getFullYear() : undefined;
         let month = currentMonth ? currentMonth.getMonth() + 1 : undefined;
 
@@ -150,18 +158,38 @@ const Calendar = () => {
             month = now.getMonth() + 1;
         }
 
-        setLoading(true);
+        const res = await fetch(`${API_URL}/calendar?year=${year}&month=${month}`, { headers: authHeaders() });
+        if (res.ok) {
+            setCalendarDays(await res.json());
+        }
+    };
+
+    // 선택한 날짜의 일정 행만 받음
+    const fetchDaySchedules = async (day) => {
+        if (users.length === 0 || !day || isNaN(day)) return;
+        const dayStr = format(day, 'yyyy-MM-dd');
+
         try {
             // users 배열에 있는 모든 유저(본인+가족)에 대해 스케줄 요청
             const promises = users.map(u =>
-                fetch(`${API_URL}/schedule?user_id=${u.id}&year=${year}&month=${month}`)
-                    .then(res => res.json())
+                fetch(`${API_URL}/schedule?user_id=${u.id}&day=${dayStr}`, { headers: authHeaders() })
+                    .then(res => res.ok ? res.json() : [])
             );
 
             const results = await Promise.all(promises);
             // results는 배열의 배열이므로 flatten
-            const allSchedules = results.flat();
-            setSchedules(allSchedules);
+            setSchedules(results.flat());
+        } catch (error) {
+            console.error("Error fetching schedules:", error);
+        }
+    };
+
+    const fetchSchedules = async () => {
+        if (users.length === 0) return;
+
+        setLoading(true);
+        try {
+            await Promise.all([fetchCalendarSummary(), fetchDaySchedules(selectedDate)]);
         } catch (error) {
             console.error("Error fetching schedules:", error);
         } finally {
@@ -177,7 +205,7 @@ const Calendar = () => {
 
         // 날짜에 해당하는 일정 개수 확인
         const dayStr = format(day, 'yyyy-MM-dd');
-        const countOnDay = schedules.filter(s => s.start_date <= dayStr && s.end_date >= dayStr).length;
+        const countOnDay = calendarDays.filter(d => d.date === dayStr).reduce((sum, d) => sum + d.count, 0);
 
         // [규격화] 2개 이하일 때는 30vh 고정 (리스트1의 기본 크기)
         // 3개부터는 약이 전부 보이도록 비례 확장 (최대 85vh)
@@ -246,14 +274,14 @@ const Calendar = () => {
                 // 수정 (PATCH)
                 res = await fetch(`${API_URL}/schedule/${editId}`, {
                     method: "PATCH",
-                    headers: { "Content-Type": "application/json" },
+                    headers: { "Content-Type": "application/json", ...authHeaders() },
                     body: JSON.stringify(payload)
                 });
             } else {
                 // 생성 (POST)
                 res = await fetch(`${API_URL}/schedule`, {
                     method: "POST",
-                    headers: { "Content-Type": "application/json" },
+                    headers: { "Content-Type": "application/json", ...authHeaders() },
                     body: JSON.stringify(payload)
                 });
             }
@@ -290,9 +318,13 @@ const Calendar = () => {
         if (!selectedEvent) return;
         try {
             const newStatus = !selectedEvent.is_taken;
-            const res = await fetch(`${API_URL}/schedule/${selectedEvent.id}`, {
+            // 반복 일정 항목은 해당 날짜만 변경
+            const url = selectedEvent.regimen_id
+                ? `${API_URL}/regimen/${selectedEvent.regimen_id}/occurrences/${selectedEvent.occurrence_date}`
+                : `${API_URL}/schedule/${selectedEvent.id}`;
+            const res = await fetch(url, {
                 method: "PATCH",
-                headers: { "Content-Type": "application/json" },
+                headers: { "Content-Type": "application/json", ...authHeaders() },
                 body: JSON.stringify({ is_taken: newStatus })
             });
             if (res.ok) {
@@ -313,8 +345,13 @@ const Calendar = () => {
         if (!window.confirm("Are you sure you want to delete this?")) return;
 
         try {
-            const res = await fetch(`${API_URL}/schedule/${selectedEvent.id}`, {
-                method: "DELETE"
+            // 반복 일정 항목은 반복 일정 전체 삭제
+            const url = selectedEvent.regimen_id
+                ? `${API_URL}/regimen/${selectedEvent.regimen_id}`
+                : `${API_URL}/schedule/${selectedEvent.id}`;
+            const res = await fetch(url, {
+                method: "DELETE",
+                headers: authHeaders()
             });
             if (res.ok) {
                 alert("Deleted!");
@@ -330,6 +367,10 @@ const Calendar = () => {
     // 수정 버튼 클릭
     const handleEditClick = () => {
         if (!selectedEvent) return;
+        if (selectedEvent.regimen_id) {
+            alert("반복 일정은 복용 완료 표시와 삭제만 지원합니다.");
+            return;
+        }
         setEditId(selectedEvent.id);
         closeDetailSheet();
         openAddSheet(selectedEvent); // 데이터를 직접 전달하여 비동기 이슈 방지
@@ -358,8 +399,7 @@ const Calendar = () => {
                 // 해당 날짜에 일정이 있는지 확인 (dot 표시용)
                 // 해당 날짜에 일정이 있는 유저들의 고유 ID 추출
                 const dayStr = format(day, 'yyyy-MM-dd');
-                const daySchedules = schedules.filter(s => s.start_date <= dayStr && s.end_date >= dayStr);
-                const userIdsOnDay = [...new Set(daySchedules.map(s => s.user_id))];
+                const userIdsOnDay = [...new Set(calendarDays.filter(d => d.date === dayStr).map(d => d.user_id))];
 
                 days.push(
                     <div
@@ -651,7 +691,7 @@ const Calendar = () => {
                             return (
                                 <div
                                     className={`event-card ${item.is_taken ? "taken" : ""}`}
-                                    key={item.id}
+                                    key={item.id ?? `${item.regimen_id}-${item.occurrence_date}`}
                                     onClick={() => openDetailSheet(item)}
                                 >
                                     <div className="event-time">
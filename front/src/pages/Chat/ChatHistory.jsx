@@ -41,7 +41,8 @@ export const ChatHistory = () => {
         }
 
         try {
-            const response = await fetch(`${API_BASE_URL}/chatbot/history`, {
+            // 대화별 마지막 메시지만 받음 (/chatbot/history 는 최근 N개씩 페이지 단위)
+            const response = await fetch(`${API_BASE_URL}/chatbot/conversations`, {
                 headers: {
                     Authorization: `Bearer ${token}`,
                 },
@@ -75,11 +76,8 @@ export const ChatHistory = () => {
             });
 
             if (response.ok) {
-                // Remove all messages with this conversationId from local state
-                setHistory(prev => prev.filter(item => {
-                    const cid = item.conversation_id || 'default';
-                    return cid !== conversationId;
-                }));
+                // Remove this conversation from local state
+                setHistory(prev => prev.filter(item => item.conversation_id !== conversationId));
             } else {
                 alert("삭제에 실패했습니다.");
             }
@@ -102,35 +100,14 @@ export const ChatHistory = () => {
 
     const displayHistory = [];
     if (hasHistory) {
-        // Group messages by conversation_id
-        const groups = {};
+        // 서버가 conversation_id 별 1행, 최신 대화순으로 내려줌
         history.forEach(item => {
-            const cid = item.conversation_id || 'default';
-            if (!groups[cid]) {
-                groups[cid] = {
-                    id: cid,
-                    name: "메디핀 AI",
-                    messages: [],
-                    latest_at: item.created_at
-                };
-            }
-            groups[cid].messages.push(item);
-            if (new Date(item.created_at) > new Date(groups[cid].latest_at)) {
-                groups[cid].latest_at = item.created_at;
-            }
-        });
-
-        // Convert groups to display format and sort by latest
-        Object.values(groups).sort((a, b) => new Date(b.latest_at) - new Date(a.latest_at)).forEach(group => {
-            const latestMsg = group.messages.sort((a, b) => new Date(b.created_at) - new Date(a.created_at))[0];
-            const unreadCount = group.messages.reduce((sum, m) => sum + (!m.is_read && m.sender === 'bot' ? 1 : 0), 0);
-
             displayHistory.push({
-                id: group.id,
-                name: group.name,
-                message: latestMsg.message,
-                time: formatTime(latestMsg.created_at),
-                unread: unreadCount,
+                id: item.conversation_id,
+                name: "메디핀 AI",
+                message: item.message,
+                time: formatTime(item.created_at),
+                unread: item.unread,
                 sender: 'bot'
             });
         });
@@ -44,7 +44,8 @@ const ChattingMain = () => {
     if (!token) return;
     const cidFromParams = searchParams.get("cid");
     try {
-      const response = await fetch(`${API_BASE_URL}/chatbot/history`, {
+      const query = cidFromParams ? `?conversation_id=${encodeURIComponent(cidFromParams)}` : "";
+      const response = await fetch(`${API_BASE_URL}/chatbot/history${query}`, {
         headers: { Authorization: `Bearer ${token}` }
       });
       if (response.ok) {
@@ -13,6 +13,7 @@ const NotificationList = () => {
     const { toggleOverlay } = useAlarm();
     const [notifications, setNotifications] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
     const storedUserId = localStorage.getItem("userId");
     const USER_ID = storedUserId ? parseInt(storedUserId) : 1;
 
@@ -20,14 +21,15 @@ const NotificationList = () => {
         fetchNotifications();
     }, []);
 
-    const fetchNotifications = async () => {
+    const fetchNotifications = async (cursor = null) => {
         const token = localStorage.getItem("authToken");
         if (!token) return;
 
-        setLoading(true);
+        if (!cursor) setLoading(true);
         try {
-            // 알림 히스토리 API 호출
-            const res = await fetch(`${API_BASE_URL}/alarms/history?user_id=${USER_ID}`, {
+            // 알림 히스토리 API 호출 (페이지 단위, 다음 페이지 커서는 X-Next-Cursor 헤더)
+            const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+            const res = await fetch(`${API_BASE_URL}/alarms/history?user_id=${USER_ID}${cursorParam}`, {
                 headers: {
                     "Accept": "application/json",
                     "Authorization": `Bearer ${token}`
@@ -35,7 +37,8 @@ const NotificationList = () => {
             });
             if (res.ok) {
                 const data = await res.json();
-                setNotifications(data);
+                setNotifications(prev => cursor ? [...prev, ...data] : data);
+                setNextCursor(res.headers.get("X-Next-Cursor"));
             } else if (res.status === 401) {
                 console.warn("Unauthorized notification fetch");
                 // navigate('/login'); // 필요 시 로그인 페이지로 이동
@@ -85,11 +88,11 @@ const NotificationList = () => {
                         <div className="no-data">알림 기록이 없습니다.</div>
                     ) : (
                         <div className="noti-list">
-                            {notifications.map((item, index) => {
+                            {notifications.map((item) => {
                                 const isCompleted = item.is_taken || item.is_read;
                                 return (
                                     <div
-                                        key={item.id || index}
+                                        key={item.id || `r${item.regimen_id}-${item.alarm_time}`}
                                         className={`noti-item ${isCompleted ? 'completed' : ''}`}
                                         onClick={() => handleItemClick(item)}
                                     >
@@ -112,6 +115,11 @@ const NotificationList = () => {
                                     </div>
                                 );
                             })}
+                            {nextCursor && (
+                                <button className="noti-more-btn" onClick={() => fetchNotifications(nextCursor)}>
+                                    더 보기
+                                </button>
+                            )}
                         </div>
                     )}
                 </div>
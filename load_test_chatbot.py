@@ -0,0 +1,148 @@
+
+# 챗봇 파이프라인 오프라인 부하 테스트
+# LLM 은 LocalBackend(결정적 응답 + 가상 지연)로 대체하고, DB 는 임시 SQLite 파일을 사용합니다.
+# RAG 컨텍스트 조립 → 응답 캐시 → LLM → REGISTER_SCHEDULE 처리 → write-behind 저장까지 전부 실행됩니다.
+#
+# 실행: python load_test_chatbot.py [동시 사용자 수] [사용자당 질문 수] [LLM 지연 ms]
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+import app.models.user as user_models
+import app.models.medication
+import app.models.drug_info as drug_models
+import app.models.map as map_models
+import app.models.chat_history
+import app.models.alarm
+import app.models.refresh_token
+
+from app.services.chatbot_backend import LocalBackend, set_chatbot_backend
+from app.services.chatbot_cache import get_response_cache
+from app.services.chat_writer import get_chat_writer
+from app.services.chatbot_service import generate_chatbot_response, stream_chatbot_response
+
+N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+N_QUESTIONS = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+LATENCY_MS = int(sys.argv[3]) if len(sys.argv) > 3 else 300
+N_DRUGS = 2000
+random.seed(7)
+
+QUESTION_TEMPLATES = [
+    "{drug}은 무슨 약이에요?",
+    "{drug} 부작용 알려줘",
+    "근처 내과 병원 어디 있어?",
+    "응급실 가까운 곳 알려줘",
+    "내 복약 일정 알려줘",
+    "{drug} 내일 아침 8시에 2정 먹을게 등록해줘",
+]
+
+
+def setup_db():
+    path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    for uid in range(1, N_USERS + 1):
+        db.add(user_models.UserProfile(id=uid, email=f"user{uid}@test", hashed_password="x", name=f"사용자{uid}", age=30 + uid % 50))
+        db.add(user_models.PatientProfile(user_id=uid, name=f"사용자{uid}", relation="Self", special_note=None))
+    for i in range(N_DRUGS):
+        db.add(drug_models.ProductLicense(no=i + 1, item_seq=100000 + i, item_name=f"테스트약{i}정",
+                                          entp_name="테스트제약", ingr_name=f"성분{i % 300}", induty="의약품"))
+    for i in range(50):
+        db.add(map_models.MasterMedical(care_id=str(i), name=f"테스트{'내과' if i % 2 else '병원'}{i}",
+                                        tel="02-000-0000", address="서울", departments="내과,응급"))
+    db.commit()
+    db.close()
+    return engine, Session
+
+
+def make_question():
+    drug = f"테스트약{random.randrange(N_DRUGS)}정"
+    return random.choice(QUESTION_TEMPLATES).format(drug=drug)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def report(label, latencies, elapsed):
+    print(f"[{label}] 요청 {len(latencies)}건, {elapsed:.2f}s, {len(latencies) / elapsed:.1f} req/s")
+    print(f"    p50 {percentile(latencies, 0.5):.1f}ms  p95 {percentile(latencies, 0.95):.1f}ms  "
+          f"p99 {percentile(latencies, 0.99):.1f}ms  mean {statistics.mean(latencies):.1f}ms")
+
+
+def run_sync(Session):
+    def user_session(uid):
+        db = Session()
+        latencies = []
+        try:
+            for _ in range(N_QUESTIONS):
+                start = time.perf_counter()
+                generate_chatbot_response(db, uid, make_question(), conversation_id=f"load-{uid}")
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=N_USERS) as pool:
+        results = list(pool.map(user_session, range(1, N_USERS + 1)))
+    report("sync", [l for r in results for l in r], time.perf_counter() - start)
+
+
+async def run_stream(Session):
+    ttft, total = [], []
+
+    async def user_session(uid):
+        for _ in range(N_QUESTIONS):
+            start = time.perf_counter()
+            first = None
+            async for event in stream_chatbot_response(Session, uid, make_question(), conversation_id=f"stream-{uid}"):
+                if first is None:
+                    first = time.perf_counter()
+            ttft.append((first - start) * 1000)
+            total.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_session(uid) for uid in range(1, N_USERS + 1)))
+    elapsed = time.perf_counter() - start
+    report("stream", total, elapsed)
+    print(f"    첫 이벤트까지 p50 {percentile(ttft, 0.5):.1f}ms  p95 {percentile(ttft, 0.95):.1f}ms")
+
+
+if __name__ == "__main__":
+    engine, Session = setup_db()
+
+    backend = LocalBackend(latency_ms=LATENCY_MS, chunk_delay_ms=20)
+    set_chatbot_backend(backend)
+    writer = get_chat_writer()
+    writer.session_factory = Session
+
+    print(f"동시 사용자 {N_USERS}, 사용자당 질문 {N_QUESTIONS}, LLM 지연 {LATENCY_MS}ms")
+    run_sync(Session)
+    asyncio.run(run_stream(Session))
+
+    writer.stop()
+    from app.models.chat_history import ChatHistory
+    from app.models.medication import MedicationSchedule
+    db = Session()
+    print(f"LLM 호출 {backend.calls}회, 캐시 {get_response_cache().stats()}")
+    print(f"저장된 채팅 {db.query(ChatHistory).count()}건, 등록된 일정 {db.query(MedicationSchedule).count()}건, "
+          f"writer {writer.stats()}")
+    db.close()
@@ -0,0 +1,11 @@
+from app.db import engine
+
+from app.models.medication import AdherenceDaily
+
+def add_adherence_schema():
+    # 복약 순응도 일별 집계 (채우기: python backfill_adherence.py)
+    AdherenceDaily.__table__.create(bind=engine, checkfirst=True)
+    print("adherence_daily table is ready.")
+
+if __name__ == "__main__":
+    add_adherence_schema()
@@ -0,0 +1,19 @@
+from app.db import engine
+from sqlalchemy import text
+
+def add_alarm_user_time_index():
+    with engine.connect() as conn:
+        try:
+            # 알림 내역 키셋 페이지네이션용 (사용자별 alarm_time 역순)
+            result = conn.execute(text("SHOW INDEX FROM alarms WHERE Key_name = 'ix_alarms_user_time'"))
+            if result.fetchone():
+                print("Index 'ix_alarms_user_time' already exists.")
+            else:
+                conn.execute(text("CREATE INDEX ix_alarms_user_time ON alarms (user_id, alarm_time)"))
+                conn.commit()
+                print("Successfully added ix_alarms_user_time index.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+if __name__ == "__main__":
+    add_alarm_user_time_index()
@@ -0,0 +1,11 @@
+from app.db import engine
+
+from app.models.alarm import AlarmOutbox
+
+def add_alarm_outbox_schema():
+    # 알림 push 발송 기록 (미전달 알림 재전송 / 중복 발송 방지)
+    AlarmOutbox.__table__.create(bind=engine, checkfirst=True)
+    print("alarm_outbox table is ready.")
+
+if __name__ == "__main__":
+    add_alarm_outbox_schema()
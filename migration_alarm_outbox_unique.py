@@ -0,0 +1,36 @@
+from app.db import engine
+from sqlalchemy import text
+
+# alarm_outbox 중복 발송 방지 인덱스를 유니크 키로 교체
+# (여러 프로세스가 같은 알림을 기록하면 INSERT IGNORE 로 한 곳만 성공)
+UNIQUE_KEYS = [
+    ("ix_alarm_outbox_alarm", "uq_alarm_outbox_alarm", "alarm_id"),
+    ("ix_alarm_outbox_regimen_time", "uq_alarm_outbox_regimen_time", "regimen_id, alarm_time"),
+]
+
+def add_alarm_outbox_unique_keys():
+    with engine.connect() as conn:
+        try:
+            # 이미 중복으로 기록된 행은 가장 먼저 기록된 행만 남김
+            conn.execute(text(
+                "DELETE o FROM alarm_outbox o JOIN alarm_outbox k "
+                "ON o.alarm_id = k.alarm_id AND o.id > k.id"
+            ))
+            conn.execute(text(
+                "DELETE o FROM alarm_outbox o JOIN alarm_outbox k "
+                "ON o.regimen_id = k.regimen_id AND o.alarm_time = k.alarm_time AND o.id > k.id"
+            ))
+            for old, new, columns in UNIQUE_KEYS:
+                if conn.execute(text(f"SHOW INDEX FROM alarm_outbox WHERE Key_name = '{new}'")).fetchone():
+                    print(f"Index '{new}' already exists.")
+                    continue
+                conn.execute(text(f"CREATE UNIQUE INDEX {new} ON alarm_outbox ({columns})"))
+                if conn.execute(text(f"SHOW INDEX FROM alarm_outbox WHERE Key_name = '{old}'")).fetchone():
+                    conn.execute(text(f"DROP INDEX {old} ON alarm_outbox"))
+                print(f"Successfully added {new} unique index.")
+            conn.commit()
+        except Exception as e:
+            print(f"Error: {e}")
+
+if __name__ == "__main__":
+    add_alarm_outbox_unique_keys()
@@ -0,0 +1,19 @@
+from app.db import engine
+from sqlalchemy import text
+
+def add_alarm_time_index():
+    with engine.connect() as conn:
+        try:
+            # 알림 디스패처 증분 로드용 (곧 울릴 알림만 시각 범위로 조회)
+            result = conn.execute(text("SHOW INDEX FROM alarms WHERE Key_name = 'ix_alarms_alarm_time'"))
+            if result.fetchone():
+                print("Index 'ix_alarms_alarm_time' already exists.")
+            else:
+                conn.execute(text("CREATE INDEX ix_alarms_alarm_time ON alarms (alarm_time)"))
+                conn.commit()
+                print("Successfully added ix_alarms_alarm_time index.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+if __name__ == "__main__":
+    add_alarm_time_index()
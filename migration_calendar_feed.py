@@ -0,0 +1,14 @@
+from app.db import engine
+
+from app.models.medication import CalendarFeedToken, ScheduleChange
+
+def add_calendar_feed_schema():
+    # 캘린더 피드(.ics) 증분 동기화용 일정 변경 기록
+    ScheduleChange.__table__.create(bind=engine, checkfirst=True)
+    print("schedule_change table is ready.")
+    # 구독 URL 인증용 피드 전용 키 (해시만 저장)
+    CalendarFeedToken.__table__.create(bind=engine, checkfirst=True)
+    print("calendar_feed_token table is ready.")
+
+if __name__ == "__main__":
+    add_calendar_feed_schema()
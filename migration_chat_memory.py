@@ -0,0 +1,24 @@
+from app.db import engine
+from sqlalchemy import text
+
+from app.models.chat_history import ConversationSummary
+
+def add_chat_memory_schema():
+    with engine.connect() as conn:
+        try:
+            # 대화별 최근 N턴 조회 / 커서 페이지네이션용 복합 인덱스
+            result = conn.execute(text("SHOW INDEX FROM chat_history WHERE Key_name = 'ix_chat_history_user_conv_id'"))
+            if result.fetchone():
+                print("Index 'ix_chat_history_user_conv_id' already exists.")
+            else:
+                conn.execute(text("CREATE INDEX ix_chat_history_user_conv_id ON chat_history (user_id, conversation_id, id)"))
+                conn.commit()
+                print("Successfully added ix_chat_history_user_conv_id index.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+    ConversationSummary.__table__.create(bind=engine, checkfirst=True)
+    print("conversation_summary table is ready.")
+
+if __name__ == "__main__":
+    add_chat_memory_schema()
@@ -0,0 +1,13 @@
+from app.db import engine
+
+from app.models.medication import MedicationRegimen, RegimenOccurrence
+
+def add_regimen_schema():
+    # 반복 일정 본체 + 날짜별 상태 테이블 (기존 medication_schedule 은 그대로 사용)
+    MedicationRegimen.__table__.create(bind=engine, checkfirst=True)
+    print("medication_regimen table is ready.")
+    RegimenOccurrence.__table__.create(bind=engine, checkfirst=True)
+    print("regimen_occurrence table is ready.")
+
+if __name__ == "__main__":
+    add_regimen_schema()
@@ -0,0 +1,19 @@
+from app.db import engine
+from sqlalchemy import text
+
+def add_schedule_calendar_index():
+    with engine.connect() as conn:
+        try:
+            # 월간 캘린더 조회용 복합 인덱스 (사용자별 기간 중첩 검색)
+            result = conn.execute(text("SHOW INDEX FROM medication_schedule WHERE Key_name = 'ix_medication_schedule_user_dates'"))
+            if result.fetchone():
+                print("Index 'ix_medication_schedule_user_dates' already exists.")
+            else:
+                conn.execute(text("CREATE INDEX ix_medication_schedule_user_dates ON medication_schedule (user_id, start_date, end_date)"))
+                conn.commit()
+                print("Successfully added ix_medication_schedule_user_dates index.")
+        except Exception as e:
+            print(f"Error: {e}")
+
+if __name__ == "__main__":
+    add_schedule_calendar_index()
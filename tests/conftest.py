@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# 저장소 루트를 import 경로에 추가 (app 패키지)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
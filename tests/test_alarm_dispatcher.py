@@ -0,0 +1,165 @@
+# tests/test_alarm_dispatcher.py
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+import app.models.user
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+from app.models.alarm import Alarm, AlarmOutbox
+from app.models.medication import MedicationSchedule
+from app.services.alarm_dispatcher import AlarmDispatcher, DueIndex
+from app.services.alarm_notifiers import FakeNotifier, OutboxNotifier
+
+NOW = datetime(2026, 1, 5, 9, 0, 30)
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.execute(insert(MedicationSchedule), [
+            {"user_id": 1, "pill_name": "타이레놀", "start_date": date(2026, 1, 5), "end_date": date(2026, 1, 5),
+             "notify": True, "is_taken": False},
+        ])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def add_alarms(Session, *rows):
+    """ rows: (id, alarm_time) """
+    with Session() as db:
+        db.execute(insert(Alarm), [
+            {"id": alarm_id, "user_id": 1, "schedule_id": 1, "alarm_time": when, "message": "복약 시간입니다.", "is_read": False}
+            for alarm_id, when in rows
+        ])
+        db.commit()
+
+
+def sent_ids(fake):
+    return sorted(a["id"] for a in fake.sent)
+
+
+# -------------------------------------------------
+# DueIndex
+# -------------------------------------------------
+def test_pop_due_limit_keeps_rest_for_next_tick():
+    index = DueIndex()
+    past = NOW - timedelta(minutes=2)
+    for i in range(5):
+        index.add(past + timedelta(seconds=i), ("a", i), i)
+    index.add(NOW - timedelta(seconds=10), ("a", 10), 10)
+    index.add(NOW + timedelta(seconds=10), ("a", 11), 11)
+
+    first = index.pop_due(NOW, limit=3)
+    assert [e for _, e in first] == [0, 1, 2]
+    second = index.pop_due(NOW, limit=3)
+    assert [e for _, e in second] == [3, 4, 10]
+    assert index.pop_due(NOW, limit=3) == []
+    assert len(index) == 1
+    assert index.next_due() == NOW + timedelta(seconds=10)
+
+
+def test_pop_due_skips_removed_keys():
+    index = DueIndex()
+    index.add(NOW - timedelta(minutes=1), ("a", 1), 1)
+    index.add(NOW - timedelta(minutes=1), ("a", 2), 2)
+    index.remove(("a", 1))
+
+    assert [e for _, e in index.pop_due(NOW)] == [2]
+    assert index.next_due() is None
+
+
+# -------------------------------------------------
+# AlarmDispatcher
+# -------------------------------------------------
+class FailingNotifier(FakeNotifier):
+    name = "failing"
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def notify(self, alarms):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("outbox down")
+        super().notify(alarms)
+
+
+def test_requeue_when_first_notifier_fails(Session):
+    add_alarms(Session, (1, NOW - timedelta(minutes=1)), (2, NOW - timedelta(seconds=5)))
+    failing, fake = FailingNotifier(failures=1), FakeNotifier()
+    dispatcher = AlarmDispatcher(session_factory=Session, notifiers=[failing, fake], clock=lambda: NOW)
+
+    assert dispatcher.poll(NOW) == 2
+    assert dispatcher.tick(NOW) == 0
+    assert fake.sent == []
+    assert len(dispatcher._index) == 2
+
+    assert dispatcher.tick(NOW) == 2
+    assert sent_ids(fake) == [1, 2]
+    assert len(dispatcher._index) == 0
+
+
+def test_resync_skips_alarms_already_in_outbox(Session):
+    add_alarms(Session, *[(i, NOW - timedelta(minutes=i)) for i in (1, 2, 3)])
+    first = FakeNotifier()
+    dispatcher = AlarmDispatcher(session_factory=Session, notifiers=[OutboxNotifier(Session), first])
+    dispatcher.poll(NOW)
+    dispatcher._index.remove(("a", 3))
+    assert dispatcher.tick(NOW) == 2
+
+    # 재시작: outbox 에 기록된 알림은 다시 보내지 않음
+    restarted = FakeNotifier()
+    dispatcher = AlarmDispatcher(session_factory=Session, notifiers=[OutboxNotifier(Session), restarted])
+    assert dispatcher.poll(NOW) == 1
+    assert dispatcher.tick(NOW) == 1
+    assert sent_ids(restarted) == [3]
+
+
+def test_outbox_lets_only_one_process_send(Session):
+    add_alarms(Session, (1, NOW - timedelta(minutes=1)), (2, NOW - timedelta(minutes=2)))
+    fakes = [FakeNotifier(), FakeNotifier()]
+    dispatchers = [
+        AlarmDispatcher(session_factory=Session, notifiers=[OutboxNotifier(Session), fake]) for fake in fakes
+    ]
+    # 두 프로세스가 같은 창을 동시에 로드
+    for dispatcher in dispatchers:
+        dispatcher.poll(NOW)
+    for dispatcher in dispatchers:
+        dispatcher.tick(NOW)
+
+    assert sent_ids(fakes[0]) == [1, 2]
+    assert fakes[1].sent == []
+    with Session() as db:
+        outbox = db.execute(select(AlarmOutbox.id, AlarmOutbox.alarm_id)).all()
+    assert sorted(r.alarm_id for r in outbox) == [1, 2]
+    assert {a["outbox_id"] for a in fakes[0].sent} == {r.id for r in outbox}
+
+
+def test_reload_picks_up_late_committed_lower_id(Session):
+    add_alarms(Session, (1, NOW + timedelta(minutes=1)))
+    fake = FakeNotifier()
+    dispatcher = AlarmDispatcher(session_factory=Session, notifiers=[fake])
+    assert dispatcher.poll(NOW) == 1
+
+    # id 3 이 먼저 커밋되어 워터마크가 3 이 된 뒤, id 2 가 늦게 커밋됨
+    add_alarms(Session, (3, NOW + timedelta(minutes=2)))
+    assert dispatcher.poll(NOW) == 1
+    add_alarms(Session, (2, NOW + timedelta(minutes=3)))
+    assert dispatcher.poll(NOW) == 0
+
+    dispatcher.reload()
+    assert dispatcher.poll(NOW) == 1
+    assert dispatcher.tick(NOW + timedelta(minutes=5)) == 3
+    assert sent_ids(fake) == [1, 2, 3]
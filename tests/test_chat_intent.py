@@ -0,0 +1,70 @@
+# tests/test_chat_intent.py
+
+from datetime import date
+
+import pytest
+
+from app.services.chat_intent import extract_schedule_intent, parse_date, parse_times
+
+TODAY = date(2026, 1, 5)
+
+
+def known(token):
+    return token == "타이레놀"
+
+
+def intent(text):
+    return extract_schedule_intent(text, known, TODAY)
+
+
+def test_longest_day_word_wins():
+    assert parse_date("내일모레 타이레놀 등록해줘", TODAY) == date(2026, 1, 7)
+    data = intent("내일모레 아침 8시 타이레놀 등록해줘")
+    assert data["start_date"] == "2026-01-07"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("밤 12시", ["00:00"]),
+    ("오전 12시", ["00:00"]),
+    ("오후 12시", ["12:00"]),
+    ("밤 11시", ["23:00"]),
+    ("점심 1시", ["13:00"]),
+])
+def test_period_with_clock(text, expected):
+    assert parse_times(text) == expected
+
+
+def test_midnight_schedule():
+    assert intent("타이레놀 밤 12시 등록해줘")["timings"] == ["00:00"]
+
+
+@pytest.mark.parametrize("text", [
+    "타이레놀 알림 꺼줘 내일 아침",
+    "타이레놀 알림 끄기 내일 8시",
+    "타이레놀 알림 해제 내일 8시",
+    "타이레놀 알림 중지 내일 8시",
+])
+def test_disable_requests_are_not_registered(text):
+    assert intent(text) is None
+
+
+def test_period_word_covered_by_hhmm():
+    assert parse_times("아침 9:30") == ["09:30"]
+    assert parse_times("오후 1:30") == ["13:30"]
+    assert intent("타이레놀 아침 9:30 등록해줘")["timings"] == ["09:30"]
+
+
+def test_no_time_falls_back_to_llm():
+    assert intent("타이레놀 오늘 먹을게") is None
+
+
+def test_common_noun_is_not_a_drug():
+    assert intent("내일 아침 8시 알림 설정") is None
+
+
+def test_confident_request_is_extracted():
+    data = intent("타이레놀 내일 아침 8시에 2정 먹을게 등록해줘")
+    assert data["medication_name"] == "타이레놀"
+    assert data["start_date"] == "2026-01-06"
+    assert data["timings"] == ["08:00"]
+    assert data["dose"] == "2정"
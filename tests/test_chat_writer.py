@@ -0,0 +1,59 @@
+# tests/test_chat_writer.py
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import Base
+import app.models.user as user_models
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+import app.models.chat_history
+import app.services.chat_writer as chat_writer
+from app.services.chat_memory import load_conversation_memory
+from app.services.chat_writer import ChatHistoryWriter
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(user_models.UserProfile(id=1, email="a@test", hashed_password="x", name="홍길동"))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+def test_memory_read_does_not_duplicate_turns_during_commit(engine, monkeypatch):
+    entered, release = threading.Event(), threading.Event()
+
+    class GatedSession(Session):
+        def commit(self):
+            entered.set()
+            release.wait(5)
+            super().commit()
+
+    writer = ChatHistoryWriter(session_factory=sessionmaker(bind=engine, class_=GatedSession), interval=0.01)
+    monkeypatch.setattr(chat_writer, "_chat_writer", writer)
+    writer.enqueue(1, "타이레놀 먹어도 돼?", "user", "c1")
+    writer.enqueue(1, "네, 드셔도 됩니다.", "bot", "c1")
+    assert entered.wait(5)
+
+    # 배치 커밋 중에는 조회가 커밋 경계 잠금에서 대기
+    result = {}
+    reader = threading.Thread(
+        target=lambda: result.update(load_conversation_memory(Session(engine), 1, "c1"))
+    )
+    reader.start()
+    reader.join(0.1)
+    assert reader.is_alive()
+
+    release.set()
+    reader.join(5)
+    writer.stop()
+    assert [t["message"] for t in result["turns"]] == ["타이레놀 먹어도 돼?", "네, 드셔도 됩니다."]
+    assert all(t["id"] is not None for t in result["turns"])
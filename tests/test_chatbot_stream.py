@@ -0,0 +1,25 @@
+# tests/test_chatbot_stream.py
+
+import pytest
+
+from app.services.chatbot_service import _probe_intent_json
+
+
+@pytest.mark.parametrize("head, expected", [
+    # 아직 판단 불가 (더 받아야 함)
+    ("{", None),
+    ('{"intent": "REGISTER_SCH', None),
+    ('{"a": tr', None),
+    ('{"a": 1', None),
+    ("```", None),
+    ("```json\n", None),
+    # 일정 등록 JSON → 보류
+    ('{"intent": "REGISTER_SCHEDULE", "times": ["08:00"]}', True),
+    ('```json\n{"intent": "REGISTER_SCHEDULE"}', True),
+    # 일반 답변 → 모은 부분을 바로 내보냄
+    ('{"a": 1} 은 예시입니다', False),
+    ("{ 중괄호로 시작하는 문장", False),
+    ("```python\nprint(1)", False),
+])
+def test_probe_intent_json(head, expected):
+    assert _probe_intent_json(head) is expected
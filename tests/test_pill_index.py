@@ -0,0 +1,52 @@
+# tests/test_pill_index.py
+
+import pytest
+
+from app.services.pill_index import PillIndex, parse_pill_query
+
+
+def pill(item_seq, shape, color, front, back=None, line=None, length=None):
+    return {
+        "item_seq": item_seq, "item_name": f"약{item_seq}", "company_name": "제약",
+        "drug_shape": shape, "color_class1": color, "color_class2": None,
+        "print_front": front, "print_back": back, "line_front": line, "line_back": None,
+        "leng_long": length, "item_image": None,
+    }
+
+
+@pytest.fixture
+def index():
+    return PillIndex([
+        pill(1, "원형", "하양", "TY", "500"),
+        pill(2, "원형", "하양", "T"),
+        pill(3, "원형", "하양", "AB"),
+        pill(4, "타원형", "노랑", "TY"),
+        pill(5, "원형", "하양", None),
+    ])
+
+
+def ids(results):
+    return [r["id"] for r in results]
+
+
+def test_single_character_imprint(index):
+    assert ids(index.search(imprint="T")) == [2, 1, 4]
+
+
+def test_imprint_ranks_within_shape_and_color(index):
+    # 각인이 틀려도 모양/색상 후보는 남고, 일치하는 각인이 위로
+    assert ids(index.search(shape="원형", color="하양", imprint="TY")) == [1, 2, 3, 5]
+    assert ids(index.search(shape="원형", color="하양", imprint="ZZ")) == [1, 2, 3, 5]
+
+
+def test_imprint_only_filters(index):
+    assert ids(index.search(imprint="TY")) == [1, 4]
+    assert index.search(imprint="ZZ") == []
+
+
+def test_limit(index):
+    assert ids(index.search(shape="원형", imprint="TY", limit=2)) == [1, 2]
+
+
+def test_parse_pill_query():
+    assert parse_pill_query("white round tablet printed 'TY'") == {"shape": "원형", "color": "하양", "imprint": "TY"}
@@ -0,0 +1,49 @@
+# tests/test_rag_context.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db import Base
+import app.models.user as user_models
+import app.models.medication
+import app.models.alarm
+import app.models.refresh_token
+import app.models.chat_history
+import app.models.drug_info
+import app.models.map
+import app.services.rag_context as rag_context
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rag.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(user_models.UserProfile(id=1, email="a@test", hashed_password="x", name="홍길동", age=40))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_summary_loads_inline_when_stage_pool_is_saturated(db, monkeypatch):
+    # 다른 채팅의 단계들이 워커를 모두 점유한 상태
+    release = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=1)
+    pool.submit(release.wait, 5)
+    monkeypatch.setattr(rag_context, "_executor", pool)
+
+    started = time.perf_counter()
+    try:
+        context = rag_context.build_chat_context(db, 1, "안녕하세요")
+    finally:
+        release.set()
+        pool.shutdown(wait=True)
+
+    assert time.perf_counter() - started < 2
+    assert context["summary"]["name"] == "홍길동"
+    assert context["rag_data"] == ""
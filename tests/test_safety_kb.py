@@ -0,0 +1,43 @@
+# tests/test_safety_kb.py
+
+import pytest
+
+from app.services.safety_kb import SafetyKnowledgeBase, drug_base_name
+
+
+@pytest.fixture
+def kb():
+    kb = SafetyKnowledgeBase()
+    kb.register_product("1", "타이레놀정500밀리그램(아세트아미노펜)", "ING1", "아세트아미노펜")
+    kb.register_product("2", "타이레놀8시간이알서방정", "ING1", "아세트아미노펜")
+    kb.register_product("3", "타이레놀콜드에스정", "ING2", "클로르페니라민")
+    kb.register_product("4", "테스트약1정", "ING4", "성분4")
+    kb.register_product("5", "테스트약2정", "ING5", "성분5")
+    return kb
+
+
+def codes(kb, name):
+    drug = kb.resolve(name=name)
+    return sorted(drug["product_codes"]), sorted(drug["ingredient_codes"])
+
+
+def test_drug_base_name():
+    assert drug_base_name("타이레놀정500밀리그램(아세트아미노펜)") == "타이레놀"
+    assert drug_base_name("부루펜시럽") == "부루펜"
+    assert drug_base_name("아세틸살리실산") == "아세틸살리실산"
+
+
+def test_exact_and_ingredient_names(kb):
+    assert codes(kb, "테스트약1정") == (["4"], ["ING4"])
+    assert codes(kb, "아세트아미노펜") == ([], ["ING1"])
+
+
+def test_base_name_matches_same_product_family(kb):
+    assert codes(kb, "타이레놀") == (["1", "2"], ["ING1"])
+    assert codes(kb, "타이레놀정") == (["1", "2"], ["ING1"])
+    assert codes(kb, "타이레놀콜드에스") == (["3"], ["ING2"])
+
+
+@pytest.mark.parametrize("name", ["정", "타이", "테스트약", "없는약"])
+def test_short_or_ambiguous_names_stay_unresolved(kb, name):
+    assert codes(kb, name) == ([], [])